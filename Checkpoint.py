@@ -0,0 +1,50 @@
+import os
+import gzip
+import pickle
+from typing import Any, NamedTuple
+
+class CheckpointState(NamedTuple):
+    iteration: int                              # last completed iteration
+    timepoints: list[tuple[int, int, float]]    # timepoints_per_iteration (iteration, node, time)
+    incumbent: float | None
+    incumbent_solution: Any                     # (paths, consolidations, in-tree paths) of the incumbent
+    lower_bound: float
+    solve_time: float                           # seconds counted against TIMEOUT
+    total_time: float = 0.0                     # wall seconds since the solve started (the info tuples' total time)
+    mip_time: float = 0.0                       # of the last MIP, which the schedule and throttle adapt to
+    snapped: set | None = None                  # timepoints dropped by snapping
+    fixed_arcs: dict | None = None              # arcs fixed by reduced costs
+    throttle: Any = None                        # TimepointThrottle, with its deferred timepoints and batch size
+    schedule: Any = None                        # SolveSchedule, at its position
+
+##
+## Saves the progress of an IntervalSolver at the end of each iteration, so a preempted solve can be resumed (IntervalSolver.resume) by
+## rebuilding the model from the discovered timepoints.  Written to a temporary file and renamed, so a kill during the write leaves
+## the previous checkpoint intact
+##
+class Checkpoint(object):
+    __slots__ = ['filename']
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def save(self, solver, iteration, solve_time, total_time, mip_time):
+        state = CheckpointState(iteration, solver.timepoints_per_iteration, solver.incumbent, solver.incumbent_solution, solver.lower_bound, solve_time,
+                                total_time, mip_time, solver.snapped, solver.fixed_arcs, solver.throttle, solver.schedule)
+        temp = self.filename + '.tmp'
+
+        with gzip.open(temp, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temp, self.filename)
+
+    def load(self) -> CheckpointState:
+        with gzip.open(self.filename, 'rb') as file:
+            return pickle.load(file)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.filename)
@@ -0,0 +1,59 @@
+import copy
+import time
+import logging
+from typing import NamedTuple
+from IntervalSolver import IntervalSolver
+from ProblemData import NodeTime, ProblemData
+
+class Level(NamedTuple):
+    factor: int                 # time unit of the level, as a multiple of the problem's
+    lower_bound: float | None   # of the level's own (rounded) problem - only the last level's bounds the problem
+    incumbent: float | None
+    iterations: int
+    solve_time: float           # gurobi time
+    total_time: float
+    seeded: int                 # timepoints carried over from the previous level
+    intervals: int              # intervals in the level's final network
+
+##
+## Coarse-to-fine solve.  Each coarse level solves the problem with times pessimistically rounded to 'factor' units (so its paths
+## stay feasible at the finer scale), and the next level starts from its timepoints, scaled to the finer unit, with a partial MIP
+## start from its commodity paths.  Levels that fail (e.g. time windows closed by the rounding) are skipped.  The final level is the
+## problem itself: kwargs are passed to its IntervalSolver, the coarse levels only share the gap, environment and fixed paths
+##
+def solve_coarse_to_fine(problem: ProblemData, factors=(4, 2), **kwargs) -> tuple[IntervalSolver, list, list[Level]]:
+    coarse_args = {k: v for k,v in kwargs.items() if k in ('gap', 'environment', 'suppress_output', 'algorithm', 'fixed_paths')}
+
+    levels: list[Level] = []
+    timepoints: set[NodeTime] = set()
+    paths = None
+    previous = 1
+
+    for factor in sorted(set(factors) - {1}, reverse=True):
+        solver, info = solve_level(levels, factor, copy.deepcopy(problem).pessimistic_round(factor), scale(timepoints, previous, factor), paths, coarse_args)
+
+        # otherwise the next level starts from the previous level's solution
+        if solver.status:
+            timepoints = {NodeTime(n,t) for i,n,t in solver.timepoints_per_iteration if t != solver.S and t != solver.T}   # not the level's horizon
+            paths = solver.incumbent_solution[0] if solver.incumbent_solution is not None else None
+            previous = factor
+
+    solver, info = solve_level(levels, 1, problem, scale(timepoints, previous, 1), paths, kwargs)
+    return solver, info, levels
+
+def scale(timepoints, factor, new_factor) -> set[NodeTime]:
+    return {NodeTime(n, t * factor / new_factor) for n,t in timepoints}
+
+def solve_level(levels, factor, problem, timepoints, paths, args):
+    t0 = time.time()
+    solver = IntervalSolver(problem, time_points=timepoints or None, **args)
+
+    if paths is not None:
+        solver.set_start(paths)
+
+    info = solver.solve()
+    levels.append(Level(factor, solver.lower_bound, solver.incumbent, info[-1][9] + 1 if info else 0, info[-1][3] if info else 0.0,
+                        time.time() - t0, len(timepoints), len(solver.intervals)))
+
+    logging.getLogger("IntervalSolver").info("level {0}: lb {1}, ub {2}, iterations {3}, time {5:.2f} ({4:.2f})".format(*levels[-1][:6]))
+    return solver, info
@@ -0,0 +1,67 @@
+import logging
+import threading
+from CheckSolution import CheckSolution
+from tools import fork_lock, ForkSafeThread
+
+##
+## Validates the MIP's intermediate solutions while the lower bound MIP runs.  The MIPSOL callback hands each new solution to submit(),
+## and a background thread runs get_inprogress -> get_network_solution -> CheckSolution.validate on it, updating the solver's incumbent.
+## The MIP callback then stops the MIP as soon as the continuous-time gap closes.  Only the latest solution is kept while the thread is
+## busy.  The thread validates with its own environment since Gurobi environments can't be shared between threads, and only while
+## holding fork_lock so fork_map can still fork.  Its LPs aren't recorded in order with the MIP, so it isn't used while recording or replaying
+##
+class IncumbentWorker(object):
+    __slots__ = ['solver', 'checker', 'condition', 'pending', 'stopping', 'thread', 'validated', 'improved']
+
+    def __init__(self, solver, env):
+        self.solver = solver
+        self.checker = CheckSolution(solver, env)
+        self.condition = threading.Condition()
+        self.pending = None
+        self.stopping = False
+        self.validated = 0
+        self.improved = 0
+        self.thread = ForkSafeThread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # from the MIPSOL callback
+    def submit(self, values):
+        with self.condition:
+            self.pending = values
+            self.condition.notify_all()
+
+    # drops any waiting solution and waits for the one being validated, so the solver's state is settled when the MIP returns
+    def close(self):
+        with self.condition:
+            self.pending = None
+            self.stopping = True
+            self.condition.notify_all()
+
+        self.thread.join()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopping:
+                    self.condition.wait()
+
+                if self.pending is None:
+                    return
+
+                values, self.pending = self.pending, None
+
+            try:
+                with fork_lock:
+                    self.validate(values)
+            except Exception:
+                logging.getLogger("IntervalSolver").exception("intermediate solution")
+
+    def validate(self, values):
+        solver = self.solver
+        result = solver.validate_solution(values, self.checker)
+        self.validated += 1
+
+        if result is not None and (solver.incumbent is None or result[0] < solver.incumbent):
+            solver.incumbent_solution = (result[1], result[2], [])    # in-tree variables can't be read during the solve
+            solver.incumbent = result[0]
+            self.improved += 1
@@ -5,16 +5,26 @@ import networkx as nx
 import logging
 import random
 import sys
+import heapq
+import bisect
+import numpy as np
+from typing import NamedTuple
 from gurobipy import Env, GRB, tuplelist, Constr, Var
-from Solver import Solver
+from Solver import Solver, get_env, is_logging
 from operator import itemgetter
 from functools import partial
 from math import ceil, floor
-from tools import partition, TypedDiGraph
+from tools import fork_map, partition, Reachability, TypedDiGraph
 from itertools import pairwise
 from enum import Enum, IntEnum
 from CheckSolution import CheckSolution, SolutionGraphCommodity, SolutionGraphConsolidation, SolutionGraphNode
 from DrawLaTeX import DrawLaTeX
+from Telemetry import Telemetry
+from MemoryMonitor import MemoryMonitor
+from Checkpoint import Checkpoint, CheckpointState
+from IncumbentWorker import IncumbentWorker
+from TimepointThrottle import TimepointThrottle
+from SolveSchedule import SolveSchedule
 from ProblemData import Commodity, NodeInterval, NodeTime, ProblemData, TimedArc
 
 check_count = 0
@@ -58,6 +68,24 @@ MAX_WALK_PATHS = 100
 PRECISION = 2 # decimal places
 
 USE_HEURISTIC_START = True
+HEURISTIC_STARTS = 0    # randomized multi-start runs of the constructive heuristic after the deterministic one (run in parallel when > 1), 0 disables
+HEURISTIC_SEED = 0      # seed of the solver's random number generator, so runs repeat
+
+PARALLEL_DISCOVERY_NODES = 5000  # solution graph size (nodes) before timepoint discovery is spread over worker processes
+DISCOVERY_PROCESSES = None       # None uses all cpus
+
+POOL_SOLUTIONS = 1               # solutions kept in the MIP's pool and checked each iteration (for incumbents and their timepoints)
+POOL_PROCESSES = None            # None uses all cpus
+
+REDUCED_COST_FIXING = False      # fix timed arcs that LP reduced costs show can't be in a solution better than the incumbent
+REDUCED_COST_TOLERANCE = 1e-6    # relative to the incumbent, so the LP's numerical error never fixes an arc
+
+SNAP_TOLERANCE = 0               # new timepoints are snapped onto a node's timepoints this close, or down to a grid this fine (capped at half the node's shortest transit), 0 disables
+TIMEPOINT_BATCH = None           # timepoints added in the first iteration, then adapted to the MIP time (the rest are deferred), None adds them all
+TIMEPOINT_BATCH_TIME = 10        # seconds per MIP the adaptive batch size aims for
+COALESCE_INTERVALS = False       # merge adjacent intervals left with the same arcs by refinement (each timepoint at most once)
+
+VALIDATE_INTERMEDIATE = False    # validate the MIP's intermediate solutions in a background thread, stopping the MIP once the gap closes
 
 ## useful check for exploring solution graph
 def is_node(n: SolutionGraphNode):
@@ -67,18 +95,54 @@ def is_node(n: SolutionGraphNode):
 def quicksum(col):
     return sum(col)
 
+# one randomized run of the constructive heuristic (worker side of IntervalSolver.solve_heuristic_multistart)
+def heuristic_start(solver, seed):
+    return solver.solve_heuristic_lower_bound(True, seed)
+
+# timepoint discovery for one solution component (worker side of IntervalSolver.find_component_timepoints)
+def component_timepoints(state, component):
+    solver, find, solution, cycle = state
+    return getattr(solver, find)(solution, component, cycle)
+
+# validate one pool solution (worker side of IntervalSolver.solve_pool)
+def pool_solution(solver, values):
+    return solver.validate_solution(values, CheckSolution(solver, get_env()))
+
 def round_tuple(t):
     return tuple(map(lambda x: isinstance(x, float) and round(x, PRECISION) or x, t)) if isinstance(t,tuple) else t
 
+# fixed ordering of the x/z variables for bulk solution queries, rebuilt only when the networks change
+class SolutionIndex(NamedTuple):
+    x: list[tuple[int, NodeInterval, NodeInterval]]
+    z: list[tuple[NodeInterval, NodeInterval, set[int]]]
+    vars: list[Var]             # x variables followed by z variables
+    x_k: np.ndarray             # commodity of each x
+    x_n1: np.ndarray            # network node of each x source
+    x_n2: np.ndarray            # network node of each x target
+    x_dispatch: np.ndarray      # x is a dispatch (not holding) arc
+
+# array form of a commodity's timed network for the constructive heuristic, rebuilt only when the networks change
+class HeuristicNetwork(NamedTuple):
+    nodes: list[NodeInterval]
+    source: int
+    target: int
+    order: list[int] | None     # topological order (by interval start time), None if the network has a cycle
+    first: np.ndarray           # out arcs of node i are first[i]:first[i+1]
+    tail: np.ndarray            # source node of each arc
+    head: np.ndarray            # target node of each arc
+    cons: np.ndarray            # consolidation arc of each arc (-1 for holding arcs)
+    var_cost: np.ndarray        # commodity variable cost of each arc
+
 class IntervalSolver(object):
     """Solves time discretized service network design problems using an iterative approach"""
     __slots__ = ['problem', 'model', 'network', 'commodity_shortest_paths', 'shared_shortest_paths', 'S', 'T', 'x', 'z', 'commodities', 'intervals', 'arcs', 'origin_destination', 
                  'constraint_consolidation', 'constraint_flow', 'constraint_cycle' ,'constraint_path_length', 'solution_paths','consolidations', 'fixed_timepoints_model', 'timepoints', 
                  'incumbent', 'lower_bound', 'shouldEnforceCycles', 'fixed_paths','timed_network','cons_network','suppress_output','GAP', 'incumbent_solution','all_paths', 'edge_shortest_path', 
                  'status','timepoints_per_iteration', 'ALGORITHM', 'constraints_user', 'constraints_origin', 'constraints_dest', 'constraints_intree_path', 'constraints_intree', 'var_intree', 
-                 'constraints_holding_offset', 'constraints_holding_enforce', 'constraints_holding_enforce2', 'environment']
+                 'constraints_holding_offset', 'constraints_holding_enforce', 'constraints_holding_enforce2', 'environment', 
+                 'time_window_cache', 'solution_index', 'heuristic_network', 'telemetry', 'memory', 'checkpoint', 'resumed', 'fixed_arcs', 'coalesced', 'snapped', 'throttle', 'schedule', 'random']
 
-    def __init__(self, problem: ProblemData, time_points:set[NodeTime]|None=None, full_solve=True, fixed_paths=[], suppress_output=False, gap=MIP_GAP, algorithm=None, full_discretization=False, full_results_log=None, environment=None):
+    def __init__(self, problem: ProblemData, time_points:set[NodeTime]|None=None, full_solve=True, fixed_paths=[], suppress_output=False, gap=MIP_GAP, algorithm=None, full_discretization=False, full_results_log=None, environment=None, telemetry: Telemetry | None=None, memory: MemoryMonitor | None=None, checkpoint: Checkpoint | None=None, schedule: SolveSchedule | None=None):
         self.problem = problem
         self.commodities = [Commodity(NodeTime(c.a[0], round(c.a[1], PRECISION)), NodeTime(c.b[0], round(c.b[1], PRECISION)), round(c.q, PRECISION)) for c in problem.commodities]
 
@@ -95,6 +159,19 @@ class IntervalSolver(object):
         self.GAP = gap
         self.ALGORITHM = algorithm if algorithm is not None else ALGORITHM
         self.status = False
+        self.time_window_cache: dict[int, tuple[frozenset[tuple[int, int]], dict[int, tuple[float, float]]]] = {}
+        self.solution_index: SolutionIndex | None = None
+        self.heuristic_network: tuple[list[TimedArc], np.ndarray, np.ndarray, list[HeuristicNetwork]] | None = None
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+        self.memory = memory
+        self.checkpoint = checkpoint
+        self.resumed: CheckpointState | None = None
+        self.coalesced: set[NodeTime] = set()
+        self.snapped: set[NodeTime] = set()     # timepoints dropped by snapping, added exactly if found again
+        self.schedule = schedule if schedule is not None else SolveSchedule()
+        self.random = random.Random(HEURISTIC_SEED)
+        self.throttle = TimepointThrottle(TIMEPOINT_BATCH, TIMEPOINT_BATCH_TIME) if TIMEPOINT_BATCH is not None else None
+        self.fixed_arcs: dict[tuple[int | None, int, int], set[TimedArc]] = defaultdict(set)   # (commodity or None for z, n1, n2) -> arcs fixed to 0
 
         # build graph
         self.network = TypedDiGraph[int]()
@@ -122,17 +199,19 @@ class IntervalSolver(object):
         ## 
         #model = self.model = Model("IMCFCNF", env=Env(""))
         #model = self.model = Solver(CPLEX, quiet=False)
-        if environment is None:
-            self.environment = Env("", empty=True)
-            self.environment.setParam('OutputFlag', False)
-            self.environment.start()
-        else:
-            self.environment = environment
+        self.environment = environment if environment is not None else get_env()
 
         model = self.model = Solver(quiet=(not self.fixed_timepoints_model or suppress_output), env=self.environment)
 
-        self.model.set_gap(0.04 if self.ALGORITHM >= algorithm_option.adaptive else gap)
+        self.schedule.start(self, self.ALGORITHM >= algorithm_option.adaptive)
         self.model.set_timelimit(TIMEOUT)
+
+        if POOL_SOLUTIONS > 1:
+            self.model.set_pool(POOL_SOLUTIONS)
+
+        if memory is not None:
+            memory.attach(self.model)
+
         ##model.setParam(GRB.param.TimeLimit, 14400) # 4hr limit
         #self.model.set_threads(1)
 
@@ -269,6 +348,35 @@ class IntervalSolver(object):
             self.timepoints.update(time_points)
             self.add_network_timepoints(time_points)
 
+    # continue a checkpointed solve: the model is rebuilt from the timepoints found so far, and the incumbent, lower bound, time used,
+    # snapped timepoints, fixed arcs, throttle and schedule are restored.  Coalescing starts over on the rebuilt model, which has every timepoint
+    @classmethod
+    def resume(cls, problem: ProblemData, checkpoint: Checkpoint, **kwargs):
+        state = checkpoint.load()
+        solver = cls(problem, time_points=set(NodeTime(n,t) for i,n,t in state.timepoints), checkpoint=checkpoint, **kwargs)
+
+        solver.resumed = state
+        solver.incumbent = state.incumbent
+        solver.incumbent_solution = state.incumbent_solution
+        solver.lower_bound = state.lower_bound
+
+        if state.snapped is not None:
+            solver.snapped = set(state.snapped)
+
+        if state.fixed_arcs:
+            solver.fixed_arcs.update(state.fixed_arcs)
+            solver.fix_refined_arcs([{TimedArc(a1,a2): d['x'] for a1,a2,d in G.edges_data() if 'x' in d} for G in solver.timed_network],
+                                    {TimedArc(a1,a2): d['z'] for a1,a2,d in solver.cons_network.edges_data() if d.get('z') is not None})
+
+        if state.throttle is not None:
+            solver.throttle = state.throttle
+
+        if state.schedule is not None:
+            solver.schedule = state.schedule
+            solver.schedule.resume(solver)
+
+        return solver
+
     ##
     ## testing user cuts
     ##
@@ -592,8 +700,8 @@ class IntervalSolver(object):
             self.status = False
             return info
 
-        variable_gap = True
         iterations = -1
+        mip_time = 0.0
         new_timepoints = set((NodeTime(*tp) for tp in self.timepoints))  # not required, but might be good for testing
         len_timepoints = 0      # used to halt processing if haven't added unique timepoints in a while (hack - this shouldn't happen if my code was good)
         it_timepoints = 0
@@ -602,6 +710,16 @@ class IntervalSolver(object):
         s = CheckSolution(self, self.environment)
         solve_time = 0
 
+        # continue from the checkpoint with the remaining time
+        if self.resumed is not None:
+            iterations = self.resumed.iteration
+            solve_time = self.resumed.solve_time
+            mip_time = self.resumed.mip_time
+            info_time -= self.resumed.total_time
+            start_time -= self.resumed.total_time
+            self.timepoints_per_iteration = list(self.resumed.timepoints)
+            self.telemetry.current = iterations + 1
+
         # output statistics
         logger.info('{0:>3}, {1:>10}, {2:>10}, {3:>7}, {4:>6}, {5:>6}, {6}'.format(*'{0}#,LB,UB,Gap,Time,Solver,Type [TP]'.format('G').split(',')))
 
@@ -612,24 +730,31 @@ class IntervalSolver(object):
                 self.model.update()
                 self.model.write(write_filename + "_" + str(iterations) + ".lp")  # debug the model
 
+            self.schedule.configure(self, iterations, max(0, TIMEOUT - solve_time), mip_time)
             t0 = time.time()
 
-            if USE_HEURISTIC_START:
-                self.model.update()
-                relaxed = self.model.model.relax()
+            with self.telemetry.phase('mip'):
+                if USE_HEURISTIC_START:
+                    self.model.update()
+                    relaxed = self.model.model.relax()
 
-                t0 = time.time()
-                relaxed.optimize()
+                    t0 = time.time()
+                    relaxed.optimize()
 
-                self.lower_bound = float(max(relaxed.objBound, self.lower_bound) if self.lower_bound is not None else relaxed.objBound)
-                self.status = True if relaxed.status in [GRB.status.TIME_LIMIT, GRB.status.INTERRUPTED] and self.incumbent and (self.incumbent - self.lower_bound) < self.incumbent * self.GAP else (relaxed.status == GRB.status.OPTIMAL)
-            else:
-                self.solve_lower_bound()
+                    self.lower_bound = float(max(relaxed.objBound, self.lower_bound) if self.lower_bound is not None else relaxed.objBound)
+                    self.status = True if relaxed.status in [GRB.status.TIME_LIMIT, GRB.status.INTERRUPTED] and self.incumbent and (self.incumbent - self.lower_bound) < self.incumbent * self.GAP else (relaxed.status == GRB.status.OPTIMAL)
+                else:
+                    self.solve_lower_bound()
+
+                    # the schedule's time limit stopped the MIP before it found a solution - finish it (gurobi continues where it stopped)
+                    if self.schedule.limited and self.model.is_timelimit() and self.model.sol_count() == 0:
+                        self.schedule.finish(self)
+                        self.model.set_timelimit(max(0, TIMEOUT - solve_time - (time.time() - t0)))
+                        self.solve_lower_bound()
 
             #self.solve_lower_bound()  # Solve lower bound problem
             solve_time += time.time() - t0
-
-            self.model.set_timelimit(max(0, TIMEOUT - solve_time))
+            mip_time = time.time() - t0
 
             # return if infeasible, time out or interupted
             if not self.status or solve_time > TIMEOUT:
@@ -654,22 +779,22 @@ class IntervalSolver(object):
 
                 self.status = False
                 info.append((self.lower_bound, self.incumbent, time.time()-info_time, solve_time, 0, self.model.NumVars, self.model.NumConstrs, self.model.PresolveNumVars, self.model.PresolveNumConstrs, iterations, ((self.incumbent - self.lower_bound)/self.incumbent) if self.incumbent is not None and self.incumbent > 0 else None)) # track information about the iteration
+                self.telemetry.iteration(iterations, self.lower_bound, self.incumbent, self.model.NumVars, self.model.NumConstrs, 0)
                 return info
 
             using_heuristic = USE_HEURISTIC_START
 
             if using_heuristic:
-                heuristic_objective, heuristic_solution_paths, heuristic_consolidations = self.solve_heuristic_lower_bound(False)
+                with self.telemetry.phase('heuristic'):
+                    heuristic_objective, heuristic_solution_paths, heuristic_consolidations = self.solve_heuristic_lower_bound(False)
 
-                best_obj = heuristic_objective
-                best_sol = (heuristic_solution_paths, heuristic_consolidations)
+                    best_obj = heuristic_objective
+                    best_sol = (heuristic_solution_paths, heuristic_consolidations)
 
-                for run in range(0):
-                    heuristic_objective, heuristic_solution_paths, heuristic_consolidations = self.solve_heuristic_lower_bound(True)
-
-                    if best_obj > heuristic_objective:
-                        best_obj = heuristic_objective
-                        best_sol = (heuristic_solution_paths, heuristic_consolidations)
+                    for heuristic_objective, heuristic_solution_paths, heuristic_consolidations in self.solve_heuristic_multistart(HEURISTIC_STARTS):
+                        if best_obj > heuristic_objective:
+                            best_obj = heuristic_objective
+                            best_sol = (heuristic_solution_paths, heuristic_consolidations)
 
                 self.solution_paths, self.consolidations = best_sol
 
@@ -677,7 +802,8 @@ class IntervalSolver(object):
                     USE_HEURISTIC_START = False
 
             else:
-                self.solution_paths, self.consolidations = self.get_inprogress()
+                with self.telemetry.phase('get_inprogress'):
+                    self.solution_paths, self.consolidations = self.get_inprogress()
 
             # return if we are only doing one iteration
             if self.fixed_timepoints_model:
@@ -685,7 +811,8 @@ class IntervalSolver(object):
                 self.status = True
                 return iterations, len(new_timepoints), solve_time
 
-            solution, cycle = self.get_network_solution()
+            with self.telemetry.phase('get_network_solution'):
+                solution, cycle = self.get_network_solution()
 
             # draw the timepoints if required
             portrait = True
@@ -707,6 +834,7 @@ class IntervalSolver(object):
                 logger.info('\nit: {0}, new tp: {1}, intervals: {2}, vars: {3}, time: {4:.2f} ({5:.2f})\n'.format(iterations, len(new_timepoints), len(self.intervals), len(self.model.getVars()), time.time()-start_time, solve_time))
 
                 self.timepoints.update(new_timepoints)
+                self.telemetry.iteration(iterations, self.lower_bound, self.incumbent, self.model.NumVars, self.model.NumConstrs, 0)
                 break
 
 
@@ -715,18 +843,25 @@ class IntervalSolver(object):
             ##
 
             # switch to default algorithm if we're stuck (hack for bad code)
-            if self.ALGORITHM >= algorithm_option.eclectic and it_timepoints < 2:
-                path_failure, path_length_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = self.find_timepoints_all(solution, cycle)
-            elif self.ALGORITHM >= algorithm_option.multiplex and it_timepoints < 2:
-                path_failure, path_length_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = self.find_timepoints_multiplex(solution, cycle)
-            else:
-                path_failure, path_length_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = self.find_timepoints_default(solution, cycle)
+            with self.telemetry.phase('discovery'):
+                if self.ALGORITHM >= algorithm_option.eclectic and it_timepoints < 2:
+                    find = self.find_timepoints_all
+                elif self.ALGORITHM >= algorithm_option.multiplex and it_timepoints < 2:
+                    find = self.find_timepoints_multiplex
+                else:
+                    find = self.find_timepoints_default
+
+                path_failure, path_length_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = find(solution, cycle)
 
             #path_failure, path_length_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = self.find_timepoints_advanced(solution, cycle)
             #path_failure, path_length_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = self.find_timepoints_simple(solution, cycle)
 
             tp = path_length_timepoints | window_timepoints | cycle_timepoints | mutual_timepoints
 
+            if POOL_SOLUTIONS > 1 and not using_heuristic:
+                with self.telemetry.phase('validate'):
+                    tp |= self.solve_pool(find)
+
             # output statistics
             output = "{0:>3}{2}, {1:10.1f}, ".format(iterations, self.lower_bound, "*" if using_heuristic else "")
 
@@ -736,7 +871,11 @@ class IntervalSolver(object):
             else:
                 # Solve UB LP, check solution costs
                 t0 = time.time()
-                if path_failure or s.validate(self.solution_paths, self.consolidations):
+
+                with self.telemetry.phase('validate'):
+                    valid = path_failure or s.validate(self.solution_paths, self.consolidations)
+
+                if valid:
                     solve_time += time.time() - t0
 
                     if not path_failure:
@@ -756,6 +895,7 @@ class IntervalSolver(object):
 
                         self.timepoints.update(new_timepoints)
                         self.status = True
+                        self.telemetry.iteration(iterations, self.lower_bound, self.incumbent, self.model.NumVars, self.model.NumConstrs, 0)
                         break
 
                     ##
@@ -766,14 +906,7 @@ class IntervalSolver(object):
                     #     pass
 
 
-                    # variable gap for faster solve (turn off if no new time points found)
-                    if self.ALGORITHM >= algorithm_option.adaptive:
-                        if not tp or variable_gap and (self.incumbent - self.lower_bound)*0.25 < self.incumbent * self.GAP:
-                            self.model.set_gap(self.GAP*0.98)
-                            self.model.set_aggressive_cuts() # focus on proving optimality
-                            variable_gap = False
-                        elif variable_gap:
-                            self.model.set_gap(((self.incumbent - self.lower_bound)/self.incumbent * 0.25))
+                    self.schedule.update(self, iterations, bool(tp))
 
             # Stop endless loop - hack for my bad code
             if len(new_timepoints) == len_timepoints:
@@ -839,7 +972,6 @@ class IntervalSolver(object):
                 output += " Endless Loop\n"
                 logger.error(output)
                 self.status = False
-                sys.exit()
                 break
 
 
@@ -855,16 +987,62 @@ class IntervalSolver(object):
             if len(path_length_timepoints-new_timepoints) > 0:
                 output += " P[{0}]".format(len(path_length_timepoints-new_timepoints))
 
+            # timepoints deferred by the throttle are candidates again
+            if self.throttle is not None:
+                tp = (tp | self.throttle.deferred) - new_timepoints
+
+            if SNAP_TOLERANCE > 0:
+                candidates = tp - new_timepoints
+                tp = self.snap_timepoints(candidates)
+                snapped = len(candidates - tp)
+
+                if snapped > 0:
+                    output += " S[{0}]".format(snapped)
+                    self.telemetry.count('snapped_timepoints', snapped)
+
+            if self.throttle is not None and tp:
+                tp = self.throttle.select(solution, iterations, mip_time, tp - new_timepoints, [path_length_timepoints, cycle_timepoints, mutual_timepoints, window_timepoints])
+
+                if self.throttle.deferred:
+                    output += " D[{0}]".format(len(self.throttle.deferred))
+                    self.telemetry.count('deferred_timepoints', len(self.throttle.deferred))
+
             # track information about the iteration
             info.append((self.lower_bound, self.incumbent, time.time()-info_time, solve_time, len(tp - new_timepoints),  self.model.NumVars, self.model.NumConstrs, None, None, iterations, ((self.incumbent - self.lower_bound)/self.incumbent) if self.incumbent is not None and self.incumbent > 0 else None))
 
             if not self.suppress_output:
                 logger.info(output)
 
-            self.add_network_timepoints(tp)
+            added_timepoints = len(tp - new_timepoints)
+
+            if REDUCED_COST_FIXING and self.incumbent is not None:
+                with self.telemetry.phase('reduced_cost'):
+                    self.telemetry.count('fixed_arcs', self.reduced_cost_fixing())
+
+            with self.telemetry.phase('add_timepoints'):
+                self.add_network_timepoints(tp)
+                coalesced = self.coalesce_intervals() if COALESCE_INTERVALS else set()
+
+            self.telemetry.iteration(iterations, self.lower_bound, self.incumbent, self.model.NumVars, self.model.NumConstrs, added_timepoints)
             new_timepoints.update(tp)
+
+            # coalesced timepoints are new again if found again (each is coalesced at most once), and don't count as progress lost
+            if coalesced:
+                self.telemetry.count('coalesced_intervals', len(coalesced))
+                len_timepoints -= len(coalesced & new_timepoints)
+                new_timepoints -= coalesced
+
             self.timepoints_per_iteration.extend((iterations+1, n,t) for n,t in tp)
 
+            if self.checkpoint is not None:
+                self.checkpoint.save(self, iterations, solve_time, time.time() - info_time, mip_time)
+
+            # stop with the current incumbent rather than being killed
+            if self.memory is not None and not self.memory.check(self, iterations):
+                logger.error("{0:>3}, Memory budget exceeded ({1:.0f} MB)".format(iterations, self.memory.snapshots[-1].rss / 1024**2))
+                self.status = False
+                break
+
         info.append((self.lower_bound, self.incumbent, time.time()-info_time, solve_time, 0, self.model.NumVars, self.model.NumConstrs, self.model.PresolveNumVars, self.model.PresolveNumConstrs, iterations,((self.incumbent - self.lower_bound)/self.incumbent) if self.incumbent is not None and self.incumbent > 0 else None)) # track information about the iteration
         return info
 
@@ -900,7 +1078,7 @@ class IntervalSolver(object):
             if self.incumbent is not None and (self.incumbent - self.lower_bound) < self.incumbent * self.GAP:
                 return False # terminate
 
-            if time.time() > last_print + 1:
+            if not self.suppress_output and time.time() > last_print + 1:
                 last_print = time.time()
                 if self.incumbent is not None:
                     sys.stdout.write('{0:7.2%}, {1:7.2%} {2:7.1f}s\r'.format((objbst-objbnd)/objbst, (self.incumbent - self.lower_bound) / self.incumbent, solve_time + time.time() - check_count))
@@ -912,7 +1090,16 @@ class IntervalSolver(object):
         self.model.update()
         #self.model.write('test.lp')
 
-        if self.suppress_output:
+        if VALIDATE_INTERMEDIATE and not is_logging():
+            worker = IncumbentWorker(self, get_env(Threads=1))
+
+            try:
+                self.model.optimize(callback, (self.get_solution_index().vars, worker.submit))
+            finally:
+                worker.close()
+
+            logger.debug("intermediate solutions: {0} validated, {1} improved".format(worker.validated, worker.improved))
+        elif self.suppress_output:
             self.model.optimize()
         else:
             self.model.optimize(callback)
@@ -920,59 +1107,137 @@ class IntervalSolver(object):
         self.lower_bound = max(self.model.objBound(), self.lower_bound) if self.lower_bound is not None else self.model.objBound()
         self.status = True if self.model.is_abort() and self.incumbent and (self.incumbent - self.lower_bound) < self.incumbent * self.GAP else self.model.is_optimal()
 
+        # stopped by the schedule, the best solution is refined as usual
+        if not self.status and self.schedule.limited and self.model.is_timelimit() and self.model.sol_count() > 0:
+            self.status = True
 
-    def solve_heuristic_lower_bound(self, randomize):
-        # process commodities in random order
-        K = list(range(0,len(self.commodities)))
 
-        if randomize:
-            random.shuffle(K)
-        else:
-            K.sort(key=lambda k: self.commodities[k].q, reverse=True)
+    # array form of the timed networks (shared consolidation arcs, then one HeuristicNetwork per commodity)
+    def get_heuristic_network(self):
+        if self.heuristic_network is None:
+            cons_arcs = [TimedArc(a1,a2) for a1,a2 in self.cons_network.edges()]
+            cons_index = {a: i for i,a in enumerate(cons_arcs)}
+            capacity = np.array([self.network.edge_data(a[0][0], a[1][0])['capacity'] for a in cons_arcs], dtype=float)
+            fixed_cost = np.array([self.network.edge_data(a[0][0], a[1][0])['fixed_cost'] for a in cons_arcs], dtype=float)
+            networks = []
 
-        consolidation_network = self.cons_network.copy()
+            for k,G in enumerate(self.timed_network):
+                try:
+                    order = list(nx.lexicographical_topological_sort(G.G, key=lambda n: (n[1], n[2], n[0])))
+                except nx.NetworkXUnfeasible:
+                    order = None
+
+                nodes = order if order is not None else list(G.nodes())
+                position = {n: i for i,n in enumerate(nodes)}
+                arcs = sorted((position[a1], position[a2], a1, a2) for a1,a2 in G.edges())
+
+                networks.append(HeuristicNetwork(nodes=nodes, source=position[self.origin_destination[k].source], target=position[self.origin_destination[k].target],
+                                                 order=list(range(len(nodes))) if order is not None else None,
+                                                 first=np.searchsorted(np.array([a[0] for a in arcs], dtype=np.int64), np.arange(len(nodes) + 1)),
+                                                 tail=np.array([a[0] for a in arcs], dtype=np.int64),
+                                                 head=np.array([a[1] for a in arcs], dtype=np.int64),
+                                                 cons=np.array([cons_index[(a1,a2)] if a1[0] != a2[0] else -1 for _,_,a1,a2 in arcs], dtype=np.int64),
+                                                 var_cost=np.array([self.problem.var_cost[k].get((a1[0],a2[0]), 0.0) * self.commodities[k].q if a1[0] != a2[0] else 0.0 for _,_,a1,a2 in arcs], dtype=float)))
+
+            self.heuristic_network = (cons_arcs, capacity, fixed_cost, networks)
+
+        return self.heuristic_network
+
+    # shortest path (as arc indices) from source to target, a single pass if the network is acyclic otherwise dijkstra
+    def heuristic_shortest_path(self, H: HeuristicNetwork, weight: list[float]) -> list[int]:
+        first, head = H.first.tolist(), H.head.tolist()  # plain lists are faster to index in the loops below
+        dist = [float('inf')] * len(H.nodes)
+        pred = [-1] * len(H.nodes)
+        dist[H.source] = 0.0
+
+        if H.order is not None:
+            for u in H.order[H.source:]:
+                if dist[u] == float('inf'):
+                    continue
 
-        # create a path-graph for each commodity - this will simply be a path if freight does not allow splitting
-        path_graphs = [nx.DiGraph() for k in self.timed_network]
+                for a in range(first[u], first[u+1]):
+                    if dist[u] + weight[a] < dist[head[a]]:
+                        dist[head[a]] = dist[u] + weight[a]
+                        pred[head[a]] = a
+        else:
+            heap = [(0.0, H.source)]
+            done = [False] * len(H.nodes)
 
-        for k in K:
-            commodity_network = self.timed_network[k].copy()
+            while heap:
+                d,u = heapq.heappop(heap)
 
-            for a1,a2,d in commodity_network.edges_data():
-                # holding arcs
-                if a1[0] == a2[0]:
-                    d['weight'] = 0
+                if done[u]:
                     continue
 
-                # dispatch arcs
-                if 'SOLUTION_K' not in consolidation_network.edge_data(a1, a2):
-                    consolidation_network.edge_data(a1, a2)['SOLUTION_K'] = set()
+                done[u] = True
+
+                if u == H.target:
+                    break
+
+                for a in range(first[u], first[u+1]):
+                    if d + weight[a] < dist[head[a]]:
+                        dist[head[a]] = d + weight[a]
+                        pred[head[a]] = a
+                        heapq.heappush(heap, (dist[head[a]], head[a]))
+
+        if dist[H.target] == float('inf'):
+            raise nx.NetworkXNoPath("No path to {0}.".format(H.nodes[H.target]))
 
-                remaining_quantity = sum([self.commodities[sk].q for sk in consolidation_network.edge_data(a1, a2)['SOLUTION_K']]) % self.network.edge_data(a1[0], a2[0])['capacity']
-                consolidation_quantity = (self.commodities[k].q + remaining_quantity) / self.network.edge_data(a1[0], a2[0])['capacity']
-                consolidation_cost = self.network.edge_data(a1[0], a2[0])['fixed_cost'] * (ceil(consolidation_quantity) - (1 if remaining_quantity > 0 else 0))
+        # walk back from the target
+        path = []
+        n = H.target
 
-                d['weight'] = self.problem.var_cost[k].get((a1[0],a2[0]), 0.0) * self.commodities[k].q + consolidation_cost + 0.001 # small constant to prevent cycles
+        while n != H.source:
+            path.append(pred[n])
+            n = int(H.tail[pred[n]])
 
+        return path[::-1]
 
-            ## update consolidation network cost
-            #for a1,a2,d in consolidation_network.edges(data=True):
-            #    if 'SOLUTION_K' not in d:
-            #        d['SOLUTION_K'] = set()
+    # best of several randomized runs of the heuristic, run in parallel
+    def solve_heuristic_multistart(self, runs):
+        if runs <= 0:
+            return []
+
+        best = min(fork_map(heuristic_start, self, [self.random.randrange(2**32) for _ in range(runs)]), key=itemgetter(0))
+        return [best]
+
+    def solve_heuristic_lower_bound(self, randomize, seed=None):
+        # process commodities in random order
+        K = list(range(0,len(self.commodities)))
+
+        if randomize:
+            (random.Random(seed) if seed is not None else self.random).shuffle(K)
+        else:
+            K.sort(key=lambda k: self.commodities[k].q, reverse=True)
 
-            #    remaining_quantity = sum([self.commodities[sk]['q'] for sk in d['SOLUTION_K']]) % self.network[a1[0]][a2[0]]['capacity']
-            #    consolidation_quantity = (self.commodities[k]['q'] + remaining_quantity) / self.network[a1[0]][a2[0]]['capacity']
-            #    consolidation_cost = self.network[a1[0]][a2[0]]['fixed_cost'] * (ceil(consolidation_quantity) - (1 if remaining_quantity > 0 else 0))
+        cons_arcs, capacity, fixed_cost, networks = self.get_heuristic_network()
 
-            #    d['weight'] = self.network[a1[0]][a2[0]]['var_cost'] * self.commodities[k]['q'] + consolidation_cost
+        # consolidated quantity and commodities on each consolidation arc, kept up to date as paths are chosen
+        quantity = np.zeros(len(cons_arcs))
+        solution_K: list[set[int]] = [set() for _ in cons_arcs]
 
-            # find cheapest path
-            path = nx.shortest_path(commodity_network.G, source=self.origin_destination[k].source, target=self.origin_destination[k].target, weight='weight')
+        # create a path-graph for each commodity - this will simply be a path if freight does not allow splitting
+        path_graphs = [nx.DiGraph() for k in self.timed_network]
 
-            # update consolidation network solution
-            for arc in pairwise(path):
-                if arc[0][0] != arc[1][0]:
-                    consolidation_network.edge_data(arc[0], arc[1])['SOLUTION_K'].add(k)
+        for k in K:
+            H = networks[k]
+            q = self.commodities[k].q
+            dispatch = H.cons >= 0
+            c = H.cons[dispatch]
+
+            # holding arcs are free, dispatch arcs pay for any extra capacity they need
+            remaining_quantity = np.mod(quantity[c], capacity[c])
+            consolidation_cost = fixed_cost[c] * (np.ceil((q + remaining_quantity) / capacity[c]) - (remaining_quantity > 0))
+
+            weight = np.zeros(len(H.head))
+            weight[dispatch] = H.var_cost[dispatch] + consolidation_cost + 0.001 # small constant to prevent cycles
+
+            # find cheapest path, and update consolidation network solution
+            for a in self.heuristic_shortest_path(H, weight.tolist()):
+                if H.cons[a] >= 0:
+                    arc = cons_arcs[H.cons[a]]
+                    quantity[H.cons[a]] += q
+                    solution_K[H.cons[a]].add(k)
                     path_graphs[k].add_edge(arc[0][0], arc[1][0])
 
 
@@ -982,25 +1247,17 @@ class IntervalSolver(object):
         arcs = dict()
         cons = dict()
 
-        for a1,a2,d in consolidation_network.edges_data():
-            quantity = sum([self.commodities[sk].q for sk in d['SOLUTION_K']])
-
-            consolidation_cost = float(self.network.edge_data(a1[0], a2[0])['fixed_cost']) * ceil(quantity / float(self.network.edge_data(a1[0], a2[0])['capacity']))
-            variable_cost = sum([self.commodities[sk].q * self.problem.var_cost[sk].get((a1[0],a2[0]),0) for sk in d['SOLUTION_K']])
+        for (a1,a2),K_,q in zip(cons_arcs, solution_K, quantity.tolist()):
+            consolidation_cost = float(self.network.edge_data(a1[0], a2[0])['fixed_cost']) * ceil(q / float(self.network.edge_data(a1[0], a2[0])['capacity']))
+            variable_cost = sum([self.commodities[sk].q * self.problem.var_cost[sk].get((a1[0],a2[0]),0) for sk in K_])
 
             total += variable_cost + consolidation_cost
 
-            cons[(a1,a2)] = list(d['SOLUTION_K'])
+            cons[(a1,a2)] = list(K_)
 
-            for sk in d['SOLUTION_K']:
+            for sk in K_:
                 arcs[(sk, a1, a2)] = 1
 
-        # remove any subtours that don't involve origin/destination
-        for k,PG in enumerate(path_graphs):
-            for subtour in list(nx.weakly_connected_components(PG)):
-                if self.commodities[k].a[0] not in subtour:
-                    PG.remove_nodes_from(subtour)
-
         cons = {arc:frozenset(v) for arc,v in cons.items() if len(v) > 0}
 
         # associate consolidations to path_graph
@@ -1070,6 +1327,7 @@ class IntervalSolver(object):
 
         G = solution
         K = set(n[0] for n in G.nodes() if isinstance(n, SolutionGraphCommodity))
+        reach = G.reachability() if cycle else None
                 
         ## 3. Check for cycle
         cycle_window = []
@@ -1091,9 +1349,9 @@ class IntervalSolver(object):
             # add timepoints from origin to cycle start
             for k in cycle_K:
                 origin = self.commodities[k].a
-                enter = sorted([x for x in c if G.has_path(SolutionGraphCommodity(k,origin[0]), x)], key=lambda x: nx.shortest_path_length(G.G, (k,origin[0]), x))[0]
+                enter = sorted([x for x in c if reach.has_path(SolutionGraphCommodity(k,origin[0]), x)], key=lambda x: nx.shortest_path_length(G.G, (k,origin[0]), x))[0]
 
-                for p in pairwise(self.get_path(G, SolutionGraphCommodity(k,origin[0]), enter)):
+                for p in pairwise(self.get_path(G, SolutionGraphCommodity(k,origin[0]), enter, reach)):
                     cycle_timepoints.add(NodeTime(p[1][1] if isinstance(p[1], SolutionGraphCommodity) else p[1][0][0], G.node_data(p[1])['tw'][0]))
 
             for n in itertools.cycle(pairwise(list(map(itemgetter(1), filter(is_node, c[i:] + c[:i]))) + [start_node[1]])):
@@ -1122,13 +1380,44 @@ class IntervalSolver(object):
         return path_failure is not None, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints
 
     ##
-    ## uses theorems from paper, preferring single timepoints.
+    ## runs a find_component_timepoints_* method on each weakly connected component of the solution and merges the results.
+    ## components without a cycle are independent, so large solutions spread them over worker processes.  A component with a cycle
+    ## depends on whether an earlier component found cycle timepoints, so those run in order
     ##
-    def find_timepoints_multiplex(self, solution: TypedDiGraph[SolutionGraphNode], cycle):
+    def find_component_timepoints(self, find: str, solution: TypedDiGraph[SolutionGraphNode], cycle) -> tuple[bool, set[NodeTime], set[NodeTime], set[NodeTime], set[NodeTime]]:
+        components = list(nx.weakly_connected_components(solution.G))
+        cycle_nodes = set(n for c in cycle for n in c)
+        acyclic = [G_ for G_ in components if cycle_nodes.isdisjoint(G_)]
+        results = []
+
+        for G_ in components:
+            if not cycle_nodes.isdisjoint(G_):
+                results.append(getattr(self, find)(solution, G_, cycle, any(r[3] for r in results)))
+
+        if len(acyclic) > 1 and len(solution.nodes()) >= PARALLEL_DISCOVERY_NODES:
+            results += fork_map(component_timepoints, (self, find, solution, cycle), acyclic, DISCOVERY_PROCESSES)
+        else:
+            results += [getattr(self, find)(solution, G_, cycle) for G_ in acyclic]
+
+        path_failure = False
         path_timepoints: set[NodeTime] = set()
         window_timepoints: set[NodeTime] = set()
         cycle_timepoints: set[NodeTime] = set()
         mutual_timepoints: set[NodeTime] = set()
+
+        for failure, path_tp, window_tp, cycle_tp, mutual_tp in results:
+            path_failure = path_failure or failure
+            path_timepoints.update(path_tp)
+            window_timepoints.update(window_tp)
+            cycle_timepoints.update(cycle_tp)
+            mutual_timepoints.update(mutual_tp)
+
+        return path_failure, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints
+
+    ##
+    ## uses theorems from paper, preferring single timepoints.
+    ##
+    def find_timepoints_multiplex(self, solution: TypedDiGraph[SolutionGraphNode], cycle):
         path_failure = False
 
         # check if path is too long
@@ -1139,227 +1428,245 @@ class IntervalSolver(object):
                 break
 
         ## Treat subgraphs separately
-        for G_ in nx.weakly_connected_components(solution.G):
-            G = solution.subgraph(G_)
-            K = set(n[0] for n in G.nodes() if isinstance(n, SolutionGraphCommodity))
-                
-            ## 1. Check for cycle
-            cycle_window = []
+        _, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints = self.find_component_timepoints('find_component_timepoints_multiplex', solution, cycle)
 
-            for c in cycle:
-                # get all commodities explicitly in cycle (ignore incidental commodities)
-                cycle_K = set(n[0] for n in c if is_node(n))
+        return path_failure, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints
 
-                if  not (cycle_K & K):
-                    continue
+    # cycle_found isn't used, multiplex processes every cycle
+    def find_component_timepoints_multiplex(self, solution: TypedDiGraph[SolutionGraphNode], G_: set[SolutionGraphNode], cycle, cycle_found=False):
+        path_timepoints: set[NodeTime] = set()
+        window_timepoints: set[NodeTime] = set()
+        cycle_timepoints: set[NodeTime] = set()
+        mutual_timepoints: set[NodeTime] = set()
 
-                # want to start at earliest point in cycle, and rewrite cycle to match
-                tw, start_node,i = sorted([(solution.node_data(n)['tw'], n, i) for i,n in enumerate(c) if is_node(n)])[0]
-                t = tw[0]
+        G = solution.subgraph(G_)
+        K = set(n[0] for n in G.nodes() if isinstance(n, SolutionGraphCommodity))
+        reach = G.reachability()
+            
+        ## 1. Check for cycle
+        cycle_window = []
 
-                # paper uses this as a stopping criteria for cycle timepoints
-                cycle_length = sum([self.transit(*a) for a in pairwise([n[1] for n in c if is_node(n)])])
-                M = ceil((self.commodities[start_node[0]].b[1] - t) / cycle_length) * cycle_length + t
+        for c in cycle:
+            # get all commodities explicitly in cycle (ignore incidental commodities)
+            cycle_K = set(n[0] for n in c if is_node(n))
 
-                cycle_window.append(c[0])
+            if  not (cycle_K & K):
+                continue
 
-                # add timepoints from origin to cycle start
-                for k in cycle_K:
-                    origin = self.commodities[k].a
-                    enter = sorted([x for x in c if G.has_path(SolutionGraphCommodity(k,origin[0]), x)], key=lambda x: nx.shortest_path_length(G.G, (k,origin[0]), x))[0]
+            # want to start at earliest point in cycle, and rewrite cycle to match
+            tw, start_node,i = sorted([(solution.node_data(n)['tw'], n, i) for i,n in enumerate(c) if is_node(n)])[0]
+            t = tw[0]
 
-                    for p in pairwise(self.get_path(G, SolutionGraphCommodity(k,origin[0]), enter)):
-                        cycle_timepoints.add(NodeTime(p[1][1] if isinstance(p[1], SolutionGraphCommodity) else p[1][0][0], G.node_data(p[1])['tw'][0]))
+            # paper uses this as a stopping criteria for cycle timepoints
+            cycle_length = sum([self.transit(*a) for a in pairwise([n[1] for n in c if is_node(n)])])
+            M = ceil((self.commodities[start_node[0]].b[1] - t) / cycle_length) * cycle_length + t
 
-                for n in itertools.cycle(pairwise(list(map(itemgetter(1), filter(is_node, c[i:] + c[:i]))) + [start_node[1]])):
-                    cycle_timepoints.add(NodeTime(n[0], t))
+            cycle_window.append(c[0])
 
-                    # stop if past time horizon or if one commodity has reached it's end
-                    if t > self.T or t > M:
-                        break
+            # add timepoints from origin to cycle start
+            for k in cycle_K:
+                origin = self.commodities[k].a
+                enter = sorted([x for x in c if reach.has_path(SolutionGraphCommodity(k,origin[0]), x)], key=lambda x: nx.shortest_path_length(G.G, (k,origin[0]), x))[0]
 
-                    t += self.transit(*n)
+                for p in pairwise(self.get_path(G, SolutionGraphCommodity(k,origin[0]), enter, reach)):
+                    cycle_timepoints.add(NodeTime(p[1][1] if isinstance(p[1], SolutionGraphCommodity) else p[1][0][0], G.node_data(p[1])['tw'][0]))
 
-            ## 4. Generic case
-            # Note: if cycle then 'valid' is not set and is ignored
-            # get all commodities with invalid destination time (ignoring already processed items)
-            tails = [last for last in (SolutionGraphCommodity(k,self.commodities[k].b[0]) for k in K) 
-                        if 'valid' in solution.node_data(last) and not solution.node_data(last)['valid']]
+            for n in itertools.cycle(pairwise(list(map(itemgetter(1), filter(is_node, c[i:] + c[:i]))) + [start_node[1]])):
+                cycle_timepoints.add(NodeTime(n[0], t))
 
-            for t in tails:
-                for r,path in self.walks(G, t, False):
-                    if t[0] == r[0]:
-                        path_timepoints.update(self.get_network_timepoints(solution, G, path, True))
-                    else:
-                        mutual_timepoints.update(self.get_network_timepoints(solution, G, path, True))
+                # stop if past time horizon or if one commodity has reached it's end
+                if t > self.T or t > M:
+                    break
 
-        return path_failure, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints
+                t += self.transit(*n)
+
+        ## 4. Generic case
+        # Note: if cycle then 'valid' is not set and is ignored
+        # get all commodities with invalid destination time (ignoring already processed items)
+        tails = [last for last in (SolutionGraphCommodity(k,self.commodities[k].b[0]) for k in K) 
+                    if 'valid' in solution.node_data(last) and not solution.node_data(last)['valid']]
+
+        for t in tails:
+            for r,path in self.walks(G, t, False):
+                if t[0] == r[0]:
+                    path_timepoints.update(self.get_network_timepoints(solution, G, path, True))
+                else:
+                    mutual_timepoints.update(self.get_network_timepoints(solution, G, path, True))
+
+        return False, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints
 
     ##
     ## uses all tricks to get 'best' timepoints to add
     ##
     def find_timepoints_all(self, solution: TypedDiGraph[SolutionGraphNode], cycle) -> tuple[bool, set[NodeTime], set[NodeTime], set[NodeTime], set[NodeTime]]:
+        ## Treat subgraphs separately
+        return self.find_component_timepoints('find_component_timepoints_all', solution, cycle)
+
+    # cycle_found: an earlier component found cycle timepoints
+    def find_component_timepoints_all(self, solution: TypedDiGraph[SolutionGraphNode], G_: set[SolutionGraphNode], cycle, cycle_found=False) -> tuple[bool, set[NodeTime], set[NodeTime], set[NodeTime], set[NodeTime]]:
         path_timepoints: set[NodeTime] = set()
         window_timepoints: set[NodeTime] = set()
         cycle_timepoints: set[NodeTime] = set()
         mutual_timepoints: set[NodeTime] = set()
         path_failure = False
 
-        ## Treat subgraphs separately
-        for G_ in nx.weakly_connected_components(solution.G):
-            G = solution.subgraph(G_)
-            K = set(n[0] for n in G.nodes() if isinstance(n, SolutionGraphCommodity))
-        
-            ## 1. Path length violation, find if there is a single timepoint fix
-            path_fail_K: set[int] = set()  # keep track of commodities that fail path length
+        G = solution.subgraph(G_)
+        K = set(n[0] for n in G.nodes() if isinstance(n, SolutionGraphCommodity))
+        reach = G.reachability()
+    
+        ## 1. Path length violation, find if there is a single timepoint fix
+        path_fail_K: set[int] = set()  # keep track of commodities that fail path length
 
-            for k in K:
-                tw = solution.node_data(SolutionGraphCommodity(k, self.commodities[k].b[0]))['tw']
+        for k in K:
+            tw = solution.node_data(SolutionGraphCommodity(k, self.commodities[k].b[0]))['tw']
 
-                # check if path is too long
-                if tw[0] > tw[1]:
-                    path_failure = True
+            # check if path is too long
+            if tw[0] > tw[1]:
+                path_failure = True
 
-                    # check for single point (theorem)
-                    tp = self.find_path_timepoint(k)
-                    
-                    if tp is not None:
-                        path_timepoints.add(tp)
-                        path_fail_K.add(k)
+                # check for single point (theorem)
+                tp = self.find_path_timepoint(k)
+                
+                if tp is not None:
+                    path_timepoints.add(tp)
+                    path_fail_K.add(k)
+
+        ## 2. Disjoint time window for two commodities, find if there is a single timepoint fix
+        window = []
+        first_failed_consolidation = []
+
+        # find first broken TW consolidation for each commodity
+        commodity_failed_consolidation = {k: next((n for n in self.get_path(G, SolutionGraphCommodity(k, self.commodities[k].a[0]), SolutionGraphCommodity(k,self.commodities[k].b[0]), reach)
+                                                     if isinstance(n, SolutionGraphConsolidation) and solution.node_data(n)['tw'][1] < solution.node_data(n)['tw'][0]), None)
+                                            for k in (K-path_fail_K)}
+
+        # remove downstream consolidations, ignoring any path length violations
+        for k,cons in commodity_failed_consolidation.items():
+            if cons is not None and not any(reach.has_path(n, cons) for n in first_failed_consolidation) and not any(reach.has_path(SolutionGraphCommodity(i,self.commodities[i].a[0]), cons) for i in path_fail_K):
+                first_failed_consolidation = [cons] + [n for n in first_failed_consolidation if not reach.has_path(cons, n)]
+
+        # find if any consolidations breaks with a single timepoint (theorem)
+        for cons in first_failed_consolidation:
+            n1,n2 = cons[0]
+
+            # sort by smallest gap, this way it attempts to split the consolidation commodities more evenly (and have greater effect)
+            for k1,k2 in sorted(itertools.permutations(cons.commodities, 2), key=lambda x: abs(G.node_data(SolutionGraphCommodity(x[0],n1))['tw'][0]-G.node_data(SolutionGraphCommodity(x[1],n1))['tw'][1]), reverse=False):
+                tp = self.find_disjoint_timepoint(k1, k2, n1, n2)
+
+                if tp is not None:
+                    window_timepoints.add(tp)
+                    window.append(cons)
+                    break
 
-            ## 2. Disjoint time window for two commodities, find if there is a single timepoint fix
-            window = []
-            first_failed_consolidation = []
+        ## Add more - if some of the 'upstream' consolidations couldn't be broken with single point, try a little further downstream!
+        for k in sorted(K-path_fail_K, key=lambda k: self.commodities[k].q, reverse=True):
+            cons = commodity_failed_consolidation[k]
 
-            # find first broken TW consolidation for each commodity
-            commodity_failed_consolidation = {k: next((n for n in self.get_path(G, SolutionGraphCommodity(k, self.commodities[k].a[0]), SolutionGraphCommodity(k,self.commodities[k].b[0]))
-                                                         if isinstance(n, SolutionGraphConsolidation) and solution.node_data(n)['tw'][1] < solution.node_data(n)['tw'][0]), None)
-                                                for k in (K-path_fail_K)}
+            if cons is None or any(reach.has_path(n, cons) for n in window):
+                continue
 
-            # remove downstream consolidations, ignoring any path length violations
-            for k,cons in commodity_failed_consolidation.items():
-                if cons is not None and not any(G.has_path(n, cons) for n in first_failed_consolidation) and not any(G.has_path(SolutionGraphCommodity(i,self.commodities[i].a[0]), cons) for i in path_fail_K):
-                    first_failed_consolidation = [cons] + [n for n in first_failed_consolidation if not G.has_path(cons, n)]
+            n1,n2 = cons[0]
 
-            # find if any consolidations breaks with a single timepoint (theorem)
-            for cons in first_failed_consolidation:
-                n1,n2 = cons[0]
+            for k2 in sorted(cons[1]-set([k]), key=lambda k2: abs(G.node_data(SolutionGraphCommodity(k,n1))['tw'][0]-G.node_data(SolutionGraphCommodity(k2,n1))['tw'][1]), reverse=True):
+                tp = self.find_disjoint_timepoint(k, k2, n1, n2) or self.find_disjoint_timepoint(k2, k, n1, n2)
 
-                # sort by smallest gap, this way it attempts to split the consolidation commodities more evenly (and have greater effect)
-                for k1,k2 in sorted(itertools.permutations(cons.commodities, 2), key=lambda x: abs(G.node_data(SolutionGraphCommodity(x[0],n1))['tw'][0]-G.node_data(SolutionGraphCommodity(x[1],n1))['tw'][1]), reverse=False):
-                    tp = self.find_disjoint_timepoint(k1, k2, n1, n2)
+                if tp is not None:
+                    window_timepoints.add(tp)
+                    window.append(cons)
+                    break
+    
+    
+        ## 3. Check for cycle
+        cycle_window = []
 
-                    if tp is not None:
-                        window_timepoints.add(tp)
-                        window.append(cons)
-                        break
+        for c in cycle:
+            # get all commodities explicitly in cycle (ignore incidental commodities)
+            cycle_K = set(n[0] for n in c if is_node(n))
 
-            ## Add more - if some of the 'upstream' consolidations couldn't be broken with single point, try a little further downstream!
-            for k in sorted(K-path_fail_K, key=lambda k: self.commodities[k].q, reverse=True):
-                cons = commodity_failed_consolidation[k]
+            # ignore any node that is already connected to an invalid path or TW consolidation
+            if  not (cycle_K & K) or any(reach.has_path(n, c[0]) for n in window) or any(reach.has_path(SolutionGraphCommodity(k, self.commodities[k].a[0]), c[0]) for k in path_fail_K):
+                continue
 
-                if cons is None or any(G.has_path(n, cons) for n in window):
+            ### check to see if we can break cycle by simply TW
+            for cons in c:
+                if is_node(cons):
                     continue
 
                 n1,n2 = cons[0]
 
-                for k2 in sorted(cons[1]-set([k]), key=lambda k2: abs(G.node_data(SolutionGraphCommodity(k,n1))['tw'][0]-G.node_data(SolutionGraphCommodity(k2,n1))['tw'][1]), reverse=True):
-                    tp = self.find_disjoint_timepoint(k, k2, n1, n2) or self.find_disjoint_timepoint(k2, k, n1, n2)
+                # find if this commodity breaks this consolidation with a single timepoint (theorem)
+                for k1,k2 in sorted(itertools.permutations(cons[1] & cycle_K, 2), key=lambda x: abs(G.node_data(SolutionGraphCommodity(x[0],n1))['tw'][0]-G.node_data(SolutionGraphCommodity(x[1],n1))['tw'][1]), reverse=False):
+                    tp = self.find_disjoint_timepoint(k1, k2, n1, n2) or self.find_disjoint_timepoint(k1, k2, n1, n2)
 
                     if tp is not None:
-                        window_timepoints.add(tp)
-                        window.append(cons)
+                        cycle_timepoints.add(tp)
+                        cycle_window.append(cons)
                         break
-        
-        
-            ## 3. Check for cycle
-            cycle_window = []
 
-            for c in cycle:
-                # get all commodities explicitly in cycle (ignore incidental commodities)
-                cycle_K = set(n[0] for n in c if is_node(n))
+            if cycle_timepoints or cycle_found:
+                break
 
-                # ignore any node that is already connected to an invalid path or TW consolidation
-                if  not (cycle_K & K) or any(solution.has_path(n, c[0]) for n in window) or any(solution.has_path(SolutionGraphCommodity(k, self.commodities[k].a[0]), c[0]) for k in path_fail_K):
-                    continue
+            ### couldn't break with TW timepoint, so use generic method instead
+            # want to start at earliest point in cycle, and rewrite cycle to match
+            tw, start_node,i = sorted([(solution.node_data(n)['tw'], n[1], i) for i,n in enumerate(c) if is_node(n)])[0]
+            t = tw[0]
 
-                ### check to see if we can break cycle by simply TW
-                for cons in c:
-                    if is_node(cons):
-                        continue
+            cycle_window.append(c[0])
 
-                    n1,n2 = cons[0]
+            # add timepoints from origin to cycle start
+            for k in cycle_K:
+                origin = self.commodities[k].a
+                enter = sorted([x for x in c if reach.has_path(SolutionGraphCommodity(k,origin[0]), x)], key=lambda x: nx.shortest_path_length(G.G, (k,origin[0]), x))[0]
 
-                    # find if this commodity breaks this consolidation with a single timepoint (theorem)
-                    for k1,k2 in sorted(itertools.permutations(cons[1] & cycle_K, 2), key=lambda x: abs(G.node_data(SolutionGraphCommodity(x[0],n1))['tw'][0]-G.node_data(SolutionGraphCommodity(x[1],n1))['tw'][1]), reverse=False):
-                        tp = self.find_disjoint_timepoint(k1, k2, n1, n2) or self.find_disjoint_timepoint(k1, k2, n1, n2)
+                for p in pairwise(self.get_path(G, SolutionGraphCommodity(k,origin[0]), enter, reach)):
+                    cycle_timepoints.add(NodeTime(p[1][1] if isinstance(p[1], SolutionGraphCommodity) else p[1][0][0], G.node_data(p[1])['tw'][0]))
 
-                        if tp is not None:
-                            cycle_timepoints.add(tp)
-                            cycle_window.append(cons)
-                            break
+            for n in itertools.cycle(pairwise(list(map(itemgetter(1), filter(is_node, c[i:] + c[:i]))) + [start_node])):
+                cycle_timepoints.add(NodeTime(n[0], t))
 
-                if cycle_timepoints:
+                # stop if past time horizon or if one commodity has reached it's end
+                if t > self.T or [k for k in cycle_K if t + self.shortest_path(k, n[0], self.commodities[k].b[0]) > self.commodities[k].b[1]]:
                     break
 
-                ### couldn't break with TW timepoint, so use generic method instead
-                # want to start at earliest point in cycle, and rewrite cycle to match
-                tw, start_node,i = sorted([(solution.node_data(n)['tw'], n[1], i) for i,n in enumerate(c) if is_node(n)])[0]
-                t = tw[0]
-
-                cycle_window.append(c[0])
-
-                # add timepoints from origin to cycle start
-                for k in cycle_K:
-                    origin = self.commodities[k].a
-                    enter = sorted([x for x in c if G.has_path(SolutionGraphCommodity(k,origin[0]), x)], key=lambda x: nx.shortest_path_length(G.G, (k,origin[0]), x))[0]
-
-                    for p in pairwise(self.get_path(G, SolutionGraphCommodity(k,origin[0]), enter)):
-                        cycle_timepoints.add(NodeTime(p[1][1] if isinstance(p[1], SolutionGraphCommodity) else p[1][0][0], G.node_data(p[1])['tw'][0]))
-
-                for n in itertools.cycle(pairwise(list(map(itemgetter(1), filter(is_node, c[i:] + c[:i]))) + [start_node])):
-                    cycle_timepoints.add(NodeTime(n[0], t))
-
-                    # stop if past time horizon or if one commodity has reached it's end
-                    if t > self.T or [k for k in cycle_K if t + self.shortest_path(k, n[0], self.commodities[k].b[0]) > self.commodities[k].b[1]]:
-                        break
-
-                    t += self.transit(*n)
+                t += self.transit(*n)
 
-            ## 4. Generic case
-            # Note: if cycle then 'valid' is not set and is ignored
-            # get all commodities with invalid destination time (ignoring already processed items)
-            tails = [last for last in (SolutionGraphCommodity(k,self.commodities[k].b[0]) for k in K) 
-                        if 'valid' in solution.node_data(last) and not solution.node_data(last)['valid'] and 
-                            not any(solution.has_path(w, last) for w in window) and 
-                            not any(solution.has_path(SolutionGraphCommodity(kp, self.commodities[kp].a[0]), last) for kp in path_fail_K)]
+        ## 4. Generic case
+        # Note: if cycle then 'valid' is not set and is ignored
+        # get all commodities with invalid destination time (ignoring already processed items)
+        tails = [last for last in (SolutionGraphCommodity(k,self.commodities[k].b[0]) for k in K) 
+                    if 'valid' in solution.node_data(last) and not solution.node_data(last)['valid'] and 
+                        not any(reach.has_path(w, last) for w in window) and 
+                        not any(reach.has_path(SolutionGraphCommodity(kp, self.commodities[kp].a[0]), last) for kp in path_fail_K)]
 
-            for t in tails:
-                for r, path in self.walks(G, t, False):
-                    if t[0] == r[0]:
-                        path_timepoints.update(self.get_network_timepoints(solution, G, path))
-                    else:
-                        mutual_timepoints.update(self.get_network_timepoints(solution, G, path))
+        for t in tails:
+            for r, path in self.walks(G, t, False):
+                if t[0] == r[0]:
+                    path_timepoints.update(self.get_network_timepoints(solution, G, path))
+                else:
+                    mutual_timepoints.update(self.get_network_timepoints(solution, G, path))
 
-                ###
-                ### Testing: add all shortest path timepoints for failed commodities
-                ###
-                #c = self.commodities[t[0]]
-                #tmp = c['a'][1]
+            ###
+            ### Testing: add all shortest path timepoints for failed commodities
+            ###
+            #c = self.commodities[t[0]]
+            #tmp = c['a'][1]
 
-                #for n1, n2 in pairwise(nx.shortest_path(self.network, c['a'][0], c['b'][0], weight='weight')):
-                #    path_timepoints.add((n1, tmp))
-                #    tmp += self.transit(n1,n2)
-                #path_timepoints.add((c['b'][0], tmp))
+            #for n1, n2 in pairwise(nx.shortest_path(self.network, c['a'][0], c['b'][0], weight='weight')):
+            #    path_timepoints.add((n1, tmp))
+            #    tmp += self.transit(n1,n2)
+            #path_timepoints.add((c['b'][0], tmp))
 
         return path_failure, path_timepoints, window_timepoints, cycle_timepoints, mutual_timepoints
 
     ##
     ## Gets the shortest path between 2 nodes, while prioritizing the visited commodities
     ##
-    def get_path(self, G: TypedDiGraph[SolutionGraphNode], r: SolutionGraphCommodity, t: SolutionGraphNode):
+    def get_path(self, G: TypedDiGraph[SolutionGraphNode], r: SolutionGraphCommodity, t: SolutionGraphNode, reach: Reachability[SolutionGraphNode] | None = None):
         yield r
 
+        if reach is None:
+            reach = G.reachability()
+
         def prioritize_commodity(x):
             if is_node(x):
                 if x.commodity in t.commodities:
@@ -1374,7 +1681,7 @@ class IntervalSolver(object):
         # follow first and last commodity as much as possible
         while n != t:
             arcs = G.out_edges(n)
-            n = sorted([a[1] for a in arcs if G.has_path(a[1], t)], key=prioritize_commodity)[0]
+            n = sorted([a[1] for a in arcs if reach.has_path(a[1], t)], key=prioritize_commodity)[0]
             yield n
     
     ##
@@ -1545,48 +1852,57 @@ class IntervalSolver(object):
         return result
 
 
-    def get_inprogress(self):
-        x = [(k,(a1,a2),d['x']) for k,G in enumerate(self.timed_network) for a1,a2,d in G.edges_data() if 'x' in d]
-        z = [(a1,a2,z['z'],z['K']) for a1,a2,z in self.cons_network.edges_data() if z['z'] is not None]
+    # variable ordering used to read the solution in bulk
+    def get_solution_index(self) -> SolutionIndex:
+        if self.solution_index is None:
+            x = [(k,a1,a2,d['x']) for k,G in enumerate(self.timed_network) for a1,a2,d in G.edges_data() if 'x' in d]
+            z = [(a1,a2,d['K'],d['z']) for a1,a2,d in self.cons_network.edges_data() if d['z'] is not None]
 
-        vars = self.model.vals(list(map(itemgetter(2), x + z)))
+            self.solution_index = SolutionIndex(x=[t[:3] for t in x], z=[t[:3] for t in z], vars=[t[3] for t in x + z],
+                                                x_k=np.array([k for k,a1,a2,_ in x], dtype=np.int64),
+                                                x_n1=np.array([a1[0] for k,a1,a2,_ in x], dtype=np.int64),
+                                                x_n2=np.array([a2[0] for k,a1,a2,_ in x], dtype=np.int64),
+                                                x_dispatch=np.array([a1[0] != a2[0] for k,a1,a2,_ in x], dtype=bool))
+
+        return self.solution_index
+
+    # values: of the index variables, for a solution other than the model's (e.g. from a callback)
+    def get_inprogress(self, values=None):
+        index = self.get_solution_index()
+        values = np.asarray(values if values is not None else self.model.vals(index.vars), dtype=float) if index.vars else np.zeros(0)
+        x_values, z_values = values[:len(index.x)], values[len(index.x):]
 
         # create a path-graph for each commodity - this will simply be a path if freight does not allow splitting
         path_graphs = [nx.DiGraph() for k in self.timed_network]
 
-        for i,(k,a,_) in enumerate(x):
-            if vars[i] > SPLIT_PRECISION and a[0][0] != a[1][0]:
-                path_graphs[k].add_edge(a[0][0], a[1][0])
+        # dispatch arcs in the solution, grouped by commodity
+        selected = np.flatnonzero((x_values > SPLIT_PRECISION) & index.x_dispatch)
+        selected = selected[np.argsort(index.x_k[selected], kind='stable')]
+        commodities, first = np.unique(index.x_k[selected], return_index=True)
 
-        # remove any subtours that don't involve origin/destination
-        for k,PG in enumerate(path_graphs):
-            for subtour in list(nx.weakly_connected_components(PG)):
-                if self.commodities[k].a[0] not in subtour:
-                    PG.remove_nodes_from(subtour)
+        for k, arcs in zip(commodities.tolist(), np.split(selected, first[1:])):
+            n1, n2 = index.x_n1[arcs], index.x_n2[arcs]
 
-        arcs = dict(((k,a[0],a[1]),vars[i]) for i,(k,a,_) in enumerate(x) if vars[i] > SPLIT_PRECISION)
-        offset = len(x)
-        pw = list(map(frozenset,[PG.edges() for PG in path_graphs]))
+            # remove any subtours that don't involve origin/destination, i.e. only keep arcs (weakly) reachable from the origin
+            keep = np.zeros(len(arcs), dtype=bool)
+            reached = np.array([self.commodities[k].a[0]])
 
-        ## add paths - for non-splitting case
-        #paths = []
-        #arcs = dict(((k,a[0]),a[1]) for i,(k,a,_) in enumerate(x) if vars[i] > 0)
+            while True:
+                grow = ~keep & (np.isin(n1, reached) | np.isin(n2, reached))
 
-        #for k, (origin,dest) in self.origin_destination.items():
-        #    i = origin
-        #    paths.append([i[0]])
-                
-        #    while i[0] != dest[0]:
-        #        i = arcs[(k,i)]
-                
-        #        if i[0] != paths[k][-1]:
-        #            paths[k].append(i[0])
+                if not grow.any():
+                    break
 
-        #offset = len(x)
-        #pw = map(frozenset,map(pairwise,paths))
+                keep |= grow
+                reached = np.union1d(reached, np.concatenate((n1[grow], n2[grow])))
+
+            path_graphs[k].add_edges_from(zip(n1[keep].tolist(), n2[keep].tolist()))
+
+        arcs = {(k,a1,a2): float(x_values[i]) for i in np.flatnonzero(x_values > SPLIT_PRECISION).tolist() for k,a1,a2 in [index.x[i]]}
+        pw = list(map(frozenset,[PG.edges() for PG in path_graphs]))
 
         cons = {(a1,a2): [k for k in K if (a1[0],a2[0]) in pw[k] and (k,a1,a2) in arcs] 
-                    for i,(a1,a2,_,K) in enumerate(z) if round(vars[offset + i]) > 0}
+                    for a1,a2,K in (index.z[i] for i in np.flatnonzero(np.rint(z_values) > 0).tolist())}
 
         cons = {arc:frozenset(v) for arc,v in cons.items() if len(v) > 0}
 
@@ -1618,6 +1934,83 @@ class IntervalSolver(object):
 
 
 
+    # the other solutions in the MIP's pool: validated in parallel for a better incumbent, and their timepoints added to the iteration's
+    def solve_pool(self, find) -> set[NodeTime]:
+        index = self.get_solution_index()
+        pool = [self.model.pool_vals(index.vars, i) for i in range(1, min(self.model.sol_count(), POOL_SOLUTIONS))]
+        timepoints: set[NodeTime] = set()
+
+        for result in fork_map(pool_solution, self, pool, 1 if is_logging() else POOL_PROCESSES):
+            if result is not None and (self.incumbent is None or result[0] < self.incumbent):
+                self.incumbent = result[0]
+                self.incumbent_solution = (result[1], result[2], [])    # in-tree variables are only read for the best solution
+
+        # discovery works on the current solution
+        solution_paths, consolidations = self.solution_paths, self.consolidations
+
+        for values in pool:
+            self.solution_paths, self.consolidations = self.get_inprogress(values)
+            path_failure, *found = find(*self.get_network_solution())
+            timepoints.update(*found)
+
+        self.solution_paths, self.consolidations = solution_paths, consolidations
+        return timepoints
+
+    # cost, paths and consolidations of a solution (values of the index variables) if it is valid in continuous time, otherwise None
+    def validate_solution(self, values, checker: CheckSolution):
+        paths, consolidations = self.get_inprogress(values)
+        solution, cycle = self.get_network_solution(paths, [SolutionGraphConsolidation(c, frozenset(k)) for c,K in consolidations.items() for k in K if len(k) > 1])
+
+        # path too long for the time window (the LP is infeasible)
+        if any(tw[0] > tw[1] for tw in (solution.node_data(SolutionGraphCommodity(k,c.b[0]))['tw'] for k,c in enumerate(self.commodities))):
+            return None
+
+        if not checker.validate(paths, consolidations):
+            return None
+
+        return checker.get_solution_cost(), paths, checker.get_consolidations()
+
+    ##
+    ## Reduced cost fixing: an arc at 0 in the LP relaxation whose reduced cost takes the LP objective over the incumbent can't be in a better
+    ## solution, so its x (or z) is fixed to 0 and presolve drops it.  Refinement only narrows an arc's intervals and any solution using
+    ## the narrower arc maps onto the fixed one, so arcs split from it are fixed as they're created (fix_refined_arcs)
+    ##
+    def reduced_cost_fixing(self) -> int:
+        x = [(k, TimedArc(a1,a2), d['x']) for k,G in enumerate(self.timed_network) for a1,a2,d in G.edges_data() if 'x' in d and a1[0] != a2[0]]
+        z = [(None, TimedArc(a1,a2), d['z']) for a1,a2,d in self.cons_network.edges_data() if d.get('z') is not None]
+
+        objective, reduced_costs = self.model.relaxation([v for k,a,v in x + z])
+
+        if objective is None:
+            return 0
+
+        fixed = [(k,a,v) for (k,a,v),rc in zip(x + z, reduced_costs) if rc > 0 and objective + rc > self.incumbent + REDUCED_COST_TOLERANCE * abs(self.incumbent)]
+        fixed = [(k,a,v) for k,a,v in fixed if a not in self.fixed_arcs[k, a.source.node, a.target.node]]
+
+        for k,a,v in fixed:
+            self.fixed_arcs[k, a.source.node, a.target.node].add(a)
+
+        self.model.fix([v for k,a,v in fixed])
+        return len(fixed)
+
+    def is_fixed(self, k, a: TimedArc):
+        return any(s.t1 <= a.source.t1 and a.source.t2 <= s.t2 and t.t1 <= a.target.t1 and a.target.t2 <= t.t2
+                   for key in ((k, a.source.node, a.target.node), (None, a.source.node, a.target.node)) if key in self.fixed_arcs for s,t in self.fixed_arcs[key])
+
+    def fix_refined_arcs(self, new_arcs: list[dict[TimedArc, Var]], new_z: dict[TimedArc, Var]):
+        fixed = [x for k,arcs in enumerate(new_arcs) for a,x in arcs.items() if a.source.node != a.target.node and self.is_fixed(k, a)]
+        fixed.extend(z for a,z in new_z.items() if self.is_fixed(None, a))
+
+        self.model.fix(fixed)
+
+    # partial MIP start from known commodity paths (e.g. from a coarser solve): dispatch arcs off each path start at 0, Gurobi completes the rest
+    def set_start(self, paths):
+        index = self.get_solution_index()
+        off = [v for (k,a1,a2),v in zip(index.x, index.vars) if a1[0] != a2[0] and not paths[k].has_edge(a1[0], a2[0])]
+
+        self.model.update()
+        self.model.set_start(off, [0.0]*len(off))
+
     ##
     ## Builds a graph from the solution (paths & consolidations)
     ##
@@ -1643,13 +2036,13 @@ class IntervalSolver(object):
         solution.add_weighted_edges_from((c, SolutionGraphCommodity(k,c[0][1]), self.transit(*c[0])) for c in cons for k in c[1])
 
         # Time windows
-        tw = list(map(lambda k: self.time_windows(k,paths[k]), range(len(self.commodities))))
+        tw = [self.time_windows(k, paths[k]) for k in range(len(self.commodities))]
 
         for n in solution.nodes():
             if not isinstance(n, SolutionGraphCommodity):
-                solution.node_data(n)['tw'] = (max(tw[k].nodes[n[0][0]]['early'] for k in n[1]), min(tw[k].nodes[n[0][0]]['late'] for k in n[1]))
+                solution.node_data(n)['tw'] = (max(tw[k][n[0][0]][0] for k in n[1]), min(tw[k][n[0][0]][1] for k in n[1]))
             else:
-                solution.node_data(n)['tw'] = (tw[n[0]].nodes[n[1]]['early'], tw[n[0]].nodes[n[1]]['late'])# tw[n[0]][n[1]]
+                solution.node_data(n)['tw'] = tw[n[0]][n[1]]
 
         cycle = []
         
@@ -1709,54 +2102,43 @@ class IntervalSolver(object):
         return solution, cycle
 
 
-    # returns the min/max time window for a commodity that travels along arc a
-    def time_windows(self, k, path=None):
-        t1 = self.commodities[k].a[1]
-        t2 = self.commodities[k].b[1]
-
+    # returns the min/max time window (early, late) at each node of a commodity's path-graph
+    # results are memoized per commodity, keyed by the path-graph edges, so unchanged paths are not recomputed each iteration
+    def time_windows(self, k, path=None) -> dict[int, tuple[float, float]]:
         if path is None:
             path = self.solution_paths[k]
-        #paths = list(pairwise(path))
 
-        path.nodes[self.commodities[k].a[0]]['early'] = t1
-        path.nodes[self.commodities[k].b[0]]['late'] = t2
-        #try:
-        for n in nx.dfs_postorder_nodes(path):
-            for a in path.out_edges(n):
-                late = round(path.nodes[a[1]]['late'] - self.transit(*a), PRECISION)
+        fingerprint = frozenset(path.edges())
+        cached = self.time_window_cache.get(k)
 
-                if 'late' not in path.nodes[a[0]] or path.nodes[a[0]]['late'] < late:
-                    path.nodes[a[0]]['late'] = late
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
 
-        for n in nx.dfs_postorder_nodes(path.reverse()):
-            for a in path.out_edges(n):
-                early = round(path.nodes[n]['early'] + self.transit(*a), PRECISION)
+        t1 = self.commodities[k].a[1]
+        t2 = self.commodities[k].b[1]
 
-                if 'early' not in path.nodes[a[1]] or path.nodes[a[1]]['early'] > early:
-                    path.nodes[a[1]]['early'] = early
-        #except:
-        #    print("ERROR")
-            
-        #    for n in nx.dfs_postorder_nodes(path):
-        #        for a in path.out_edges(n):
-        #            late = round(path.nodes[a[1]]['late'] - self.transit(*a), PRECISION)
+        early = {self.commodities[k].a[0]: t1}
+        late = {self.commodities[k].b[0]: t2}
 
-        #            if 'late' not in path.nodes[a[0]] or path.nodes[a[0]]['late'] < late:
-        #                path.nodes[a[0]]['late'] = late
+        for n in nx.dfs_postorder_nodes(path):
+            for a in path.out_edges(n):
+                l = round(late[a[1]] - self.transit(*a), PRECISION)
 
-        #    for n in nx.dfs_postorder_nodes(path.reverse()):
-        #        for a in path.out_edges(n):
-        #            early = round(path.nodes[n]['early'] + self.transit(*a), PRECISION)
+                if a[0] not in late or late[a[0]] < l:
+                    late[a[0]] = l
 
-        #            if 'early' not in path.nodes[a[1]] or path.nodes[a[1]]['early'] > early:
-        #                path.nodes[a[1]]['early'] = early
+        # reverse view, rather than copying the graph
+        for n in nx.dfs_postorder_nodes(path.reverse(copy=False)):
+            for a in path.out_edges(n):
+                e = round(early[n] + self.transit(*a), PRECISION)
 
+                if a[1] not in early or early[a[1]] > e:
+                    early[a[1]] = e
 
-        return path
-        #early = [0] + list(accumulate((self.transit(*n) for n in paths)))
-        #late  = [0] + list(accumulate((self.transit(*n) for n in reversed(paths))))
+        windows = {n: (early[n], late[n]) for n in path.nodes()}
+        self.time_window_cache[k] = (fingerprint, windows)
 
-        #return {p: round_tuple((float(t1 + e), float(t2 - l))) for (p,e,l) in zip(path, early, reversed(late))}
+        return windows
 
 
     ## get the transit time between 2 nodes (looks nicer than direct access)
@@ -1871,6 +2253,8 @@ class IntervalSolver(object):
             return
 
         #self.initial_timepoints.update(new_timepoints)
+        self.solution_index = None
+        self.heuristic_network = None
         new_arcs: list[dict[TimedArc, Var]] = [dict() for k in range(len(self.commodities))]
 
         ## Update Graph
@@ -1924,9 +2308,11 @@ class IntervalSolver(object):
                         elif 'z' in b[2] and b[2]['z'] is None:
                             del b[2]['z']
 
+        new_z: dict[TimedArc, Var] = {}
+
         for a1,a2,d in self.cons_network.edges_data():
             if 'z' not in d:
-                d['z'] = self.model.addVar(obj=(self.network.edge_data(a1[0],a2[0])['fixed_cost']), lb=0, 
+                d['z'] = new_z[TimedArc(a1,a2)] = self.model.addVar(obj=(self.network.edge_data(a1[0],a2[0])['fixed_cost']), lb=0, 
                                            ub=self.model.inf(), 
                                            name='z' + str((a1,a2)), type=self.model.integer())
 
@@ -1944,6 +2330,10 @@ class IntervalSolver(object):
 
         self.model.update()  # add variables to model
         self.update_constraints(new_arcs)
+
+        if self.fixed_arcs:
+            self.fix_refined_arcs(new_arcs, new_z)
+        self.telemetry.count('added_arcs', sum(map(len, new_arcs)))
       #  self.user_cuts()
 
         #self.model.update()
@@ -2010,8 +2400,11 @@ class IntervalSolver(object):
             if 'y' in d:
                 d['y'].VarName = 'y' + str(k) + ',' + str(a)
 
+        self.telemetry.count('renamed_arcs', len(keep_edges))
 
         ## Delete old arcs
+        self.telemetry.count('deleted_arcs', len(del_edges))
+
         for a1,a2,d in del_edges:
             if 'x' in d:
                 x = d['x']
@@ -2053,6 +2446,166 @@ class IntervalSolver(object):
                 #    self.model.chgCoeff(attr['z'], d['x'], 0)
 
 
+    ##
+    ## Timepoint snapping: new timepoints a few hundredths apart split a node's interval into slivers, each multiplying its arcs.  A new
+    ## timepoint within the node's tolerance of one of its timepoints (existing, or new and earlier) is snapped onto it, so it's dropped.
+    ## Otherwise it's snapped down onto the node's grid (multiples of the tolerance from S), where nearby new timepoints meet, unless the
+    ## grid point is itself within the tolerance of a timepoint.  The tolerance is at most half the node's shortest transit so a transit
+    ## can't be absorbed.  Any set of timepoints gives a valid lower bound; a snapped timepoint that is found again is added exactly, so
+    ## the discovery still converges
+    ##
+    def snap_timepoints(self, timepoints: set[NodeTime]) -> set[NodeTime]:
+        result: set[NodeTime] = set()
+
+        def near(times, t, tolerance):
+            j = bisect.bisect_left(times, t)
+            return any(abs(times[i] - t) <= tolerance for i in (j-1, j) if 0 <= i < len(times))
+
+        for n, group in itertools.groupby(sorted(timepoints), itemgetter(0)):
+            tolerance = min([SNAP_TOLERANCE] + [d['weight'] / 2 for a,b,d in itertools.chain(self.network.in_edges_data(n), self.network.out_edges_data(n)) if a != b])
+            times = sorted(set(t for i in self.intervals.select(n, '*', '*') for t in i[1:]))
+
+            for tp in group:
+                if tolerance > 0 and tp not in self.snapped and not near(times, tp.time, 0):
+                    if near(times, tp.time, tolerance):
+                        self.snapped.add(tp)
+                        continue
+
+                    grid = round(self.S + floor((tp.time - self.S) / tolerance) * tolerance, PRECISION)
+
+                    if grid != tp.time and not near(times, grid, tolerance):
+                        self.snapped.add(tp)
+                        tp = NodeTime(n, grid)
+
+                result.add(tp)
+                bisect.insort(times, tp.time)
+
+        return result
+
+    ##
+    ## Interval coalescing: two adjacent intervals of a node whose arcs are the same for every commodity (same dispatch sources and targets,
+    ## with a holding arc between them) and in the consolidation network are merged back into one.  Any solution of the merged model
+    ## can route through the first interval of the split model at the same cost, so the relaxation is unchanged
+    ##
+    def coalesce_intervals(self) -> set[NodeTime]:
+        fixed_nodes = set(n for key,arcs in self.fixed_arcs.items() if arcs for n in key[1:])
+        merged: set[NodeTime] = set()
+
+        for n in self.network.nodes():
+            if n in fixed_nodes:
+                continue
+
+            intervals = sorted(map(lambda i: NodeInterval(*i), self.intervals.select(n, '*', '*')), key=itemgetter(1))
+            i1 = intervals[0]
+
+            for i2 in intervals[1:]:
+                if NodeTime(n, i1.t2) not in self.coalesced and self.equivalent_intervals(n, i1, i2):
+                    self.coalesced.add(NodeTime(n, i1.t2))
+                    merged.add(NodeTime(n, i1.t2))
+                    i1 = self.merge_intervals(n, i1, i2)
+                else:
+                    i1 = i2
+
+        if merged:
+            self.solution_index = None
+            self.heuristic_network = None
+            self.model.update()
+
+        return merged
+
+    def equivalent_intervals(self, n, i1: NodeInterval, i2: NodeInterval):
+        if HOLDING_COSTS:
+            return False
+
+        def arcs(G, i, key):
+            return ({s: key(d) for s,_,d in G.in_edges_data(i) if s[0] != n}, {t: key(d) for _,t,d in G.out_edges_data(i) if t[0] != n})
+
+        if arcs(self.cons_network, i1, lambda d: (frozenset(d['K']), d.get('z') is None)) != arcs(self.cons_network, i2, lambda d: (frozenset(d['K']), d.get('z') is None)):
+            return False
+
+        for k,G in enumerate(self.timed_network):
+            if i1 in self.origin_destination[k] or i2 in self.origin_destination[k]:
+                return False
+
+            if not G.has_node(i1) and not G.has_node(i2):
+                continue
+
+            if not G.has_node(i1) or not G.has_node(i2) or arcs(G, i1, lambda d: 'x' in d) != arcs(G, i2, lambda d: 'x' in d):
+                return False
+
+            # flow can hold from the first interval to the second
+            if (G.G.degree(i1) or G.G.degree(i2)) and not (G.has_edge(i1, i2) and 'x' in G.edge_data(i1, i2)):
+                return False
+
+        return True
+
+    # i1 takes over i2: i1's arcs (and variables) are kept along with i2's holding arc out, i2's other arcs are removed
+    def merge_intervals(self, n, i1: NodeInterval, i2: NodeInterval) -> NodeInterval:
+        i = NodeInterval(n, i1.t1, i2.t2)
+
+        ## consolidation network
+        C = self.cons_network
+
+        for a1,a2,d in itertools.chain(C.in_edges_data(i2), C.out_edges_data(i2)):
+            if d.get('z') is not None:
+                self.model.removeVar(d['z'])
+
+            if (a1,a2) in self.constraint_consolidation:
+                self.model.removeCons(self.constraint_consolidation.pop((a1,a2)))
+
+        edges = [(a1,i,d) for a1,_,d in C.in_edges_data(i1)] + [(i,a2,d) for _,a2,d in C.out_edges_data(i1)]
+
+        for (a1,a2,d),a0 in zip(edges, [(a1,i1) for a1,_,d in C.in_edges_data(i1)] + [(i1,a2) for _,a2,d in C.out_edges_data(i1)]):
+            if d.get('z') is not None:
+                d['z'].VarName = 'z' + str((a1,a2))
+
+            if a0 in self.constraint_consolidation:
+                self.constraint_consolidation[(a1,a2)] = self.constraint_consolidation.pop(a0)
+                self.constraint_consolidation[(a1,a2)].ConstrName = 'cons' + str((a1,a2))
+
+        C.remove_node(i1)
+        C.remove_node(i2)
+        C.add_node(i)
+        C.add_edges_from(edges)
+
+        ## commodity networks
+        for k,G in enumerate(self.timed_network):
+            if not G.has_node(i1):
+                continue
+
+            holding_out = [(i,a2,d) for _,a2,d in G.out_edges_data(i2) if a2[0] == n]
+            removed = [d for _,_,d in G.in_edges_data(i2)] + [d for _,a2,d in G.out_edges_data(i2) if a2[0] != n]
+            edges = [(a1,i,d) for a1,_,d in G.in_edges_data(i1)] + [(i,a2,d) for _,a2,d in G.out_edges_data(i1) if a2 != i2] + holding_out
+
+            for d in removed:
+                if 'x' in d:
+                    self.model.removeVar(d['x'])
+
+            if (k,i2) in self.constraint_flow:
+                self.model.removeCons(self.constraint_flow.pop((k,i2)))
+
+            if (k,i1) in self.constraint_flow:
+                self.constraint_flow[(k,i)] = self.constraint_flow.pop((k,i1))
+                self.constraint_flow[(k,i)].ConstrName = 'flow' + str((k,i))
+
+                for _,_,d in holding_out:
+                    self.model.chgCoeff(self.constraint_flow[(k,i)], d['x'], -1)
+
+            for a1,a2,d in edges:
+                if 'x' in d:
+                    d['x'].VarName = 'x' + str(k) + ',' + str((a1,a2))
+
+            G.remove_node(i1)
+            G.remove_node(i2)
+            G.add_node(i)
+            G.add_edges_from(edges)
+
+        self.intervals.remove(i1.T)
+        self.intervals.remove(i2.T)
+        self.intervals.append(i.T)
+
+        return i
+
     # adds a new variable, inserts itself into appropriate constraints
     def update_constraints(self, new_arcs: list[dict[TimedArc, Var]]):
         chg_coeff = []
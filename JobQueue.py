@@ -0,0 +1,132 @@
+import os
+import time
+import socket
+import sqlite3
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+##
+## Job table in a SQLite file, so several machines can pull work from the same sweep without a coordination service.
+## WAL needs shared memory between the connections, which NFS doesn't provide - use wal=False (rollback journal) when the
+## file lives on a network share, or keep WAL for a queue on a local disk
+##
+class JobQueue(object):
+    __slots__ = ['filename', 'connection', 'owner', 'stale', 'timeout', 'max_attempts', 'restricted']
+
+    def __init__(self, filename, wal=True, stale=600, timeout=None, max_attempts=3):
+        self.filename = filename
+        self.owner = '{0}:{1}'.format(socket.gethostname(), os.getpid())
+        self.stale = stale                  # seconds without a heartbeat before a running job is handed back out
+        self.timeout = timeout              # default per-job wall time, None for no limit
+        self.max_attempts = max_attempts
+        self.restricted = False
+
+        # autocommit, transactions are started explicitly so claims take the write lock up front.  A connection is only used by one
+        # thread at a time, but a heartbeat connection is opened by the worker and used by its heartbeat thread
+        self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode={0}'.format('WAL' if wal else 'DELETE'))
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                                    name TEXT PRIMARY KEY,
+                                    expected REAL NOT NULL DEFAULT 0,
+                                    timeout REAL,
+                                    state TEXT NOT NULL DEFAULT 'pending',
+                                    attempts INTEGER NOT NULL DEFAULT 0,
+                                    owner TEXT,
+                                    started REAL,
+                                    heartbeat REAL,
+                                    finished REAL,
+                                    error TEXT)''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, expected)')
+
+    def close(self):
+        self.connection.close()
+
+    # jobs already in the table keep their state, so re-adding a sweep resumes it
+    def add(self, name, expected=0.0, timeout=None):
+        self.connection.execute('INSERT OR IGNORE INTO jobs (name, expected, timeout) VALUES (?, ?, ?)',
+                                (name, expected, timeout if timeout is not None else self.timeout))
+
+    # (name, expected, timeout) tuples
+    def add_all(self, jobs):
+        with self.transaction():
+            for name, expected, timeout in jobs:
+                self.add(name, expected, timeout)
+
+    # only claim these jobs on this connection, several sweeps can share one queue file
+    def restrict(self, names):
+        self.connection.execute('CREATE TEMP TABLE IF NOT EXISTS claimable (name TEXT PRIMARY KEY)')
+        self.connection.execute('DELETE FROM temp.claimable')
+        self.connection.executemany('INSERT OR IGNORE INTO temp.claimable VALUES (?)', ((name,) for name in names))
+        self.restricted = True
+
+    # pending job with the longest expected time, or None when there is nothing left to claim
+    def claim(self):
+        now = time.time()
+        where = ' AND name IN (SELECT name FROM temp.claimable)' if self.restricted else ''
+
+        with self.transaction():
+            self.reclaim(now)
+
+            row = self.connection.execute('SELECT name FROM jobs WHERE state = ?' + where + ' ORDER BY expected DESC LIMIT 1', (PENDING,)).fetchone()
+
+            if row is None:
+                return None
+
+            self.connection.execute('UPDATE jobs SET state = ?, owner = ?, attempts = attempts + 1, started = ?, heartbeat = ?, error = NULL WHERE name = ?',
+                                    (RUNNING, self.owner, now, now, row[0]))
+            return row[0]
+
+    # returns False if the job was taken away (timed out or presumed dead), the caller should stop working on it.
+    # reclaims first, so a timeout is enforced even when no other worker is claiming
+    def heartbeat(self, name) -> bool:
+        now = time.time()
+
+        with self.transaction():
+            self.reclaim(now)
+            cursor = self.connection.execute('UPDATE jobs SET heartbeat = ? WHERE name = ? AND owner = ? AND state = ?',
+                                             (now, name, self.owner, RUNNING))
+            return cursor.rowcount > 0
+
+    def complete(self, name) -> bool:
+        cursor = self.connection.execute('UPDATE jobs SET state = ?, finished = ? WHERE name = ? AND owner = ? AND state = ?',
+                                         (DONE, time.time(), name, self.owner, RUNNING))
+        return cursor.rowcount > 0
+
+    def fail(self, name, error=None) -> bool:
+        cursor = self.connection.execute('UPDATE jobs SET state = CASE WHEN attempts < ? THEN ? ELSE ? END, finished = ?, error = ? WHERE name = ? AND owner = ? AND state = ?',
+                                         (self.max_attempts, PENDING, FAILED, time.time(), error, name, self.owner, RUNNING))
+        return cursor.rowcount > 0
+
+    # put failed jobs back in the queue, e.g. after fixing the cause
+    def retry_failed(self):
+        self.connection.execute('UPDATE jobs SET state = ?, attempts = 0 WHERE state = ?', (PENDING, FAILED))
+
+    def counts(self) -> dict[str, int]:
+        return dict(self.connection.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall())
+
+    # running jobs whose owner stopped heartbeating, or that have run past their timeout, count as a failed attempt
+    def reclaim(self, now):
+        self.connection.execute('''UPDATE jobs SET state = CASE WHEN attempts < ? THEN ? ELSE ? END, finished = ?,
+                                        error = CASE WHEN heartbeat < ? THEN 'stale' ELSE 'timeout' END
+                                    WHERE state = ? AND (heartbeat < ? OR (timeout IS NOT NULL AND started + timeout < ?))''',
+                                (self.max_attempts, PENDING, FAILED, now, now - self.stale, RUNNING, now - self.stale, now))
+
+    def transaction(self):
+        return Transaction(self.connection)
+
+class Transaction(object):
+    __slots__ = ['connection']
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, type, value, traceback):
+        self.connection.execute('COMMIT' if type is None else 'ROLLBACK')
+        return False
@@ -0,0 +1,148 @@
+import os
+import sys
+import tracemalloc
+from typing import NamedTuple
+from gurobipy import Constr, Var
+
+class MemorySnapshot(NamedTuple):
+    iteration: int
+    rss: int                            # resident set size of the process (bytes), includes Gurobi
+    traced: int                         # python allocations (bytes) seen by tracemalloc, 0 if not tracing
+    traced_peak: int
+    num_vars: int
+    num_constrs: int
+    structures: dict[str, int]          # approximate size (bytes) of the large solver structures
+    top: list[tuple[str, int, int]]     # (file:line, bytes, allocations) of the top allocation sites
+
+##
+## Tracks the memory of an IntervalSolver per iteration, and enforces an optional budget.  Once the process goes over 'budget' MB
+## check() returns False and the solver stops with its current incumbent, rather than being killed.  The budget is also passed to Gurobi
+## (SoftMemLimit) so a MIP solve that would exceed it is aborted
+##
+class MemoryMonitor(object):
+    __slots__ = ['budget', 'trace', 'top', 'structures', 'snapshots']
+
+    def __init__(self, budget=None, trace=False, top=10, structures=False):
+        self.budget = budget * 1024 * 1024 if budget is not None else None
+        self.trace = trace              # tracemalloc - slows python allocations, so only for investigating
+        self.top = top
+        self.structures = structures    # walking the structures is linear in their size
+        self.snapshots: list[MemorySnapshot] = []
+
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def attach(self, model):
+        if self.budget is not None:
+            model.set_memlimit(self.budget / 1024**3)
+
+    def check(self, solver, iteration) -> bool:
+        snapshot = self.snapshot(solver, iteration)
+        self.snapshots.append(snapshot)
+        return self.budget is None or snapshot.rss < self.budget
+
+    def snapshot(self, solver, iteration) -> MemorySnapshot:
+        traced, traced_peak, top = 0, 0, []
+
+        if self.trace:
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            stats = tracemalloc.take_snapshot().statistics('lineno')[:self.top]
+            top = [(f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}", s.size, s.count) for s in stats]
+
+        structures = {}
+
+        if self.structures:
+            structures = {'timed_network': deep_size(solver.timed_network),
+                          'cons_network': deep_size(solver.cons_network),
+                          'intervals': deep_size(solver.intervals),
+                          'constraint_flow': deep_size(solver.constraint_flow),
+                          'constraint_consolidation': deep_size(solver.constraint_consolidation),
+                          'edge_shortest_path': deep_size(solver.edge_shortest_path),
+                          'shared_shortest_paths': deep_size(solver.shared_shortest_paths)}
+
+        return MemorySnapshot(iteration, rss(), traced, traced_peak, solver.model.NumVars, solver.model.NumConstrs, structures, top)
+
+    def close(self):
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self) -> str:
+        lines = []
+
+        for s in self.snapshots:
+            lines.append("{0:>3}, rss: {1:8.1f} MB, traced: {2:8.1f} MB (peak {3:.1f} MB), vars: {4}, cons: {5}".format(
+                         s.iteration, s.rss / 1024**2, s.traced / 1024**2, s.traced_peak / 1024**2, s.num_vars, s.num_constrs))
+            lines.extend("     {0:<26} {1:8.1f} MB".format(k, v / 1024**2) for k,v in s.structures.items())
+            lines.extend("     {0:<26} {1:8.1f} MB {2:>8}".format(site, size / 1024**2, count) for site, size, count in s.top)
+
+        return "\n".join(lines)
+
+# current resident set size (bytes), falls back to the peak where /proc isn't available
+def rss() -> int:
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0    # windows
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+# peak resident set size (bytes) since the process started or reset_peak(), includes spikes between snapshots
+def peak_rss() -> int:
+    try:
+        with open('/proc/self/status') as file:
+            return next(int(line.split()[1]) * 1024 for line in file if line.startswith('VmHWM:'))
+    except (OSError, ValueError, StopIteration):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return rss()    # windows
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+# restarts peak_rss() from the current rss (linux 4.0+).  False if it can't, then the peak is the process's
+def reset_peak() -> bool:
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+        return True
+    except OSError:
+        return False
+
+# approximate size of a structure, following containers (and graphs) but counting gurobi objects as handles
+def deep_size(obj) -> int:
+    seen = set()
+    stack = [obj]
+    size = 0
+
+    while stack:
+        o = stack.pop()
+
+        if id(o) in seen:
+            continue
+
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+
+        if isinstance(o, (Var, Constr, str, int, float)):
+            continue
+        elif isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, '__dict__'):
+            stack.append(o.__dict__)
+        elif hasattr(o, '__slots__'):
+            stack.extend(getattr(o, s) for s in o.__slots__ if hasattr(o, s))
+
+    return size
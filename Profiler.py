@@ -0,0 +1,119 @@
+import os
+import sys
+import cProfile
+import threading
+from collections import Counter
+from os.path import basename, join
+from tools import fork_lock, ForkSafeThread
+
+##
+## Profiles selected iterations/phases of IntervalSolver.solve, driven by Telemetry phases.  Each selected phase of an iteration is written
+## to its own file named <instance>_it<iteration>_<phase>:
+##   'cprofile' - deterministic profile (.prof), for snakeviz/pstats/gprof2dot
+##   'sample'   - stack sampling of the solver thread at 'interval' seconds, low overhead, written as collapsed stacks (.collapsed)
+##                which flamegraph.pl and speedscope read directly
+##
+class Profiler(object):
+    __slots__ = ['output_dir', 'instance', 'iterations', 'phases', 'mode', 'interval', 'profiles', 'samples', 'current', 'thread_id', 'sampler', 'stop_event']
+
+    def __init__(self, output_dir, instance='', iterations=None, phases=None, mode='cprofile', interval=0.005):
+        assert mode in ('cprofile', 'sample'), "mode should be 'cprofile' or 'sample'"
+
+        self.output_dir = output_dir
+        self.instance = instance
+        self.iterations = set(iterations) if iterations is not None else None   # None profiles every iteration
+        self.phases = set(phases) if phases is not None else None               # None profiles every phase
+        self.mode = mode
+        self.interval = interval
+
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.samples: dict[str, Counter[str]] = {}
+        self.current: str | None = None     # phase being sampled
+        self.thread_id = None
+        self.sampler = None
+        self.stop_event = threading.Event()
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def selected(self, iteration, phase):
+        return (self.iterations is None or iteration in self.iterations) and (self.phases is None or phase in self.phases)
+
+    def start(self, iteration, phase):
+        if not self.selected(iteration, phase) or self.current is not None:
+            return False
+
+        self.current = phase
+
+        if self.mode == 'cprofile':
+            self.profiles.setdefault(phase, cProfile.Profile()).enable()
+        else:
+            self.samples.setdefault(phase, Counter())
+            self.start_sampler()
+
+        return True
+
+    def stop(self, iteration, phase):
+        if self.current != phase:
+            return
+
+        if self.mode == 'cprofile':
+            self.profiles[phase].disable()
+
+        self.current = None
+
+    def end_iteration(self, iteration):
+        name = join(self.output_dir, f"{self.instance}_it{iteration}_")
+
+        for phase, profile in self.profiles.items():
+            profile.dump_stats(name + phase + ".prof")
+
+        for phase, samples in self.samples.items():
+            if samples:
+                with open(name + phase + ".collapsed", "w") as file:
+                    file.writelines(f"{stack} {count}\n" for stack, count in samples.items())
+
+        self.profiles = {}
+        self.samples = {}
+
+    def close(self):
+        self.stop_event.set()
+
+        if self.sampler is not None:
+            self.sampler.join()
+            self.sampler = None
+
+    ##
+    ## Sampler
+    ##
+    def start_sampler(self):
+        if self.sampler is not None:
+            return
+
+        self.thread_id = threading.get_ident()
+        self.sampler = ForkSafeThread(target=self.sample, daemon=True)
+        self.sampler.start()
+
+    def sample(self):
+        while not self.stop_event.wait(self.interval):
+            with fork_lock:
+                self.take_sample()
+
+    def take_sample(self):
+        phase = self.current
+        frame = sys._current_frames().get(self.thread_id)
+
+        if phase is None or frame is None:
+            return
+
+        stack = []
+
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        samples = self.samples.get(phase)
+
+        # the iteration may have been written out while we were walking the stack
+        if samples is not None:
+            samples[";".join(reversed(stack))] += 1
@@ -0,0 +1,335 @@
+import gzip
+import pickle
+import numpy as np
+from typing import NamedTuple
+from contextlib import contextmanager
+from gurobipy import GRB
+import Solver as solver_module
+from Solver import Solver
+
+##
+## Record and replay of Gurobi solves.  Recording logs the result of every optimize() made through the Solver wrapper (the master MIP,
+## the CheckSolution LPs and the second shortest path IPs, in order).  Replaying swaps Solver for ReplaySolver, which builds the same
+## models without Gurobi and hands back the recorded results, so the python side of IntervalSolver.solve runs deterministically and can
+## be timed or profiled offline.
+## The solver code must be unchanged between recording and replay (the variables are matched by the order they were created in).
+## Callbacks aren't replayed: the progress callback isn't called (a MIP it stopped has the recorded status), and the MIP solution
+## callback (IntervalSolver.VALIDATE_INTERMEDIATE, which isn't used while logging) raises
+##
+class SolveRecord(NamedTuple):
+    status: int
+    obj_val: float | None
+    obj_bound: float | None
+    values: np.ndarray | None           # X of every variable, in model order (None if there was no solution)
+    presolve: tuple[int | None, int | None] | None  # presolved NumVars/NumConstrs, if they were asked for
+    presolved: tuple[int, int] | None = None         # size of the model returned by presolve(), if it was called
+    sol_count: int | None = None
+    pool: dict[int, np.ndarray] | None = None       # i -> values of the i'th pool solution, for the variables they were asked for
+    relaxation: tuple[float | None, np.ndarray | None] | None = None  # LP objective and reduced costs, if the relaxation was solved
+
+class SolveLog(object):
+    __slots__ = ['records', 'position', 'last']
+
+    def __init__(self, records=None):
+        self.records: list[SolveRecord] = records if records is not None else []
+        self.position = 0
+        self.last: dict[int, int] = {}      # model -> index of its latest record (while recording)
+
+    def add(self, model):
+        def get(attr):
+            try:
+                return model.getAttr(attr)
+            except Exception:   # not available for this status / model type
+                return None
+
+        values = np.asarray(model.getAttr(GRB.Attr.X, model.getVars()), dtype=float) if model.SolCount > 0 else None
+        self.records.append(SolveRecord(model.status, get(GRB.Attr.ObjVal), get(GRB.Attr.ObjBound), values, None, sol_count=model.SolCount))
+        self.last[id(model)] = len(self.records) - 1
+
+    # presolved sizes are asked for after the model's solve (other models may have been solved since), one at a time (0: NumVars, 1: NumConstrs)
+    def add_presolve(self, model, i, value):
+        r = self.last.get(id(model))
+
+        if r is not None:
+            presolve = list(self.records[r].presolve or (None, None))
+            presolve[i] = value
+            self.records[r] = self.records[r]._replace(presolve=tuple(presolve))
+
+    def add_presolved(self, model, num_vars, num_constrs):
+        r = self.last.get(id(model))
+
+        if r is not None:
+            self.records[r] = self.records[r]._replace(presolved=(num_vars, num_constrs))
+
+    def add_pool(self, model, i, values):
+        r = self.last.get(id(model))
+
+        if r is not None:
+            self.records[r] = self.records[r]._replace(pool=(self.records[r].pool or {}) | {i: np.asarray(values, dtype=float)})
+
+    def add_relaxation(self, model, objective, reduced_costs):
+        r = self.last.get(id(model))
+
+        if r is not None:
+            self.records[r] = self.records[r]._replace(relaxation=(objective, np.asarray(reduced_costs, dtype=float) if reduced_costs is not None else None))
+
+    def next(self) -> SolveRecord:
+        if self.position >= len(self.records):
+            raise RuntimeError("replay: more solves than were recorded ({0}) - has the solver changed since recording?".format(len(self.records)))
+
+        self.position += 1
+        return self.records[self.position - 1]
+
+    def save(self, filename):
+        with gzip.open(filename, 'wb') as file:
+            pickle.dump(self.records, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(filename):
+        with gzip.open(filename, 'rb') as file:
+            return SolveLog(pickle.load(file))
+
+# the log is only written if the run completes
+@contextmanager
+def record(filename):
+    solver_module.recorder = log = SolveLog()
+
+    try:
+        yield log
+    finally:
+        solver_module.recorder = None
+
+    log.save(filename)
+
+@contextmanager
+def replay(filename):
+    solver_module.replayer = SolveLog.load(filename)
+
+    try:
+        yield solver_module.replayer
+    finally:
+        solver_module.replayer = None
+
+##
+## Stand-in for the Gurobi model.  Variables and expressions only need to support the operations the solver uses to build its models
+##
+class ReplayExpr(object):
+    __slots__ = []
+
+    def __add__(self, other):
+        return EXPR
+    __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = __truediv__ = __add__
+
+    def __neg__(self):
+        return EXPR
+
+    def __le__(self, other):
+        return CONSTR_EXPR
+    __ge__ = __eq__ = __le__
+
+    __hash__ = object.__hash__
+
+class ReplayVar(ReplayExpr):
+    __slots__ = ['X', 'VarName', 'removed']
+
+    def __init__(self, name):
+        self.X = None
+        self.VarName = name
+        self.removed = False
+
+    @property
+    def x(self):
+        return self.X
+
+    def setAttr(self, attr, value):
+        pass
+
+class ReplayConstr(object):
+    __slots__ = ['ConstrName', 'removed']
+
+    def __init__(self, name):
+        self.ConstrName = name
+        self.removed = False
+
+    def setAttr(self, attr, value):
+        pass
+
+EXPR = ReplayExpr()
+CONSTR_EXPR = object()
+
+# the presolved model, only its size is recorded
+class ReplayPresolved(object):
+    __slots__ = ['vars', 'constrs']
+
+    def __init__(self, num_vars, num_constrs):
+        self.vars = [ReplayVar(None) for _ in range(num_vars)]
+        self.constrs = [ReplayConstr(None) for _ in range(num_constrs)]
+
+    def getVars(self):
+        return self.vars
+
+    def getConstrs(self):
+        return self.constrs
+
+class ReplaySolver(Solver):
+    """Solver wrapper that replays recorded results instead of calling Gurobi"""
+    __slots__ = ['log', 'vars', 'constrs', 'removed', 'status', 'result']
+
+    def __init__(self, minimize=True, quiet=True, use_callback=True, env=None):
+        self.model = self      # code that reaches through to the gurobi model (model.status) sees this object
+        self.log = solver_module.replayer
+        self.vars: list[ReplayVar] = []
+        self.constrs: list[ReplayConstr] = []
+        self.removed = False
+        self.status = GRB.status.LOADED
+        self.result = None
+
+    def set_gap(self, gap):
+        pass
+
+    def set_timelimit(self, timelimit):
+        pass
+
+    def set_threads(self, val):
+        pass
+
+    def set_memlimit(self, gb):
+        pass
+
+    def set_focus(self, focus):
+        pass
+
+    def set_aggressive_cuts(self):
+        pass
+
+    def update(self):
+        if self.removed:
+            self.vars = [v for v in self.vars if not v.removed]
+            self.constrs = [c for c in self.constrs if not c.removed]
+            self.removed = False
+
+    def write(self, file):
+        pass
+
+    def optimize(self, callback=None, solution=None):
+        if solution is not None:
+            raise RuntimeError("replay: the MIP solutions given to a callback aren't recorded")
+
+        self.update()
+        self.result = self.log.next()
+        self.status = self.result.status
+
+        if self.result.values is not None:
+            assert len(self.result.values) == len(self.vars), "replay: recorded {0} variables, model has {1}".format(len(self.result.values), len(self.vars))
+
+            for v, x in zip(self.vars, self.result.values.tolist()):
+                v.X = x
+
+    def presolve(self):
+        if self.result is None or self.result.presolved is None:
+            raise RuntimeError("replay: the presolved model wasn't recorded for this solve - has the solver changed since recording?")
+
+        return ReplayPresolved(*self.result.presolved)
+
+    def objVal(self) -> float:
+        return self.result.obj_val
+
+    def objBound(self) -> float:
+        return self.result.obj_bound
+
+    def val(self, var):
+        return var.X
+
+    def vals(self, vars):
+        return [v.X for v in vars]
+
+    def set_start(self, vars, values):
+        pass
+
+    def relaxation(self, vars):
+        if self.result is None or self.result.relaxation is None:
+            raise RuntimeError("replay: the relaxation wasn't recorded for this solve - has the solver changed since recording?")
+
+        objective, reduced_costs = self.result.relaxation
+
+        if reduced_costs is None:
+            return objective, None
+
+        assert len(reduced_costs) == len(vars), "replay: recorded {0} reduced costs, asked for {1}".format(len(reduced_costs), len(vars))
+        return objective, reduced_costs.tolist()
+
+    def fix(self, vars):
+        pass
+
+    def set_pool(self, n):
+        pass
+
+    def sol_count(self):
+        if self.result is not None and self.result.sol_count is not None:
+            return self.result.sol_count
+
+        return 1 if self.result is not None and self.result.values is not None else 0
+
+    # only the pool solutions that were read are recorded
+    def pool_vals(self, vars, i):
+        if self.result is None or self.result.pool is None or i not in self.result.pool:
+            raise RuntimeError("replay: pool solution {0} wasn't recorded for this solve - has the solver changed since recording?".format(i))
+
+        values = self.result.pool[i]
+        assert len(values) == len(vars), "replay: recorded {0} pool values, asked for {1}".format(len(values), len(vars))
+        return values.tolist()
+
+    def addVar(self, obj, lb, ub, type=None, name = None):
+        v = ReplayVar(name)
+        self.vars.append(v)
+        return v
+
+    def removeVar(self, var):
+        var.removed = True
+        self.removed = True
+
+    def getVars(self):
+        self.update()
+        return self.vars
+
+    @property
+    def NumVars(self):
+        self.update()
+        return len(self.vars)
+
+    @property
+    def PresolveNumVars(self):
+        return self.result.presolve[0] if self.result is not None and self.result.presolve is not None else None
+
+    @property
+    def NumConstrs(self):
+        self.update()
+        return len(self.constrs)
+
+    @property
+    def PresolveNumConstrs(self):
+        return self.result.presolve[1] if self.result is not None and self.result.presolve is not None else None
+
+    def addConstr(self, cons, name=None):
+        c = ReplayConstr(name)
+        self.constrs.append(c)
+        return c
+
+    def addConstrs(self, generator):
+        constrs = [ReplayConstr(None) for _ in generator]
+        self.constrs.extend(constrs)
+        return constrs
+
+    def chgCoeff(self, cons, var, val):
+        pass
+
+    def getConstrs(self):
+        self.update()
+        return self.constrs
+
+    def removeCons(self, cons):
+        cons.removed = True
+        self.removed = True
+
+    def set_rhs(self, cons, rhs):
+        pass
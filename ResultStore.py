@@ -0,0 +1,83 @@
+import os
+import glob
+import polars as pl
+from datetime import datetime
+from Telemetry import PHASES, COUNTS
+
+# columns of the info tuples returned by IntervalSolver.solve, one tuple per iteration
+INFO_COLUMNS = ["LB", "UB", "total time", "solve time", "Added Time points", "# Vars", "# Cons", "# Presolve Vars", "# Presolve Cons", "# Its", "IP Gap"]
+
+SCHEMA = {"Instance": pl.String, "Id": pl.String, "Iteration": pl.Int64,
+          "LB": pl.Float64, "UB": pl.Float64, "total time": pl.Float64, "solve time": pl.Float64, "Added Time points": pl.Int64,
+          "# Vars": pl.Int64, "# Cons": pl.Int64, "# Presolve Vars": pl.Int64, "# Presolve Cons": pl.Int64, "# Its": pl.Int64, "IP Gap": pl.Float64}
+
+# per-iteration telemetry, with a wall and cpu column for each phase
+EVENT_SCHEMA = {"Instance": pl.String, "Id": pl.String, "Iteration": pl.Int64, "LB": pl.Float64, "UB": pl.Float64, "# Vars": pl.Int64, "# Cons": pl.Int64, "Added Time points": pl.Int64} \
+             | {c: pl.Int64 for c in COUNTS} \
+             | {f"{p} {t}": pl.Float64 for p in PHASES for t in ("wall", "cpu")}
+
+PARTITIONS = {"instance_class": pl.String, "run_id": pl.String}
+
+##
+## Append-only Parquet dataset of solver results, hive partitioned as root/instance_class=<class>/run_id=<run>/<instance>_<id>.parquet.
+## Each solved instance is written once (atomically), so a file existing means the instance is done for that run, and queries only
+## read the partitions and columns they need
+##
+class ResultStore(object):
+    __slots__ = ['root', 'run_id']
+
+    def __init__(self, root, run_id=None):
+        self.root = root
+        self.run_id = run_id if run_id is not None else datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    def path(self, instance_class, instance, id, run_id=None, table=""):
+        return os.path.join(self.root, table, f"instance_class={instance_class}", f"run_id={run_id or self.run_id}", f"{instance}_{id}.parquet")
+
+    def exists(self, instance_class, instance, id):
+        return os.path.exists(self.path(instance_class, instance, id))
+
+    def append(self, instance_class, instance, id, info):
+        rows = [[instance, str(id), iteration] + list(i) for iteration, i in enumerate(info)]
+        self.write(self.path(instance_class, instance, id), pl.DataFrame(rows, schema=SCHEMA, orient="row", strict=False))
+
+    # Telemetry events, kept in their own table so they never change the results schema
+    def append_events(self, instance_class, instance, id, events):
+        rows = [[instance, str(id), e.iteration, e.lower_bound, e.incumbent, e.num_vars, e.num_constrs, e.added_timepoints]
+                + [e.counts.get(c, 0) for c in COUNTS]
+                + [getattr(e.phases[p], t) if p in e.phases else None for p in PHASES for t in ("wall", "cpu")] for e in events]
+        self.write(self.path(instance_class, instance, id, table="events"), pl.DataFrame(rows, schema=EVENT_SCHEMA, orient="row", strict=False))
+
+    # write then rename, so readers (and job claims) never see a partial file
+    def write(self, filename, df: pl.DataFrame):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        temp = f"{filename}.{os.getpid()}.tmp"
+        df.write_parquet(temp)
+        os.replace(temp, filename)
+
+    # lazy frame over the dataset, with instance_class and run_id columns from the partitions
+    def scan(self, instance_class=None, run_id=None, table="", schema=SCHEMA) -> pl.LazyFrame:
+        pattern = os.path.join(self.root, table, f"instance_class={instance_class or '*'}", f"run_id={run_id or '*'}", "*.parquet")
+
+        if not glob.glob(pattern):
+            return pl.LazyFrame(schema=PARTITIONS | schema)
+
+        # files written before a column was added read it as null
+        lf = pl.scan_parquet(pattern, hive_partitioning=True, hive_schema=PARTITIONS, schema=schema, missing_columns='insert')
+        return lf.select(list(PARTITIONS) + list(schema))
+
+    def scan_events(self, instance_class=None, run_id=None) -> pl.LazyFrame:
+        return self.scan(instance_class, run_id, table="events", schema=EVENT_SCHEMA)
+
+    def runs(self) -> list[str]:
+        return sorted(set(os.path.basename(d).removeprefix("run_id=") for d in glob.glob(os.path.join(self.root, "*", "run_id=*"))))
+
+    # the same layout as the per-instance csv files, for spreadsheets and older scripts
+    def export_csv(self, output_path, instance_class=None, run_id=None, last_iteration_only=False):
+        lf = self.scan(instance_class, run_id or self.run_id)
+
+        if last_iteration_only:
+            lf = lf.filter(pl.col("Iteration") == pl.col("Iteration").max().over("run_id", "Instance", "Id"))
+
+        df = lf.sort("Instance", "Id", "Iteration").select(["Instance", "Id"] + INFO_COLUMNS).collect()
+        df.write_csv(output_path)
+        print(f"Exported {len(df)} rows to {os.path.basename(output_path)}")
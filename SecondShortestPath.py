@@ -1,4 +1,5 @@
-from gurobipy import Model, GRB, quicksum, tuplelist
+from gurobipy import quicksum, tuplelist
+from Solver import Solver
 
 #
 # dodgey way to get 2nd shortest path (via IP) and 0.01 tolerance on objective cost
@@ -9,9 +10,7 @@ def second_shortest_path(network, origin: int, destination: int, best_path_cost=
     if origin == destination:
         return 0.0, result
 
-    model = Model("path")
-    model.setParam('OutputFlag', False)
-    model.modelSense = GRB.MINIMIZE
+    model = Solver()    # recorded and replayed with the other solves
 
     ##
     ## decision variables
@@ -20,7 +19,7 @@ def second_shortest_path(network, origin: int, destination: int, best_path_cost=
     arcs = tuplelist(network.edges())
 
     # x - dispatch along an arc [a]
-    x = {a: model.addVar(obj=network[a[0]][a[1]]['weight'], lb=0, ub=1, vtype=GRB.BINARY, name='x' + str(a)) 
+    x = {a: model.addVar(obj=network[a[0]][a[1]]['weight'], lb=0, ub=1, type=model.binary(), name='x' + str(a)) 
             for a in arcs}
 
     model.update()
@@ -64,17 +63,17 @@ def second_shortest_path(network, origin: int, destination: int, best_path_cost=
     model.update()
     model.optimize()
 
-    if model.status == GRB.status.OPTIMAL:    
+    if model.is_optimal():
         if path is not None:
-            a = [b for b in arcs.select(origin, '*') if x[b].X > 0][0]
+            a = [b for b in arcs.select(origin, '*') if model.val(x[b]) > 0][0]
             result.append(origin)
 
             while a[1] != destination:
                 result.append(a[1])
-                a = [b for b in arcs.select(a[1], '*') if x[b].X > 0][0]
+                a = [b for b in arcs.select(a[1], '*') if model.val(x[b]) > 0][0]
 
             result.append(destination)
 
-        return float(model.objVal), result        
+        return float(model.objVal()), result
 
     return None, result
\ No newline at end of file
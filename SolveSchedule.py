@@ -0,0 +1,100 @@
+##
+## Sets the MIP parameters of each iteration of IntervalSolver.solve.  start() is called once the model is built, configure() before
+## each MIP (with the remaining time budget and the previous MIP's time) and update() after each iteration whose solution is feasible
+## in continuous time but doesn't close the gap.  'limited' tells the solver that a time limit stop is the schedule's, so the best
+## solution found is refined rather than ending the solve.  A schedule is checkpointed with the solve, and resume() applies its position to
+## the rebuilt model
+##
+class SolveSchedule(object):
+    """Default schedule: the adaptive gap"""
+    __slots__ = ['adaptive', 'variable_gap', 'limited', 'mip_gap']
+
+    def __init__(self):
+        self.adaptive = False
+        self.variable_gap = True
+        self.limited = False
+        self.mip_gap = None
+
+    def set_gap(self, solver, gap):
+        self.mip_gap = gap
+        solver.model.set_gap(gap)
+
+    def start(self, solver, adaptive):
+        self.adaptive = adaptive
+        self.set_gap(solver, 0.04 if adaptive else solver.GAP)
+
+    def resume(self, solver):
+        self.set_gap(solver, self.mip_gap)
+
+        if self.adaptive and not self.variable_gap:
+            solver.model.set_aggressive_cuts()
+
+    def configure(self, solver, iteration, remaining, mip_time):
+        solver.model.set_timelimit(remaining)
+
+    # variable gap for faster solve (turn off if no new time points found)
+    def update(self, solver, iteration, found):
+        if not self.adaptive:
+            return
+
+        if not found or self.variable_gap and (solver.incumbent - solver.lower_bound)*0.25 < solver.incumbent * solver.GAP:
+            self.set_gap(solver, solver.GAP*0.98)
+            solver.model.set_aggressive_cuts() # focus on proving optimality
+            self.variable_gap = False
+        elif self.variable_gap:
+            self.set_gap(solver, (solver.incumbent - solver.lower_bound)/solver.incumbent * 0.25)
+
+##
+## Stops the early iterations quickly, since the next refinement throws most of their precision away.  While early, each MIP stops at
+## 'gap' with MIPFocus 1 (feasibility), and at 'growth' times the previous MIP's time (at least 'minimum' seconds).  Switches to the
+## default schedule once an iteration finds no new timepoints or the lower bound improves by less than 'stall' (relative)
+##
+class EarlyStopSchedule(SolveSchedule):
+    __slots__ = ['gap', 'minimum', 'growth', 'stall', 'early', 'last_bound']
+
+    def __init__(self, gap=0.1, minimum=10, growth=2, stall=0.001):
+        super().__init__()
+        self.gap = gap
+        self.minimum = minimum
+        self.growth = growth
+        self.stall = stall
+        self.early = True
+        self.last_bound = None
+
+    def start(self, solver, adaptive):
+        self.adaptive = adaptive
+        self.set_gap(solver, max(self.gap, solver.GAP))
+        solver.model.set_focus(1)
+
+    def resume(self, solver):
+        super().resume(solver)
+
+        if self.early:
+            solver.model.set_focus(1)
+
+    def configure(self, solver, iteration, remaining, mip_time):
+        if self.early and self.last_bound is not None and solver.lower_bound - self.last_bound <= self.stall * abs(self.last_bound):
+            self.finish(solver)
+
+        self.last_bound = solver.lower_bound
+
+        if not self.early:
+            return super().configure(solver, iteration, remaining, mip_time)
+
+        limit = min(remaining, max(self.minimum, self.growth * mip_time))
+        self.limited = limit < remaining
+        solver.model.set_timelimit(limit)
+
+    def update(self, solver, iteration, found):
+        if self.early and not found:
+            self.finish(solver)
+
+        if not self.early:
+            super().update(solver, iteration, found)
+
+    # continue with the default schedule from its start
+    def finish(self, solver):
+        self.early = False
+        self.limited = False
+        solver.model.set_focus(0)
+        super().start(solver, self.adaptive)
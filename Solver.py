@@ -1,7 +1,39 @@
 # Was a wrapper for CPLEX and GUROBI, but I've removed CPLEX
 # This entire class will be removed at some point
+import os
 from gurobipy import Env, GRB, Model
 
+# record/replay of solves (see ReplaySolver.record and ReplaySolver.replay)
+recorder = None
+replayer = None
+
+# recorded and replayed solves have to run in this process, in order
+def is_logging():
+    return recorder is not None or replayer is not None
+
+##
+## Per-process pool of started environments, keyed by their parameters.  Starting an environment checks out the licence, which costs more
+## than solving a small instance, so every model (master MIP, CheckSolution LPs, second shortest paths) shares the environment for its
+## parameter set.  Keyed by pid as well, since an environment inherited through fork can't be used by the child
+##
+environments: dict[tuple, Env] = {}
+
+def get_env(**params) -> Env:
+    key = (os.getpid(), tuple(sorted(params.items())))
+    env = environments.get(key)
+
+    if env is None:
+        env = Env("", empty=True)
+        env.setParam('OutputFlag', False)
+
+        for name, value in params.items():
+            env.setParam(name, value)
+
+        env.start()
+        environments[key] = env
+
+    return env
+
 ##
 ## Abstraction for gurobi
 ##
@@ -9,8 +41,16 @@ class Solver(object):
     """Abstract layer for Gurobi"""
     __slots__ = ['model']
 
+    # replaying swaps in the stand-in model
+    def __new__(cls, *args, **kwargs):
+        if replayer is not None and cls is Solver:
+            from ReplaySolver import ReplaySolver
+            return ReplaySolver(*args, **kwargs)
+
+        return super().__new__(cls)
+
     def __init__(self, minimize=True, quiet=True, use_callback=True, env=None):
-        self.model = Model("model_name", env=env if env is not None else Env(""))
+        self.model = Model("model_name", env=env if env is not None else get_env())
         self.model.modelSense = GRB.MINIMIZE if minimize else GRB.MAXIMIZE
         self.model.setParam('OutputFlag', not quiet)
 
@@ -23,6 +63,14 @@ class Solver(object):
     def set_threads(self, val):
         self.model.setParam(GRB.param.Threads, val)
 
+    # soft limit (GB) - optimize stops with MEM_LIMIT rather than failing
+    def set_memlimit(self, gb):
+        self.model.setParam(GRB.param.SoftMemLimit, gb)
+
+    # 0: balanced, 1: feasibility, 2: optimality, 3: bound
+    def set_focus(self, focus):
+        self.model.setParam(GRB.param.MIPFocus, focus)
+
     def set_aggressive_cuts(self):
         self.model.setParam(GRB.param.MIPFocus, 2)
         self.model.setParam(GRB.param.PrePasses, 3)
@@ -34,25 +82,39 @@ class Solver(object):
     def write(self, file):
         self.model.write(file)
 
-    def optimize(self, callback=None):
-        if callback:
+    # solution: (vars, func) - func is given the values of vars for each new MIP solution
+    def optimize(self, callback=None, solution=None):
+        if callback or solution:
             def opt(model, where):
-                if where == GRB.callback.MIP:
+                if where == GRB.callback.MIP and callback:
                     if not callback(model.cbGet(GRB.callback.MIP_OBJBST), model.cbGet(GRB.callback.MIP_OBJBND)):
                         self.model.terminate()
+                elif where == GRB.callback.MIPSOL and solution:
+                    solution[1](model.cbGetSolution(solution[0]))
 
             self.model.optimize(opt)
         else:
             self.model.optimize()
 
+        if recorder is not None:
+            recorder.add(self.model)
+
     def presolve(self):
-        return self.model.presolve()
+        presolved = self.model.presolve()
+
+        if recorder is not None:
+            recorder.add_presolved(self.model, len(presolved.getVars()), len(presolved.getConstrs()))
+
+        return presolved
 
     def is_optimal(self):
         return self.model.status == GRB.status.OPTIMAL
 
     def is_abort(self):
-        return self.model.status in [GRB.status.TIME_LIMIT, GRB.status.INTERRUPTED]
+        return self.model.status in [GRB.status.TIME_LIMIT, GRB.status.INTERRUPTED, GRB.status.MEM_LIMIT]
+
+    def is_timelimit(self):
+        return self.model.status == GRB.status.TIME_LIMIT
 
 
     def objVal(self) -> float:
@@ -65,7 +127,51 @@ class Solver(object):
         return var.x
 
     def vals(self, vars):
-        return [x.x for x in vars] #self.model.cbGetSolution(vars)
+        return self.model.getAttr(GRB.Attr.X, vars) # single bulk query rather than one per variable
+
+    # objective and reduced costs of vars in the LP relaxation, (None, None) if it isn't solved to optimality
+    def relaxation(self, vars):
+        self.model.update()
+        relaxed = self.model.relax()
+        relaxed.optimize()
+
+        if relaxed.status != GRB.status.OPTIMAL:
+            objective, reduced_costs = None, None
+        else:
+            relaxed_vars = relaxed.getVars()
+            objective, reduced_costs = relaxed.ObjVal, relaxed.getAttr(GRB.Attr.RC, [relaxed_vars[v.index] for v in vars])
+
+        if recorder is not None:
+            recorder.add_relaxation(self.model, objective, reduced_costs)
+
+        return objective, reduced_costs
+
+    # fix variables to 0
+    def fix(self, vars):
+        if vars:
+            self.model.setAttr(GRB.Attr.UB, vars, [0.0]*len(vars))
+
+    # keep the best n solutions found by the MIP
+    def set_pool(self, n):
+        self.model.setParam(GRB.param.PoolSolutions, n)
+
+    def sol_count(self):
+        return self.model.SolCount
+
+    # values of the i'th best solution in the pool
+    def pool_vals(self, vars, i):
+        self.model.setParam(GRB.param.SolutionNumber, i)
+        values = self.model.getAttr(GRB.Attr.Xn, vars)
+        self.model.setParam(GRB.param.SolutionNumber, 0)
+
+        if recorder is not None:
+            recorder.add_pool(self.model, i, values)
+
+        return values
+
+    # MIP start, variables not given are left undefined (partial start)
+    def set_start(self, vars, values):
+        self.model.setAttr(GRB.Attr.Start, vars, values)
 
 
     #
@@ -95,7 +201,12 @@ class Solver(object):
 
     @property
     def PresolveNumVars(self):
-        return len(self.model.presolve().getVars())
+        n = len(self.model.presolve().getVars())
+
+        if recorder is not None:
+            recorder.add_presolve(self.model, 0, n)
+
+        return n
 
     @property
     def NumConstrs(self):
@@ -103,7 +214,12 @@ class Solver(object):
 
     @property
     def PresolveNumConstrs(self):
-        return len(self.model.presolve().getConstrs())
+        n = len(self.model.presolve().getConstrs())
+
+        if recorder is not None:
+            recorder.add_presolve(self.model, 1, n)
+
+        return n
 
     #
     # add constraints
@@ -0,0 +1,159 @@
+import json
+import time
+from typing import NamedTuple
+
+# phases of an IntervalSolver iteration, in the order they run
+PHASES = ('mip', 'heuristic', 'get_inprogress', 'get_network_solution', 'discovery', 'validate', 'reduced_cost', 'add_timepoints')
+
+# arc changes made by add_network_timepoints, arcs fixed by reduced cost, and the timepoints coalesced, snapped and deferred
+COUNTS = ('added_arcs', 'renamed_arcs', 'deleted_arcs', 'fixed_arcs', 'coalesced_intervals', 'snapped_timepoints', 'deferred_timepoints')
+
+class PhaseTime(NamedTuple):
+    wall: float
+    cpu: float
+
+class IterationEvent(NamedTuple):
+    instance: str
+    iteration: int
+    lower_bound: float | None
+    incumbent: float | None
+    num_vars: int
+    num_constrs: int
+    added_timepoints: int
+    counts: dict[str, int]
+    phases: dict[str, PhaseTime]
+
+    def to_dict(self):
+        return {'instance': self.instance, 'iteration': self.iteration, 'lower_bound': self.lower_bound, 'incumbent': self.incumbent,
+                'num_vars': self.num_vars, 'num_constrs': self.num_constrs, 'added_timepoints': self.added_timepoints,
+                **{c: self.counts.get(c, 0) for c in COUNTS},
+                'phases': {p: t._asdict() for p,t in self.phases.items()}}
+
+##
+## Sinks receive one event per iteration
+##
+class MemorySink(object):
+    __slots__ = ['events']
+
+    def __init__(self):
+        self.events: list[IterationEvent] = []
+
+    def emit(self, event: IterationEvent):
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+class JsonLinesSink(object):
+    __slots__ = ['file']
+
+    def __init__(self, filename):
+        self.file = open(filename, 'a', encoding='utf-8')
+
+    def emit(self, event: IterationEvent):
+        self.file.write(json.dumps(event.to_dict()) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+# buffers the events of one solve and writes them with the instance results
+class ResultStoreSink(object):
+    __slots__ = ['store', 'instance_class', 'instance', 'id', 'events']
+
+    def __init__(self, store, instance_class, instance, id):
+        self.store = store
+        self.instance_class = instance_class
+        self.instance = instance
+        self.id = id
+        self.events: list[IterationEvent] = []
+
+    def emit(self, event: IterationEvent):
+        self.events.append(event)
+
+    def close(self):
+        if self.events:
+            self.store.append_events(self.instance_class, self.instance, self.id, self.events)
+
+##
+## Times phases (wall and cpu) and counts work within an iteration, emitting an IterationEvent at the end of each iteration.
+## A Profiler (Profiler.py) can also be attached to profile selected iterations/phases.  Without a sink or profiler every call is a no-op
+##
+class Telemetry(object):
+    __slots__ = ['sink', 'instance', 'profiler', 'enabled', 'current', 'phases', 'counts']
+
+    def __init__(self, sink=None, instance='', profiler=None):
+        self.sink = sink
+        self.instance = instance
+        self.profiler = profiler
+        self.enabled = sink is not None or profiler is not None
+        self.current = 0    # iteration in progress
+        self.phases: dict[str, PhaseTime] = {}
+        self.counts: dict[str, int] = {}
+
+    def phase(self, name):
+        return Phase(self, name) if self.enabled else NULL_PHASE
+
+    def count(self, name, n):
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def add_time(self, name, wall, cpu):
+        t = self.phases.get(name)
+        self.phases[name] = PhaseTime(t.wall + wall, t.cpu + cpu) if t is not None else PhaseTime(wall, cpu)
+
+    def iteration(self, iteration, lower_bound, incumbent, num_vars, num_constrs, added_timepoints):
+        if not self.enabled:
+            return
+
+        if self.sink is not None:
+            self.sink.emit(IterationEvent(self.instance, iteration, lower_bound, incumbent, num_vars, num_constrs, added_timepoints, self.counts, self.phases))
+
+        if self.profiler is not None:
+            self.profiler.end_iteration(iteration)
+
+        self.current = iteration + 1
+        self.phases = {}
+        self.counts = {}
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+
+        if self.profiler is not None:
+            self.profiler.close()
+
+class Phase(object):
+    __slots__ = ['telemetry', 'name', 'wall', 'cpu']
+
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        if self.telemetry.profiler is not None:
+            self.telemetry.profiler.start(self.telemetry.current, self.name)
+
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        wall, cpu = time.perf_counter() - self.wall, time.process_time() - self.cpu
+
+        if self.telemetry.profiler is not None:
+            self.telemetry.profiler.stop(self.telemetry.current, self.name)
+
+        self.telemetry.add_time(self.name, wall, cpu)
+        return False
+
+class NullPhase(object):
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+NULL_PHASE = NullPhase()
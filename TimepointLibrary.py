@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+import networkx as nx
+from collections import Counter, defaultdict
+from ProblemData import NodeTime, ProblemData
+
+PRECISION = 2   # decimal places, as IntervalSolver
+
+##
+## Library of the timepoints found by finished solves, for seeding new solves of instances over the same network (e.g. the c33_*, c35_*
+## flat-file sets).  A timepoint is kept for each commodity whose time window contains it, as an offset from the commodity's release
+## time, so it transfers to instances whose commodities have the same origin/destination but different times.
+##
+## Extra timepoints never weaken the lower bound, they only grow the first model, so seed() keeps the offsets found by at least
+## 'min_support' of the runs.  Each run is written to its own file (<root>/<network signature>/<instance>.json) so concurrent
+## workers don't contend for the library
+##
+class TimepointLibrary(object):
+    __slots__ = ['root', 'min_support', 'cache']
+
+    def __init__(self, root, min_support=0.5):
+        self.root = root
+        self.min_support = min_support      # fraction of the runs on the network
+        self.cache: dict[str, tuple[int, dict[tuple[int, int], Counter]]] = {}
+
+        os.makedirs(root, exist_ok=True)
+
+    # hash of the arcs and transit times
+    @staticmethod
+    def signature(problem: ProblemData) -> str:
+        arcs = sorted((a, b, round(t, PRECISION)) for a, destinations in problem.network.items() for b, t in destinations.items())
+        return hashlib.sha1(json.dumps(arcs).encode()).hexdigest()[:16]
+
+    # earliest arrival / latest departure of each commodity at each node
+    @staticmethod
+    def windows(problem: ProblemData):
+        G = nx.DiGraph((a, b, {'weight': t}) for a, destinations in problem.network.items() for b, t in destinations.items())
+        from_origin, to_destination = {}, {}
+
+        for c in problem.commodities:
+            if c.a[0] not in from_origin:
+                from_origin[c.a[0]] = nx.single_source_dijkstra_path_length(G, c.a[0])
+            if c.b[0] not in to_destination:
+                to_destination[c.b[0]] = nx.single_source_dijkstra_path_length(G.reverse(copy=False), c.b[0])
+
+        return [{n: (c.a[1] + e, c.b[1] - to_destination[c.b[0]][n]) for n, e in from_origin[c.a[0]].items()
+                 if n in to_destination[c.b[0]] and c.a[1] + e <= c.b[1] - to_destination[c.b[0]][n]} for c in problem.commodities]
+
+    def add(self, instance, problem: ProblemData, timepoints):
+        offsets = set()
+
+        for c, windows in zip(problem.commodities, self.windows(problem)):
+            offsets.update((c.a[0], c.b[0], n, round(t - c.a[1], PRECISION)) for n, t in timepoints if n in windows and windows[n][0] <= t <= windows[n][1])
+
+        signature = self.signature(problem)
+        directory = os.path.join(self.root, signature)
+        os.makedirs(directory, exist_ok=True)
+
+        filename = os.path.join(directory, os.path.basename(instance) + '.json')
+        temp = filename + '.tmp'
+
+        with open(temp, 'w') as file:
+            json.dump(sorted(offsets), file)
+
+        os.replace(temp, filename)
+        self.cache.pop(signature, None)
+
+    # number of runs, and the runs each (origin, destination) offset appeared in
+    def load(self, signature):
+        if signature not in self.cache:
+            directory = os.path.join(self.root, signature)
+            files = [f for f in os.listdir(directory) if f.endswith('.json')] if os.path.isdir(directory) else []
+            offsets: dict[tuple[int, int], Counter] = defaultdict(Counter)
+
+            for f in files:
+                with open(os.path.join(directory, f)) as file:
+                    for o, d, n, offset in json.load(file):
+                        offsets[o, d][n, offset] += 1
+
+            self.cache[signature] = (len(files), offsets)
+
+        return self.cache[signature]
+
+    def seed(self, problem: ProblemData) -> set[NodeTime]:
+        runs, offsets = self.load(self.signature(problem))
+        timepoints = set()
+
+        if runs == 0:
+            return timepoints
+
+        for c, windows in zip(problem.commodities, self.windows(problem)):
+            for (n, offset), count in offsets.get((c.a[0], c.b[0]), {}).items():
+                t = round(c.a[1] + offset, PRECISION)
+
+                if count >= self.min_support * runs and n in windows and windows[n][0] <= t <= windows[n][1]:
+                    timepoints.add(NodeTime(n, t))
+
+        return timepoints
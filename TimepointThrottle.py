@@ -0,0 +1,66 @@
+import logging
+from typing import NamedTuple
+from collections import Counter, defaultdict
+from ProblemData import NodeTime
+
+class ThrottleDecision(NamedTuple):
+    iteration: int
+    candidates: int     # new timepoints found this iteration plus those deferred earlier
+    added: int
+    deferred: int
+    batch: int          # batch size used
+    mip_time: float     # of the iteration's MIP, which the next batch size is adapted to
+
+##
+## Limits the timepoints added per iteration, so an iteration that finds hundreds doesn't bloat the MIP.  Candidates are ranked by
+## the category they were found for (violated paths, then cycles, mutual paths and windows) and then by impact: the commodities whose
+## solution window at the node contains the timepoint, counting consolidated commodities and violated nodes twice.  The best 'batch'
+## are added and the rest are deferred to the next iteration.  The batch size doubles while the MIP solves in under half of
+## 'target' seconds and halves when it takes longer than 'target'.  Every iteration adds at least one new timepoint, so the
+## discovery still converges
+##
+class TimepointThrottle(object):
+    __slots__ = ['batch', 'target', 'minimum', 'deferred', 'decisions']
+
+    def __init__(self, batch, target, minimum=1):
+        self.batch = batch
+        self.target = target
+        self.minimum = max(1, minimum)
+        self.deferred: set[NodeTime] = set()
+        self.decisions: list[ThrottleDecision] = []
+
+    def adapt(self, mip_time):
+        if mip_time > self.target:
+            self.batch = max(self.minimum, self.batch // 2)
+        elif mip_time < self.target / 2:
+            self.batch *= 2
+
+    # categories in priority order, the candidates not in any category (e.g. from the solution pool) are ranked last
+    def select(self, solution, iteration, mip_time, candidates: set[NodeTime], categories: list[set[NodeTime]]) -> set[NodeTime]:
+        impact = self.impact(solution, candidates)
+        priority = {tp: len(categories) for tp in candidates}
+
+        for i, category in reversed(list(enumerate(categories))):
+            priority.update((tp, i) for tp in category if tp in priority)
+
+        ranked = sorted(candidates, key=lambda tp: (priority[tp], -impact[tp], tp))
+        selected = set(ranked[:self.batch])
+        self.deferred = set(ranked[self.batch:])
+
+        decision = ThrottleDecision(iteration, len(candidates), len(selected), len(self.deferred), self.batch, mip_time)
+        self.decisions.append(decision)
+        logging.getLogger("IntervalSolver").debug("throttle {0}: {2} of {1} timepoints added, {3} deferred (batch {4}, mip {5:.2f}s)".format(*decision))
+
+        self.adapt(mip_time)
+        return selected
+
+    @staticmethod
+    def impact(solution, candidates: set[NodeTime]) -> Counter:
+        windows = defaultdict(list)
+
+        for n in solution.nodes():
+            data = solution.node_data(n)
+            weight = len(n.commodities) * (2 if len(n.commodities) > 1 else 1) * (2 if data.get('valid', True) is False else 1)
+            windows[n.node].append((data['tw'], weight))
+
+        return Counter({tp: sum(w for tw, w in windows[tp.node] if tw[0] <= tp.time <= tw[1]) for tp in candidates})
@@ -0,0 +1,250 @@
+import os
+import time
+import socket
+import _thread
+import threading
+import multiprocessing
+from os.path import exists
+from typing import Any, Callable, NamedTuple
+from Solver import get_env
+from JobQueue import JobQueue
+from tools import fork_lock, ForkSafeThread
+
+STALE_LOCK = 600        # seconds without a heartbeat before a lock is considered abandoned
+HEARTBEAT = 60          # seconds between lock refreshes while a job is running
+
+class Job(NamedTuple):
+    name: str
+    output: str                     # job is finished once this file exists
+    func: Callable[..., Any]        # called as func(*args, environment=env, cancelled=event), stops writing results once event is set
+    args: tuple
+    expected: float = 0.0           # expected run time, longest jobs are scheduled first
+    timeout: float | None = None    # wall time before the queue hands the job to another worker, None for the batch's timeout
+
+##
+## Exclusive claim on a job, using a lock file created with O_EXCL.  The owner refreshes the lock while the job runs,
+## so a lock that hasn't been touched in 'stale' seconds belongs to a dead worker and can be reclaimed
+##
+class JobLock(object):
+    __slots__ = ['filename', 'stale', 'interval', 'heartbeat', 'owner']
+
+    def __init__(self, filename, stale=STALE_LOCK, interval=HEARTBEAT):
+        self.filename = filename
+        self.stale = stale
+        self.interval = interval
+        self.heartbeat = None
+        self.owner = '{0} {1}\n'.format(socket.gethostname(), os.getpid())
+
+    def acquire(self) -> bool:
+        if not self.create() and not (self.reclaim() and self.create()):
+            return False
+
+        self.heartbeat = Heartbeat(self.refresh, self.interval, _thread.interrupt_main)
+        return True
+
+    def release(self):
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+
+            # reclaimed, the lock belongs to another worker now
+            if self.heartbeat.lost.is_set():
+                return
+
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+    def create(self) -> bool:
+        try:
+            fd = os.open(self.filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, 'w') as file:
+            file.write(self.owner)
+
+        return True
+
+    # move an abandoned lock out of the way - only one worker can win the rename
+    def reclaim(self) -> bool:
+        try:
+            if time.time() - os.path.getmtime(self.filename) < self.stale:
+                return False
+
+            moved = '{0}.{1}.{2}'.format(self.filename, socket.gethostname(), os.getpid())
+            os.rename(self.filename, moved)
+        except FileNotFoundError:
+            return True  # owner finished (or someone else reclaimed it), try to create it again
+
+        # lost a race and moved a fresh lock, put it back
+        if time.time() - os.path.getmtime(moved) < self.stale:
+            os.rename(moved, self.filename)
+            return False
+
+        os.remove(moved)
+        return True
+
+    # False if the lock was reclaimed by another worker (our heartbeats were late)
+    def refresh(self) -> bool:
+        try:
+            with open(self.filename) as file:
+                if file.read() != self.owner:
+                    return False
+
+            os.utime(self.filename)
+            return True
+        except FileNotFoundError:
+            return False
+
+##
+## Calls func every 'interval' seconds on a background thread until stopped.  Once func returns False the claim is lost: 'lost' is
+## set and on_lost is called on every beat (interrupt_main stops a running Gurobi optimize, which returns INTERRUPTED)
+##
+class Heartbeat(object):
+    __slots__ = ['func', 'interval', 'on_lost', 'lost', 'event', 'thread']
+
+    def __init__(self, func, interval=HEARTBEAT, on_lost=None):
+        self.func = func
+        self.interval = interval
+        self.on_lost = on_lost
+        self.lost = threading.Event()
+        self.event = threading.Event()
+        self.thread = ForkSafeThread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.event.wait(self.interval):
+            with fork_lock:
+                if self.func() is False:
+                    self.lost.set()
+
+                    if self.on_lost is not None and not self.event.is_set():
+                        self.on_lost()
+
+    def stop(self):
+        self.event.set()
+        self.thread.join()
+
+##
+## Worker process state
+##
+worker_env = None
+worker_jobs = {}
+
+def init_worker(threads, jobs=()):
+    global worker_env, worker_jobs
+    worker_jobs = {job.name: job for job in jobs}
+    worker_env = get_env(Threads=threads)
+
+def run_job(job: Job):
+    if exists(job.output):
+        return job.name, False
+
+    os.makedirs(os.path.dirname(job.output) or '.', exist_ok=True)
+    lock = JobLock(job.output + '.lock', STALE_LOCK, HEARTBEAT)
+
+    if not lock.acquire():
+        return job.name, False
+
+    try:
+        try:
+            # may have finished between the check above and taking the lock
+            if not exists(job.output):
+                job.func(*job.args, environment=worker_env, cancelled=lock.heartbeat.lost)
+        finally:
+            lost = lock.heartbeat.lost.is_set()
+            lock.release()
+    except KeyboardInterrupt:
+        if not lost:
+            raise
+
+    # the lock was reclaimed, the job is left to the worker that holds it now
+    if lost:
+        print("Abandoned:", job.name)
+        return job.name, False
+
+    return job.name, True
+
+# pulls jobs from a shared queue until it is empty
+def queue_worker(args):
+    filename, wal = args
+    queue = JobQueue(filename, wal=wal, stale=STALE_LOCK)
+    queue.restrict(worker_jobs)
+    ran = 0
+
+    while (name := queue.claim()) is not None:
+        job = worker_jobs[name]
+
+        # heartbeat on its own connection, sqlite connections can't be shared between threads
+        beat = JobQueue(filename, wal=wal)
+        heartbeat = Heartbeat(lambda: beat.heartbeat(name), HEARTBEAT, _thread.interrupt_main)
+
+        try:
+            try:
+                if not exists(job.output):
+                    job.func(*job.args, environment=worker_env, cancelled=heartbeat.lost)
+
+                # the runners report errors rather than raising them, a missing output means the job failed
+                if heartbeat.lost.is_set():
+                    pass
+                elif exists(job.output):
+                    queue.complete(name)
+                    ran += 1
+                else:
+                    queue.fail(name, 'no output')
+
+            except Exception as inst:
+                if not heartbeat.lost.is_set():
+                    queue.fail(name, repr(inst))
+
+            finally:
+                heartbeat.stop()
+
+        # interrupted once the job was taken away
+        except KeyboardInterrupt:
+            if not heartbeat.lost.is_set():
+                raise
+
+        finally:
+            beat.close()
+
+        # timed out, or presumed dead - the queue has handed the job to another worker
+        if heartbeat.lost.is_set():
+            print("Abandoned:", name)
+
+    queue.close()
+    return ran
+
+##
+## Runs jobs over a process pool, longest expected first.  Gurobi threads are split so that processes * threads matches the machine.
+## Jobs are claimed with lock files next to the outputs, or through a JobQueue database when 'queue' is given (for sweeps spread over
+## several machines - each machine runs the same script against the same queue file)
+##
+def run_batch(jobs: list[Job], processes=None, threads=None, queue=None, wal=True, timeout=None):
+    cpus = multiprocessing.cpu_count()
+    processes = processes or cpus
+    threads = threads or max(1, cpus // processes)
+
+    if queue is not None:
+        run_queue(jobs, queue, wal, processes, threads, timeout)
+        return
+
+    jobs = sorted(jobs, key=lambda j: j.expected, reverse=True)
+
+    with multiprocessing.Pool(processes, initializer=init_worker, initargs=(threads,)) as pool:
+        for name, ran in pool.imap_unordered(run_job, jobs, chunksize=1):
+            if ran:
+                print("Finished:", name)
+
+def run_queue(jobs: list[Job], filename, wal, processes, threads, timeout):
+    queue = JobQueue(filename, wal=wal, timeout=timeout)
+    queue.add_all((job.name, job.expected, job.timeout) for job in jobs)
+    queue.close()
+
+    with multiprocessing.Pool(processes, initializer=init_worker, initargs=(threads, jobs)) as pool:
+        ran = sum(pool.imap_unordered(queue_worker, [(filename, wal)] * processes))
+
+    queue = JobQueue(filename, wal=wal)
+    print("Finished:", ran, "jobs", queue.counts())
+    queue.close()
@@ -0,0 +1,160 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+from contextlib import nullcontext
+from os import makedirs
+from os.path import exists, join
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from ProblemData import ProblemData
+from ExampleProblems import ExampleProblems
+from instance_classification import InstanceClassification
+from Telemetry import Telemetry, MemorySink, PHASES
+from MemoryMonitor import MemoryMonitor, peak_rss, reset_peak
+from ReplaySolver import record, replay
+from Solver import get_env
+
+RESOLUTIONS = ["60minutes", "30minutes", "15minutes"]
+SAMPLE_SIZE = 2                 # instances per class
+HCHF_TIMEOUT = 60               # seconds - HC/HF instances are capped, the benchmark measures throughput rather than solving them
+TOLERANCE = 0.20                # relative increase reported as a regression
+MIN_TIME = 0.05                 # seconds - smaller differences are noise
+
+# fixed sample, evenly spaced over each class so it doesn't change between runs
+def sample(instances, n):
+    instances = sorted(instances)
+    return instances[::max(1, len(instances) // n)][:n]
+
+def benchmark_problems(resolutions, sample_size, examples=True):
+    problems = []
+
+    if examples:
+        problems.extend((f"examples/{name}", lambda p=p: p, None) for name, p in ExampleProblems.all_problems())
+
+    for resolution in resolutions:
+        path = f"instances/timed_mtl_instances_{resolution}/"
+
+        for c in InstanceClassification.EXPECTED_TIME:
+            for f in sample(getattr(InstanceClassification, c), sample_size):
+                problems.append((f"{resolution}/{c}/{f}", lambda path=path + f: ProblemData.read_file(path), HCHF_TIMEOUT if c == "HCHF" else None))
+
+    return problems
+
+def run(name, load, timeout, environment):
+    telemetry = Telemetry(MemorySink(), name)
+    memory = MemoryMonitor()
+
+    saved_timeout = interval_solver.TIMEOUT
+    interval_solver.TIMEOUT = timeout if timeout is not None else saved_timeout
+
+    try:
+        reset_peak()
+        t0 = time.perf_counter()
+        solver = IntervalSolver(load(), gap=0.01, suppress_output=True, environment=environment, telemetry=telemetry, memory=memory)
+        info = solver.solve()
+        total = time.perf_counter() - t0
+    finally:
+        interval_solver.TIMEOUT = saved_timeout
+
+    events = telemetry.sink.events
+    phases = {p: sum(e.phases[p].wall for e in events if p in e.phases) for p in PHASES}
+
+    return {"total": total,
+            "solve": info[-1][3] if info else 0.0,
+            "overhead": total - (info[-1][3] if info else 0.0),
+            "iterations": info[-1][9] + 1 if info else 0,
+            "peak_mb": peak_rss() / 1024**2,     # of the process during the solve (of the whole run where the peak can't be reset)
+            "lower_bound": solver.lower_bound,
+            "incumbent": solver.incumbent,
+            "phases": phases}
+
+##
+## Compares results to a baseline: time and overhead (time outside Gurobi) regress beyond 'tolerance' and 'min_time', memory beyond 'tolerance',
+## and a change in the number of iterations is reported since it makes the times incomparable
+##
+def compare(results, baseline, tolerance=TOLERANCE, min_time=MIN_TIME):
+    regressions = []
+
+    for name, r in results.items():
+        b = baseline.get(name)
+
+        if b is None:
+            continue
+
+        for metric in ["total", "overhead"]:
+            delta = r[metric] - b[metric]
+
+            if delta > min_time and delta > tolerance * b[metric]:
+                regressions.append(f"{name}: {metric} {b[metric]:.3f}s -> {r[metric]:.3f}s ({delta / b[metric]:+.0%})")
+
+        if r["peak_mb"] > b["peak_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {b['peak_mb']:.1f} MB -> {r['peak_mb']:.1f} MB")
+
+        if r["iterations"] != b["iterations"]:
+            regressions.append(f"{name}: iterations {b['iterations']} -> {r['iterations']}")
+
+    return regressions
+
+def summary(results, baseline=None):
+    print("{0:<45} {1:>9} {2:>9} {3:>9} {4:>5} {5:>8}".format("Problem", "Time (s)", "Solve (s)", "Base (s)", "# its", "Peak MB"))
+
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("total") if baseline else None
+        print("{0:<45} {1:9.3f} {2:9.3f} {3:>9} {4:5} {5:8.1f}".format(name, r["total"], r["solve"], f"{base:.3f}" if base is not None else "-", r["iterations"], r["peak_mb"]))
+
+    totals = {p: sum(r["phases"][p] for r in results.values()) for p in PHASES}
+    print("\nPhase totals: " + ", ".join(f"{p} {t:.2f}s" for p,t in totals.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solver on the examples and a fixed sample of instances, and compare to a baseline")
+    parser.add_argument('-r', '--resolutions', nargs='*', default=RESOLUTIONS, help=f"Instance resolutions (default: {' '.join(RESOLUTIONS)})")
+    parser.add_argument('-n', '--sample', type=int, default=SAMPLE_SIZE, help=f"Instances per class (default: {SAMPLE_SIZE})")
+    parser.add_argument('-o', '--output', default='benchmark.json', help="Results file (default: 'benchmark.json')")
+    parser.add_argument('-b', '--baseline', default=None, help="Baseline results to compare to")
+    parser.add_argument('-t', '--tolerance', type=float, default=TOLERANCE, help=f"Relative increase reported as a regression (default: {TOLERANCE})")
+    parser.add_argument('-m', '--min-time', type=float, default=MIN_TIME, help=f"Ignore time differences below this many seconds (default: {MIN_TIME})")
+    parser.add_argument('--no-examples', action='store_true', help="Skip the example problems")
+    parser.add_argument('--record', default=None, help="Record the Gurobi solves of each problem into this directory")
+    parser.add_argument('--replay', default=None, help="Replay recorded solves from this directory instead of calling Gurobi (python overhead only)")
+    args = parser.parse_args()
+
+    logging.getLogger("IntervalSolver").setLevel(logging.WARNING)
+
+    results = {}
+
+    env = get_env()
+
+    if args.record is not None:
+        makedirs(args.record, exist_ok=True)
+
+    for name, load, timeout in benchmark_problems(args.resolutions, args.sample, not args.no_examples):
+        solves = name.replace("/", "_") + ".solves.gz"
+        context = record(join(args.record, solves)) if args.record is not None else replay(join(args.replay, solves)) if args.replay is not None else nullcontext()
+
+        try:
+            with context:
+                results[name] = run(name, load, timeout, env)
+            print(f"{name}: {results[name]['total']:.3f}s", file=sys.stderr)
+        except Exception as inst:
+            print(f"{name}: exception occurred: {inst}", file=sys.stderr)
+
+    with open(args.output, "w") as file:
+        json.dump({"machine": platform.node(), "python": platform.python_version(), "results": results}, file, indent=1)
+
+    baseline = None
+
+    if args.baseline is not None and exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+
+    summary(results, baseline)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.min_time)
+        print(f"\n{len(regressions)} regression(s) compared to {args.baseline}")
+        print("\n".join(regressions))
+        exit(1 if regressions else 0)
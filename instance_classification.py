@@ -568,3 +568,15 @@ class InstanceClassification(object):
         "c59_.3333_.5_2.txt",
         "c59_.3333_.5_3.txt",
     ]
+
+    # mean total time (s) per class from the README benchmark (Gurobi 11), used to schedule the longest jobs first
+    EXPECTED_TIME = {"HCHF": 707.23, "HCLF": 86.36, "LCLF": 0.45, "LCHF": 0.04}
+
+    @classmethod
+    def classify(cls, instance):
+        return next((c for c in cls.EXPECTED_TIME if instance in getattr(cls, c)), None)
+
+    @classmethod
+    def expected_time(cls, instance):
+        c = cls.classify(instance)
+        return cls.EXPECTED_TIME[c] if c is not None else 0.0
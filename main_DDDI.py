@@ -3,41 +3,74 @@ from os import listdir
 from os.path import isdir, join, exists
 from ProblemData import ProblemData
 from IntervalSolver import IntervalSolver
-from gurobipy import Env
 from instance_classification import InstanceClassification
 from os import makedirs
-from merge import merge_csv_files
-
-def output_csv(path, file, instance, output, environment, output_last_iteration_only = True):
-    csv_filename = output + file + ".csv"
-
-    # create empty csv file, to stop other processes from trying to solve the same instance
+from batch import Job, run_batch
+from ResultStore import ResultStore, INFO_COLUMNS
+from Telemetry import Telemetry, ResultStoreSink
+from MemoryMonitor import MemoryMonitor
+from Checkpoint import Checkpoint
+from TimepointLibrary import TimepointLibrary
+
+# shared job database for sweeps spread over several machines (e.g. "output/jobs.db" on the shared drive), None to use lock files.
+# WAL is unsafe on NFS, so the queue uses a rollback journal there
+JOB_QUEUE = None
+JOB_QUEUE_WAL = False
+JOB_TIMEOUT = None          # seconds before a queued job is handed to another worker, None for no limit
+
+# results are appended to a parquet dataset, reusing a run id resumes that run
+RESULTS = "output/results"
+RUN_ID = "timed_mtl_1minute"
+
+EXPORT_CSV = True           # write a csv per class (last iteration of each instance) after the run, as merge_csv_files used to
+INSTANCE_CSV = False        # also write the old per-instance csv files
+TELEMETRY = False           # store per-iteration phase timings (ResultStore.scan_events)
+MEMORY_BUDGET = None        # MB per worker, solves over budget stop with their incumbent instead of being killed
+CHECKPOINT = True           # checkpoint each iteration, a preempted solve resumes from its last iteration
+TIMEPOINT_LIBRARY = None    # directory of the timepoints found by finished solves, used to seed solves over the same network
+
+def output_csv(csv_filename, file, instance, info):
     with open(csv_filename, "w", newline="", encoding="utf-8") as csvfile:
-        pass
+        writer = csv.writer(csvfile)
+        writer.writerow(["Instance", "Id"] + INFO_COLUMNS)
+        for i in info:
+            writer.writerow([file, instance] + list(i))
 
+def solve_instance(path, file, instance, output, store, instance_class, environment, cancelled=None):
     try:
-        print(csv_filename)
+        print(file)
         p = ProblemData.read_file(path + file)
-        problem = IntervalSolver(p, gap=0.01, environment=environment)
+        telemetry = Telemetry(ResultStoreSink(store, instance_class, file, instance), file) if TELEMETRY else None
+        library = TimepointLibrary(TIMEPOINT_LIBRARY) if TIMEPOINT_LIBRARY is not None else None
+        checkpoint = Checkpoint(output + file + ".checkpoint") if CHECKPOINT else None
+        args = dict(gap=0.01, environment=environment, telemetry=telemetry, memory=MemoryMonitor(MEMORY_BUDGET) if MEMORY_BUDGET is not None else None)
+        problem = IntervalSolver.resume(p, checkpoint, **args) if checkpoint is not None and checkpoint.exists() else IntervalSolver(p, time_points=library.seed(p) if library is not None else None, checkpoint=checkpoint, **args)
         info = problem.solve()
-        
-        if output_last_iteration_only:
-            info = info[-1:]  # Get the last iteration only
 
-        header = ["Instance", "Id", "LB", "UB", "total time", "solve time", "Added Time points", "# Vars", "# Cons", "# Presolve Vars", "# Presolve Cons", "# Its", "IP Gap"]
+        # the job was handed to another worker, which writes the results
+        if cancelled is not None and cancelled.is_set():
+            return
+
+        if telemetry is not None:
+            telemetry.close()
+
+        if INSTANCE_CSV:
+            output_csv(output + file + ".csv", file, instance, info[-1:])  # last iteration only
+
+        store.append(instance_class, file, instance, info)
+
+        if library is not None and problem.status:
+            library.add(file, p, {(n,t) for i,n,t in problem.timepoints_per_iteration})
 
-        with open(csv_filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(header)
-            for i in info:
-                writer.writerow([file, instance] + list(i))
+        if checkpoint is not None:
+            checkpoint.remove()
 
     except Exception as inst:
         print("Exception occurred:", type(inst))
         print(inst.args)
 
 
-def run_all(selected_instances, output_dir: str):
+def class_jobs(selected_instances, output_dir: str, store: ResultStore) -> list[Job]:
     path = r"instances/timed_mtl_instances_1minute/"
     instances = [f for f in listdir(path) if not isdir(join(path, f)) and f in selected_instances]
     output = f"output/{output_dir}/"
@@ -46,21 +79,25 @@ def run_all(selected_instances, output_dir: str):
     if not exists(output):
         makedirs(output)
 
-    env = Env("")
+    # the results are only written once the instance is solved, so finished instances are skipped on restart
+    return [Job(RUN_ID + "/" + output_dir + "/" + instance, store.path(output_dir, instance, 1), solve_instance, (path, instance, 1, output, store, output_dir), InstanceClassification.expected_time(instance))
+            for instance in instances]
 
-    for instance in instances:
-        if not exists(output + instance + ".csv"):
-            output_csv(path, instance, 1, output, env)
+# all classes go in one batch, so the longest jobs (HC/HF) start first whatever their class
+def run_all(classes: list[tuple[list[str], str]]):
+    store = ResultStore(RESULTS, RUN_ID)
+    run_batch([job for selected_instances, output_dir in classes for job in class_jobs(selected_instances, output_dir, store)], queue=JOB_QUEUE, wal=JOB_QUEUE_WAL, timeout=JOB_TIMEOUT)
 
-    # merge output files for easier analysis
-    merge_csv_files(output + output_dir + '.csv', *[output + instance + ".csv" for instance in instances])
+    if EXPORT_CSV:
+        for _, output_dir in classes:
+            store.export_csv(f"output/{output_dir}/{output_dir}.csv", output_dir, last_iteration_only=True)
 
 
 
 if __name__ == "__main__":
-    run_all(InstanceClassification.LCLF, "LCLF")
-    run_all(InstanceClassification.LCHF, "LCHF")
-    run_all(InstanceClassification.HCLF, "HCLF")
-    run_all(InstanceClassification.HCHF, "HCHF")
+    run_all([(InstanceClassification.LCLF, "LCLF"),
+             (InstanceClassification.LCHF, "LCHF"),
+             (InstanceClassification.HCLF, "HCLF"),
+             (InstanceClassification.HCHF, "HCHF")])
 
 
@@ -3,34 +3,86 @@ from os import listdir
 from os.path import isdir, join, exists
 from ProblemData import ProblemData
 from IntervalSolver import IntervalSolver
-from gurobipy import Env
 from os import makedirs
-from merge import merge_csv_files
+from batch import Job, run_batch
+from ResultStore import ResultStore, INFO_COLUMNS
+from Telemetry import Telemetry, ResultStoreSink
+from MemoryMonitor import MemoryMonitor
+from Checkpoint import Checkpoint
+from TimepointLibrary import TimepointLibrary
 
-def output_csv(path, file, instance, output, environment):
-    csv_filename = output + file + "_" + instance + ".csv"
+# shared job database for sweeps spread over several machines (e.g. "output/jobs.db" on the shared drive), None to use lock files.
+# WAL is unsafe on NFS, so the queue uses a rollback journal there
+JOB_QUEUE = None
+JOB_QUEUE_WAL = False
+JOB_TIMEOUT = None          # seconds before a queued job is handed to another worker, None for no limit
 
+# mean total time (s) per instance type from the README benchmark (Gurobi 12), used to schedule the longest jobs first
+EXPECTED_TIME = {'critical_times': 17.87, 'designated_paths': 26.17, 'hub_and_spoke': 6.73}
+
+# results are appended to a parquet dataset, reusing a run id resumes that run
+RESULTS = "output/results"
+RUN_ID = "snd_rr"
+
+EXPORT_CSV = True           # write a csv per instance type after the run, as merge_csv_files used to
+INSTANCE_CSV = False        # also write the old per-instance csv files
+TELEMETRY = False           # store per-iteration phase timings (ResultStore.scan_events)
+MEMORY_BUDGET = None        # MB per worker, solves over budget stop with their incumbent instead of being killed
+CHECKPOINT = True           # checkpoint each iteration, a preempted solve resumes from its last iteration
+TIMEPOINT_LIBRARY = None    # directory of the timepoints found by finished solves, used to seed solves over the same network
+
+def output_csv(csv_filename, file, instance, info):
+    with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Instance', 'Id'] + INFO_COLUMNS)
+        for i in info:
+            writer.writerow([file, instance] + list(i))
+
+def solve_instance(path, file, instance, output, store, instance_type, environment, cancelled=None):
     try:
-        print(csv_filename)
+        print(file + "_" + instance)
         p = ProblemData.read_directory(path + file + "/" + instance)
-        problem = IntervalSolver(p, fixed_paths=p.fixed_paths, gap=0.01, environment=environment)
+        telemetry = Telemetry(ResultStoreSink(store, instance_type, file, instance), file) if TELEMETRY else None
+        library = TimepointLibrary(TIMEPOINT_LIBRARY) if TIMEPOINT_LIBRARY is not None else None
+        checkpoint = Checkpoint(output + file + "_" + instance + ".checkpoint") if CHECKPOINT else None
+        args = dict(fixed_paths=p.fixed_paths, gap=0.01, environment=environment, telemetry=telemetry, memory=MemoryMonitor(MEMORY_BUDGET) if MEMORY_BUDGET is not None else None)
+        problem = IntervalSolver.resume(p, checkpoint, **args) if checkpoint is not None and checkpoint.exists() else IntervalSolver(p, time_points=library.seed(p) if library is not None else None, checkpoint=checkpoint, **args)
         info = problem.solve()
 
-        header = ['Instance','Id','LB','UB','total time','solve time','Added Time points','# Vars','# Cons','# Presolve Vars','# Presolve Cons','# Its','IP Gap']
-        
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(header)
-            for i in info:
-                writer.writerow([file, instance] + list(i))
-    
+        # the job was handed to another worker, which writes the results
+        if cancelled is not None and cancelled.is_set():
+            return
+
+        if telemetry is not None:
+            telemetry.close()
+
+        if INSTANCE_CSV:
+            output_csv(output + file + "_" + instance + ".csv", file, instance, info)
+
+        store.append(instance_type, file, instance, info)
+
+        if library is not None and problem.status:
+            library.add(file + "_" + instance, p, {(n,t) for i,n,t in problem.timepoints_per_iteration})
+
+        if checkpoint is not None:
+            checkpoint.remove()
+
     except Exception as inst:
         print("Exception occurred:", type(inst))
         print(inst.args)
 
-def run_all(input_path, output_path, instance_type):
-    env = Env("")
+# expected time of an instance: the mean time of its type, scaled by its number of commodities relative to the type's mean
+def expected_times(directories, instance_type):
+    commodities = {}
 
+    for d in directories:
+        with open(join(d, 'commodities.csv')) as file:
+            commodities[d] = max(1, sum(1 for _ in file) - 1)  # header
+
+    mean = sum(commodities.values()) / len(commodities) if commodities else 1
+    return {d: EXPECTED_TIME.get(instance_type, 0.0) * n / mean for d,n in commodities.items()}
+
+def type_jobs(input_path, output_path, instance_type, store: ResultStore) -> list[Job]:
     path = f'{input_path}{instance_type}/'
     output = f'{output_path}{instance_type}/'
 
@@ -39,24 +91,23 @@ def run_all(input_path, output_path, instance_type):
         makedirs(output)
 
     # List all instance directories in the path
-    instances = [f for f in listdir(path) if isdir(join(path, f))]
-
-    # Iterate over each instance
-    for instance in instances:
-        # List all subdirectories (ids) within each instance directory
-        ids = [f for f in listdir(join(path, instance)) if isdir(join(path, instance, f))]
+    ids = [(instance, i) for instance in listdir(path) if isdir(join(path, instance))
+                         for i in listdir(join(path, instance)) if isdir(join(path, instance, i))]
+    expected = expected_times([join(path, instance, i) for instance, i in ids], instance_type)
 
-        # For each id, check if the output CSV already exists; if not, process and generate it
-        for i in ids:
-            if not exists(output + instance + "_" + i + ".csv"):
-                output_csv(path, instance, i, output, env)
+    # One job per instance id, jobs already in the result store are skipped
+    return [Job(RUN_ID + "/" + instance_type + "/" + instance + "_" + i, store.path(instance_type, instance, i), solve_instance, (path, instance, i, output, store, instance_type),
+                expected[join(path, instance, i)])
+            for instance, i in ids]
 
-    # List all subdirectories (ids) within each instance directory
-    files = [output + instance + "_" + id + ".csv" 
-            for instance in listdir(path) if isdir(join(path, instance)) 
-            for id in listdir(join(path, instance)) if isdir(join(path, instance, id))]
+# all types go in one batch, so the longest jobs start first whatever their type
+def run_all(input_path, output_path, instance_types):
+    store = ResultStore(RESULTS, RUN_ID)
+    run_batch([job for instance_type in instance_types for job in type_jobs(input_path, output_path, instance_type, store)], queue=JOB_QUEUE, wal=JOB_QUEUE_WAL, timeout=JOB_TIMEOUT)
 
-    merge_csv_files(output + instance_type + '.csv', *files)
+    if EXPORT_CSV:
+        for instance_type in instance_types:
+            store.export_csv(f'{output_path}{instance_type}/{instance_type}.csv', instance_type)
 
 
 if __name__ == "__main__":
@@ -65,6 +116,4 @@ if __name__ == "__main__":
     input_path = '../SND-RR/Instances/'
     output_path = 'output/'
 
-    run_all(input_path, output_path, 'critical_times')
-    run_all(input_path, output_path, 'hub_and_spoke')
-    run_all(input_path, output_path, 'designated_paths')
+    run_all(input_path, output_path, ['critical_times', 'hub_and_spoke', 'designated_paths'])
@@ -0,0 +1,110 @@
+import argparse
+import polars as pl
+from ResultStore import ResultStore
+
+# README labels for the instance classes
+LABELS = {"HCHF": "HC/HF", "HCLF": "HC/LF", "LCHF": "LC/HF", "LCLF": "LC/LF"}
+
+GAP_TARGET = 0.01       # an instance counts as solved if its final gap is within the target
+TOLERANCE = 0.10        # relative increase in time that is reported as a regression
+MIN_TIME = 1.0          # seconds - smaller differences are noise, not regressions
+
+# the last iteration of each instance holds the final bounds and the cumulative times
+def final_iterations(lf: pl.LazyFrame) -> pl.LazyFrame:
+    return lf.filter(pl.col("Iteration") == pl.col("Iteration").max().over("run_id", "instance_class", "Instance", "Id"))
+
+##
+## Per-class aggregates, the same columns as the README tables
+##
+def class_summary(lf: pl.LazyFrame, target=GAP_TARGET) -> pl.LazyFrame:
+    return (final_iterations(lf)
+            .group_by("run_id", "instance_class")
+            .agg(pl.len().alias("Instances"),
+                 (pl.col("IP Gap").mean() * 100).alias("Gap (%)"),
+                 pl.col("total time").mean().alias("Time (s)"),
+                 pl.col("solve time").mean().alias("Solve (s)"),
+                 (pl.col("total time") - pl.col("solve time")).mean().alias("Overhead (s)"),
+                 pl.col("# Its").mean().alias("# its"),
+                 ((pl.col("IP Gap") <= target + 1e-9).fill_null(False).mean() * 100).alias("Solved (%)"))
+            .sort("run_id", "instance_class"))
+
+##
+## Each run against the baseline run.  Time and Overhead (time outside Gurobi) regress if they grow by more than 'tolerance' and 'min_time' seconds
+##
+def compare(summary: pl.LazyFrame, baseline: str, tolerance=TOLERANCE, min_time=MIN_TIME) -> pl.LazyFrame:
+    base = summary.filter(pl.col("run_id") == baseline).select("instance_class", *[pl.col(c).alias(c + " base") for c in ["Gap (%)", "Time (s)", "Overhead (s)", "Solved (%)"]])
+
+    def regressed(column):
+        delta = pl.col(column) - pl.col(column + " base")
+        return (delta > min_time) & (delta > tolerance * pl.col(column + " base"))
+
+    return (summary.filter(pl.col("run_id") != baseline)
+            .join(base, on="instance_class", how="inner")
+            .select("run_id", "instance_class",
+                    (pl.col("Gap (%)") - pl.col("Gap (%) base")).alias("Δ Gap (%)"),
+                    (pl.col("Time (s)") - pl.col("Time (s) base")).alias("Δ Time (s)"),
+                    ((pl.col("Time (s)") / pl.col("Time (s) base") - 1) * 100).alias("Δ Time (%)"),
+                    (pl.col("Overhead (s)") - pl.col("Overhead (s) base")).alias("Δ Overhead (s)"),
+                    (pl.col("Solved (%)") - pl.col("Solved (%) base")).alias("Δ Solved (%)"),
+                    pl.concat_str([pl.when(regressed("Time (s)")).then(pl.lit("time")),
+                                   pl.when(regressed("Overhead (s)")).then(pl.lit("overhead"))], separator=" ", ignore_nulls=True).alias("Regression"))
+            .sort("run_id", "instance_class"))
+
+def markdown(df: pl.DataFrame) -> str:
+    def cell(column, value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.2f}%" if "(%)" in column else f"{value:.2f}" if "(s)" in column else f"{value:.1f}"
+        return LABELS.get(value, str(value))
+
+    lines = ["| " + " | ".join(df.columns) + " |", "|" + "|".join("-" * (len(c) + 1) + ":" for c in df.columns) + "|"]
+    lines += ["| " + " | ".join(cell(c, v) for c, v in zip(df.columns, row)) + " |" for row in df.iter_rows()]
+    return "\n".join(lines)
+
+def report(store: ResultStore, runs=None, baseline=None, target=GAP_TARGET, tolerance=TOLERANCE, min_time=MIN_TIME) -> bool:
+    lf = store.scan()
+    runs = runs or store.runs()
+
+    if baseline is not None and baseline not in runs:
+        runs = [baseline] + runs
+
+    if not runs:
+        print("No results found in", store.root)
+        return False
+
+    summary = class_summary(lf.filter(pl.col("run_id").is_in(runs)), target).collect().lazy()
+
+    for run in runs:
+        print(f"\n## {run}\n")
+        print(markdown(summary.filter(pl.col("run_id") == run).drop("run_id", "Overhead (s)").rename({"instance_class": "Class"}).collect()))
+
+    if len(runs) < 2:
+        return False
+
+    baseline = baseline or runs[0]
+    deltas = compare(summary, baseline, tolerance, min_time).collect()
+
+    print(f"\n## Compared to {baseline}\n")
+    print(markdown(deltas.rename({"run_id": "Run", "instance_class": "Class"})))
+
+    regressions = deltas.filter(pl.col("Regression") != "")
+
+    if len(regressions) > 0:
+        print(f"\n{len(regressions)} regression(s) beyond {tolerance:.0%} and {min_time}s")
+
+    return len(regressions) > 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-class benchmark tables (as in the README) from stored results")
+    parser.add_argument('runs', nargs='*', help="Run ids to report, in order (default: all runs)")
+    parser.add_argument('-r', '--results', default='output/results', help="Result store directory (default: 'output/results')")
+    parser.add_argument('-b', '--baseline', default=None, help="Run id the others are compared to (default: first run)")
+    parser.add_argument('-g', '--gap', type=float, default=GAP_TARGET, help=f"Gap at which an instance counts as solved (default: {GAP_TARGET})")
+    parser.add_argument('-t', '--tolerance', type=float, default=TOLERANCE, help=f"Relative time increase reported as a regression (default: {TOLERANCE})")
+    parser.add_argument('-m', '--min-time', type=float, default=MIN_TIME, help=f"Ignore time differences below this many seconds (default: {MIN_TIME})")
+    args = parser.parse_args()
+
+    regressed = report(ResultStore(args.results), args.runs, args.baseline, args.gap, args.tolerance, args.min_time)
+    exit(1 if regressed else 0)
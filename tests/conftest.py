@@ -0,0 +1,55 @@
+import os
+import sys
+import random
+import pytest
+
+# the modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from ExampleProblems import ExampleProblems
+from ProblemData import NodeTime
+
+PROBLEMS = ['n4c3', 'path_fail', 'middle_window', 'ms_test4', 'time_travel_consolidations']
+GAP = 0.01
+
+# the example problems the solve options are compared on
+@pytest.fixture(params=PROBLEMS)
+def example(request):
+    return request.param
+
+@pytest.fixture
+def problem():
+    def load(name):
+        return dict(ExampleProblems.all_problems())[name]
+
+    return load
+
+# random timepoints leave many adjacent intervals with the same arcs and many candidates close to existing timepoints
+@pytest.fixture
+def random_timepoints(problem):
+    def generate(name, seed, per_node=3):
+        rng, solver = random.Random(seed), IntervalSolver(problem(name), suppress_output=True)
+        return {NodeTime(n, round(rng.uniform(solver.S, solver.T), 2)) for n in solver.network.nodes() for _ in range(per_node)}
+
+    return generate
+
+# solves the example as is, then with the IntervalSolver flags set.  Both have to finish with their incumbents within the gap
+@pytest.fixture
+def solve_with(problem, monkeypatch):
+    def solve(name, flags={}, time_points=None, **kwargs):
+        default = IntervalSolver(problem(name), gap=GAP, suppress_output=True, time_points=time_points)
+        default.solve()
+
+        for flag, value in flags.items():
+            monkeypatch.setattr(interval_solver, flag, value)
+
+        solver = IntervalSolver(problem(name), gap=GAP, suppress_output=True, time_points=time_points, **kwargs)
+        solver.solve()
+
+        assert default.status and solver.status
+        assert abs(solver.incumbent - default.incumbent) <= GAP * max(solver.incumbent, default.incumbent) + 1e-6
+        return default, solver
+
+    return solve
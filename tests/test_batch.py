@@ -0,0 +1,31 @@
+import os
+from batch import JobLock, Heartbeat
+
+def test_lock_claim_and_reclaim(tmp_path):
+    filename = str(tmp_path / 'job.lock')
+    a, b = JobLock(filename, stale=60), JobLock(filename, stale=60)
+    b.owner = 'other\n'
+
+    assert a.create() and not b.create()
+    assert not b.reclaim() and a.refresh()
+
+    # no refresh for longer than stale, the other worker takes the lock over
+    os.utime(filename, (0, 0))
+    assert b.reclaim() and b.create()
+    assert not a.refresh() and b.refresh()
+
+def test_lost_lock_is_left_to_its_new_owner(tmp_path):
+    filename = str(tmp_path / 'job.lock')
+    a, b = JobLock(filename, stale=60), JobLock(filename, stale=60)
+    b.owner = 'other\n'
+
+    assert a.create()
+    os.utime(filename, (0, 0))
+    assert b.reclaim() and b.create()
+
+    # without on_lost, which would interrupt the test
+    a.heartbeat = Heartbeat(a.refresh, 0.01)
+    assert a.heartbeat.lost.wait(5)
+
+    a.release()
+    assert os.path.exists(filename) and b.refresh()
@@ -0,0 +1,30 @@
+from ExampleProblems import ExampleProblems
+from MemoryMonitor import rss, peak_rss, reset_peak
+from benchmark import run, compare
+
+# a spike freed before the next reading still counts
+def test_peak_includes_spikes():
+    reset_peak()
+    before = rss()
+    spike = bytearray(64 * 1024**2)
+    spike[::4096] = b'\1' * len(spike[::4096])
+    del spike
+
+    assert rss() < before + 32 * 1024**2 and peak_rss() >= before + 48 * 1024**2
+
+    # starts over from the current rss
+    if reset_peak():
+        assert peak_rss() < before + 32 * 1024**2
+
+def test_run():
+    p = dict(ExampleProblems.all_problems())['n4c3']
+    result = run('examples/n4c3', lambda: p, None, None)
+
+    assert result['iterations'] > 0 and result['incumbent'] is not None
+    assert result['peak_mb'] * 1024**2 >= rss() * 0.5 and result['peak_mb'] * 1024**2 <= peak_rss() + 1
+
+def test_compare():
+    base = {'total': 1.0, 'overhead': 0.5, 'iterations': 3, 'peak_mb': 100.0}
+    assert compare({'a': dict(base, peak_mb=115.0)}, {'a': base}) == []
+    assert compare({'a': dict(base, peak_mb=130.0)}, {'a': base}) == ["a: peak memory 100.0 MB -> 130.0 MB"]
+    assert compare({'a': dict(base, total=1.3, iterations=4)}, {'a': base, 'b': base}) == ["a: total 1.000s -> 1.300s (+30%)", "a: iterations 3 -> 4"]
@@ -0,0 +1,56 @@
+import pytest
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from Checkpoint import Checkpoint
+from ExampleProblems import ExampleProblems
+from SolveSchedule import EarlyStopSchedule
+
+def problem(name='n4c3'):
+    return dict(ExampleProblems.all_problems())[name]
+
+# preempted once the first iteration is saved
+class Preempt(Checkpoint):
+    __slots__ = []
+
+    def save(self, solver, iteration, *args):
+        super().save(solver, iteration, *args)
+        raise KeyboardInterrupt
+
+def preempt(filename, **kwargs):
+    with pytest.raises(KeyboardInterrupt):
+        IntervalSolver(problem(), gap=0.01, suppress_output=True, checkpoint=Preempt(filename), **kwargs).solve()
+
+    return Checkpoint(filename)
+
+def test_resume_timing(tmp_path):
+    full = IntervalSolver(problem(), gap=0.01, suppress_output=True)
+    full.solve()
+
+    checkpoint = preempt(str(tmp_path / 'n4c3.checkpoint'))
+    state = checkpoint.load()
+    assert state.iteration == 0 and state.total_time >= state.solve_time > 0
+
+    solver = IntervalSolver.resume(problem(), checkpoint, gap=0.01, suppress_output=True)
+    info = solver.solve()
+
+    # the resumed rows count the time before the preemption
+    assert info and all(i[2] >= i[3] for i in info)
+    assert info[0][2] >= state.total_time and info[0][3] >= state.solve_time
+    assert [i[9] for i in info] == list(range(1, len(info) + 1))
+
+    assert solver.status and solver.incumbent == pytest.approx(full.incumbent)
+
+def test_resume_restores_solve_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(interval_solver, 'TIMEPOINT_BATCH', 1)
+    monkeypatch.setattr(interval_solver, 'SNAP_TOLERANCE', 1)
+
+    checkpoint = preempt(str(tmp_path / 'n4c3.checkpoint'), schedule=EarlyStopSchedule(minimum=1))
+    state = checkpoint.load()
+
+    solver = IntervalSolver.resume(problem(), checkpoint, gap=0.01, suppress_output=True)
+    assert solver.snapped == state.snapped
+    assert solver.throttle.batch == state.throttle.batch and solver.throttle.deferred == state.throttle.deferred
+    assert isinstance(solver.schedule, EarlyStopSchedule) and solver.schedule.mip_gap == state.schedule.mip_gap
+
+    solver.solve()
+    assert solver.status
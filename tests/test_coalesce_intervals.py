@@ -0,0 +1,40 @@
+import pytest
+from IntervalSolver import IntervalSolver
+
+def objective(solver):
+    solver.model.set_gap(0)
+    solver.model.update()
+    solver.model.optimize()
+    return solver.model.objVal()
+
+@pytest.mark.parametrize("name", ['n4c3', 'path_fail', 'middle_window', 'ms_test4'])
+def test_relaxation_unchanged(name, problem, random_timepoints):
+    solver = IntervalSolver(problem(name), suppress_output=True, time_points=random_timepoints(name, 1, per_node=5))
+    before, intervals = objective(solver), len(solver.intervals)
+
+    merged = solver.coalesce_intervals()
+    assert merged and merged <= solver.coalesced
+    assert len(solver.intervals) == intervals - len(merged)
+    assert objective(solver) == pytest.approx(before)
+
+    # each timepoint is coalesced at most once
+    solver.add_network_timepoints(merged)
+    assert not solver.coalesce_intervals() & merged
+
+@pytest.mark.parametrize("seed", [None, 1, 2])
+def test_solve_matches_default(example, seed, solve_with, random_timepoints, monkeypatch):
+    coalesce = IntervalSolver.coalesce_intervals
+    merged = []
+
+    # every merge leaves one interval fewer
+    def coalesce_intervals(solver):
+        intervals = len(solver.intervals)
+        result = coalesce(solver)
+        assert len(solver.intervals) == intervals - len(result)
+        merged.append(len(result))
+        return result
+
+    monkeypatch.setattr(IntervalSolver, 'coalesce_intervals', coalesce_intervals)
+    default, solver = solve_with(example, {'COALESCE_INTERVALS': True}, random_timepoints(example, seed, per_node=5) if seed is not None else None)
+
+    assert len(solver.coalesced) == sum(merged)
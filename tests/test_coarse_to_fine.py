@@ -0,0 +1,30 @@
+import pytest
+from IntervalSolver import IntervalSolver
+from CoarseToFine import solve_coarse_to_fine, scale
+from ProblemData import NodeTime
+
+GAP = 0.01
+
+@pytest.mark.parametrize("factors", [(2,), (4, 2)])
+def test_matches_direct_solve(example, factors, problem):
+    direct = IntervalSolver(problem(example), gap=GAP, suppress_output=True)
+    direct.solve()
+
+    p = problem(example)
+    commodities = [(c.a, c.b) for c in p.commodities]
+    solver, info, levels = solve_coarse_to_fine(p, factors, gap=GAP, suppress_output=True)
+
+    # a level per factor, finishing with the problem itself (which the coarse levels don't change)
+    assert [level.factor for level in levels] == sorted(factors, reverse=True) + [1]
+    assert [(c.a, c.b) for c in p.commodities] == commodities
+    assert levels[-1].incumbent == solver.incumbent and levels[-1].iterations == info[-1][9] + 1
+
+    # the coarse solution's timepoints, scaled, seed the problem
+    assert levels[-1].seeded > 0
+
+    assert direct.status and solver.status
+    assert abs(solver.incumbent - direct.incumbent) <= GAP * max(solver.incumbent, direct.incumbent) + 1e-6
+
+def test_scale():
+    assert scale({NodeTime(0, 3), NodeTime(1, 5.5)}, 4, 2) == {NodeTime(0, 6), NodeTime(1, 11)}
+    assert scale({NodeTime(0, 6)}, 2, 1) == {NodeTime(0, 12)}
@@ -0,0 +1,51 @@
+import os
+import threading
+import multiprocessing
+import pytest
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from ExampleProblems import ExampleProblems
+from tools import fork_map, ForkSafeThread
+
+PROBLEMS = ['n4c3', 'path_fail', 'middle_window', 'ms_test4', 'time_travel_consolidations', 'middle_cycle']
+
+def scaled(state, item):
+    return state * item, os.getpid()
+
+def background(thread_class):
+    event = threading.Event()
+    thread = thread_class(target=event.wait, daemon=True)
+    thread.start()
+    return event, thread
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="needs fork")
+@pytest.mark.parametrize("thread_class, forked", [(None, True), (ForkSafeThread, True), (threading.Thread, False)])
+def test_forks_only_when_safe(thread_class, forked):
+    event, thread = background(thread_class) if thread_class is not None else (None, None)
+
+    try:
+        results = fork_map(scaled, 3, range(10), processes=2)
+    finally:
+        if event is not None:
+            event.set()
+            thread.join()
+
+    assert [r for r,pid in results] == [3 * i for i in range(10)]
+    assert any(pid != os.getpid() for r,pid in results) == forked
+
+def test_serial():
+    assert fork_map(scaled, 2, [5], processes=4) == [(10, os.getpid())]
+    assert fork_map(scaled, 2, range(3), processes=1) == [(0, os.getpid()), (2, os.getpid()), (4, os.getpid())]
+
+@pytest.mark.parametrize("name", PROBLEMS)
+def test_parallel_discovery_matches_serial(name, monkeypatch):
+    problem = dict(ExampleProblems.all_problems())[name]
+    serial = IntervalSolver(problem, gap=0.01, suppress_output=True)
+    info = serial.solve()
+
+    monkeypatch.setattr(interval_solver, 'PARALLEL_DISCOVERY_NODES', 0)
+    monkeypatch.setattr(interval_solver, 'DISCOVERY_PROCESSES', 2)
+    parallel = IntervalSolver(dict(ExampleProblems.all_problems())[name], gap=0.01, suppress_output=True)
+
+    strip = lambda info: [(i[0], i[1], i[4], i[5], i[6], i[9]) for i in info]
+    assert strip(parallel.solve()) == strip(info) and parallel.timepoints == serial.timepoints
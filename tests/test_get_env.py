@@ -0,0 +1,31 @@
+import os
+import multiprocessing
+import pytest
+import Solver as solver_module
+from Solver import Solver, get_env
+from tools import fork_map
+
+def test_reused():
+    env = get_env()
+    assert get_env() is env and Solver().model.getAttr('NumVars') == 0
+
+    # one environment per parameter set, whatever order the parameters are given in
+    threads = get_env(Threads=1, Seed=2)
+    assert get_env(Seed=2, Threads=1) is threads and threads is not env and get_env(Threads=1) is not threads
+    assert threads.getParam('Threads') == 1 and threads.getParam('Seed') == 2 and threads.getParam('OutputFlag') == 0
+
+def child(parent, item):
+    env = get_env()
+    solver = Solver()
+    x = solver.addVar(1, 1, 2)
+    solver.optimize()
+    return os.getpid(), env is parent, env is get_env(), solver.objVal()
+
+# a forked child starts its own environment rather than using the one it inherited
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_fresh_after_fork():
+    parent = get_env()
+    results = fork_map(child, parent, range(2), processes=2)
+
+    assert all(pid != os.getpid() and not inherited and reused and objective == 1.0 for pid, inherited, reused, objective in results)
+    assert get_env() is parent and all(pid == os.getpid() for pid, params in solver_module.environments)
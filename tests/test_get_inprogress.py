@@ -0,0 +1,63 @@
+import random
+from collections import defaultdict
+import networkx as nx
+import numpy as np
+import pytest
+from IntervalSolver import IntervalSolver, SPLIT_PRECISION
+from ExampleProblems import ExampleProblems
+from ProblemData import NodeTime
+
+PROBLEMS = ['n4c3', 'path_fail', 'middle_window', 'ms_test4', 'time_travel_consolidations', 'middle_cycle']
+
+# get_inprogress as it was before reading the solution in bulk: a path graph per commodity from its dispatch arcs, dropping subtours
+# away from the origin, and the consolidations on those paths
+def reference(solver, values):
+    index = solver.get_solution_index()
+    x_values, z_values = values[:len(index.x)], values[len(index.x):]
+    path_graphs = [nx.DiGraph() for k in solver.timed_network]
+
+    for (k,a1,a2),v in zip(index.x, x_values):
+        if v > SPLIT_PRECISION and a1[0] != a2[0]:
+            path_graphs[k].add_edge(a1[0], a2[0])
+
+    for k,PG in enumerate(path_graphs):
+        for subtour in list(nx.weakly_connected_components(PG)):
+            if solver.commodities[k].a[0] not in subtour:
+                PG.remove_nodes_from(subtour)
+
+    arcs = {(k,a1,a2): v for (k,a1,a2),v in zip(index.x, x_values) if v > SPLIT_PRECISION}
+    cons = {(a1,a2): frozenset(k for k in K if path_graphs[k].has_edge(a1[0], a2[0]) and (k,a1,a2) in arcs) for (a1,a2,K),v in zip(index.z, z_values) if round(v) > 0}
+    consolidations = defaultdict(list)
+
+    for (a1,a2),K in cons.items():
+        if K:
+            consolidations[a1[0],a2[0]].append(K)
+
+            for k in K:
+                d = path_graphs[k].get_edge_data(a1[0], a2[0])
+                d.setdefault('K', []).append(K)
+                d.setdefault('q', []).append(arcs[k,a1,a2])
+
+    return path_graphs, consolidations
+
+def assert_same(solver, values):
+    paths, consolidations = solver.get_inprogress(values)
+    expected_paths, expected_consolidations = reference(solver, np.asarray(values, dtype=float))
+
+    assert [sorted(PG.edges(data=True)) for PG in paths] == [sorted(PG.edges(data=True)) for PG in expected_paths]
+    assert dict(consolidations) == dict(expected_consolidations)
+
+@pytest.mark.parametrize("name", PROBLEMS)
+def test_matches_reference(name):
+    problem = dict(ExampleProblems.all_problems())[name]
+    rng, solver = random.Random(1), IntervalSolver(problem, suppress_output=True)
+    solver.add_network_timepoints({NodeTime(n, round(rng.uniform(solver.S, solver.T), 2)) for n in solver.network.nodes() for _ in range(3)})
+
+    solver.model.update()
+    solver.model.optimize()
+    index = solver.get_solution_index()
+    assert_same(solver, solver.model.vals(index.vars))
+
+    # arbitrary values, with split flows and subtours
+    for _ in range(20):
+        assert_same(solver, [rng.choice([0.0, 0.0, 0.0, 0.5, 1.0]) for v in index.vars])
@@ -0,0 +1,57 @@
+import random
+import networkx as nx
+import pytest
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+
+# n5c4, recursive_mutual and simple_path_fail have timed networks with cycles, so their paths are found by dijkstra
+@pytest.mark.parametrize("name", ['n4c3', 'ms_test4', 'time_travel_consolidations', 'n5c4', 'recursive_mutual', 'simple_path_fail'])
+@pytest.mark.parametrize("seed", [None, 1, 2])
+def test_shortest_path(name, seed, problem, random_timepoints):
+    solver = IntervalSolver(problem(name), suppress_output=True, time_points=random_timepoints(name, seed) if seed is not None else None)
+    rng = random.Random(seed)
+
+    for H in solver.get_heuristic_network()[3]:
+        weight = [rng.uniform(0, 10) for a in H.head]
+        G = nx.DiGraph()
+
+        for a,(u,v) in enumerate(zip(H.tail.tolist(), H.head.tolist())):
+            if not G.has_edge(u, v) or weight[a] < G[u][v]['weight']:
+                G.add_edge(u, v, weight=weight[a])
+
+        path = solver.heuristic_shortest_path(H, weight)
+
+        # a path from source to target, as short as dijkstra's
+        assert [int(H.tail[a]) for a in path[:1]] == [H.source] and int(H.head[path[-1]]) == H.target
+        assert all(H.head[a] == H.tail[b] for a,b in zip(path, path[1:]))
+        assert sum(weight[a] for a in path) == pytest.approx(nx.dijkstra_path_length(G, H.source, H.target))
+
+    assert seed is not None or any(H.order is None for H in solver.get_heuristic_network()[3]) == (name in ['n5c4', 'recursive_mutual', 'simple_path_fail'])
+
+def test_no_path(problem):
+    solver = IntervalSolver(problem('n4c3'), suppress_output=True)
+    H = solver.get_heuristic_network()[3][0]
+    H = H._replace(first=H.first.copy())
+    H.first[H.source+1:] = H.first[H.source]    # no arcs leave the source
+
+    with pytest.raises(nx.NetworkXNoPath):
+        solver.heuristic_shortest_path(H, [1.0] * len(H.head))
+
+# the best of the randomized runs, repeated for the same seed
+@pytest.mark.parametrize("name", ['n3c6', 'ms_test_conflict', 'recursive_mutual', 'mutual_2_root_nodes'])
+def test_multistart(name, problem, monkeypatch):
+    monkeypatch.setattr(interval_solver, 'HEURISTIC_SEED', 7)
+    rng = random.Random(7)
+    seeds = [rng.randrange(2**32) for _ in range(4)]
+    solver = IntervalSolver(problem(name), suppress_output=True)
+
+    [(objective, paths, consolidations)] = solver.solve_heuristic_multistart(4)
+    assert objective == min(solver.solve_heuristic_lower_bound(True, seed)[0] for seed in seeds)
+
+    [(repeated, repeated_paths, repeated_consolidations)] = IntervalSolver(problem(name), suppress_output=True).solve_heuristic_multistart(4)
+    assert repeated == objective and repeated_consolidations == consolidations
+    assert [sorted(PG.edges()) for PG in repeated_paths] == [sorted(PG.edges()) for PG in paths]
+
+def test_multistart_is_opt_in(problem):
+    assert interval_solver.HEURISTIC_STARTS == 0
+    assert IntervalSolver(problem('n4c3'), suppress_output=True).solve_heuristic_multistart(interval_solver.HEURISTIC_STARTS) == []
@@ -0,0 +1,42 @@
+import pytest
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from IncumbentWorker import IncumbentWorker
+from Solver import get_env
+from ReplaySolver import record, replay
+from tools import fork_safe
+
+def strip(info):
+    return [(i[0], i[1], i[4], i[5], i[6], i[9]) for i in info]
+
+def test_solve_matches_default(example, solve_with):
+    default, solver = solve_with(example, {'VALIDATE_INTERMEDIATE': True})
+    assert solver.status == default.status
+
+# the worker thread doesn't stop fork_map forking
+def test_fork_safe(problem):
+    worker = IncumbentWorker(IntervalSolver(problem('n4c3'), suppress_output=True), get_env(Threads=1))
+
+    try:
+        assert worker.thread.is_alive() and fork_safe()
+    finally:
+        worker.close()
+
+    assert not worker.thread.is_alive()
+
+# its LPs would interleave with the recorded MIPs, so the MIP runs without it
+def test_replay(example, problem, tmp_path, monkeypatch):
+    def unused(*args):
+        raise AssertionError("validated while logging")
+
+    monkeypatch.setattr(interval_solver, 'VALIDATE_INTERMEDIATE', True)
+    monkeypatch.setattr(interval_solver, 'IncumbentWorker', unused)
+    filename = str(tmp_path / 'solves.gz')
+
+    with record(filename):
+        recorded = IntervalSolver(problem(example), gap=0.01, suppress_output=True)
+        info = recorded.solve()
+
+    with replay(filename):
+        replayed = IntervalSolver(problem(example), gap=0.01, suppress_output=True)
+        assert strip(replayed.solve()) == strip(info) and replayed.timepoints == recorded.timepoints
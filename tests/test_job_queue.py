@@ -0,0 +1,92 @@
+import pytest
+import JobQueue as job_queue
+from JobQueue import JobQueue, PENDING, RUNNING, DONE, FAILED
+
+class Clock(object):
+    __slots__ = ['now']
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue, 'time', clock)
+    return clock
+
+# two workers sharing the queue file
+@pytest.fixture
+def queues(tmp_path, clock):
+    filename = str(tmp_path / 'jobs.db')
+    a, b = JobQueue(filename, stale=60, max_attempts=2), JobQueue(filename, stale=60, max_attempts=2)
+    b.owner = 'other'
+    yield a, b
+    a.close()
+    b.close()
+
+def state(queue, name):
+    return queue.connection.execute('SELECT state, attempts, error FROM jobs WHERE name = ?', (name,)).fetchone()
+
+def test_claims_longest_first(queues):
+    a, b = queues
+    a.add_all([('short', 1.0, None), ('long', 10.0, None), ('middle', 5.0, None)])
+
+    assert [a.claim(), b.claim(), a.claim(), b.claim()] == ['long', 'middle', 'short', None]
+    assert a.complete('long') and not b.complete('long')
+
+    # re-adding a sweep keeps the state of its jobs
+    a.add_all([('long', 10.0, None)])
+    assert state(a, 'long')[0] == DONE
+    assert a.counts() == {DONE: 1, RUNNING: 2}
+
+def test_heartbeat_and_reclaim(queues, clock):
+    a, b = queues
+    a.add('job')
+    assert a.claim() == 'job'
+
+    clock.now += 50
+    assert a.heartbeat('job')
+    clock.now += 50
+    assert b.claim() is None    # heartbeat 50s ago
+
+    # no heartbeat for longer than stale, the job is handed to the other worker
+    clock.now += 61
+    assert b.claim() == 'job'
+    assert state(a, 'job') == (RUNNING, 2, None)
+    assert not a.heartbeat('job') and not a.complete('job') and not a.fail('job')
+    assert b.heartbeat('job') and b.complete('job')
+
+def test_timeout(queues, clock):
+    a, b = queues
+    a.add_all([('job', 0.0, 30.0)])
+    assert a.claim() == 'job'
+
+    clock.now += 20
+    assert a.heartbeat('job')
+
+    # the owner's own heartbeat enforces the timeout
+    clock.now += 20
+    assert not a.heartbeat('job')
+    assert state(a, 'job') == (PENDING, 1, 'timeout')
+
+    # the last attempt fails the job
+    assert b.claim() == 'job'
+    clock.now += 31
+    assert not b.heartbeat('job')
+    assert state(a, 'job') == (FAILED, 2, 'timeout')
+
+def test_default_timeout_and_retry(tmp_path, clock):
+    queue = JobQueue(str(tmp_path / 'jobs.db'), timeout=5.0, max_attempts=1)
+    queue.add('job')
+
+    assert queue.claim() == 'job'
+    assert queue.fail('job', 'error')
+    assert state(queue, 'job') == (FAILED, 1, 'error')
+    assert queue.connection.execute('SELECT timeout FROM jobs').fetchone()[0] == 5.0
+
+    queue.retry_failed()
+    assert queue.claim() == 'job'
+    queue.close()
@@ -0,0 +1,49 @@
+import sys
+import MemoryMonitor as memory_monitor
+from IntervalSolver import IntervalSolver
+from MemoryMonitor import MemoryMonitor, deep_size
+from Solver import Solver
+
+class Slotted(object):
+    __slots__ = ['items', 'unset']
+
+    def __init__(self, items):
+        self.items = items
+
+def test_deep_size():
+    items = list(range(1000, 1100))
+    assert deep_size(items) == sys.getsizeof(items) + sum(sys.getsizeof(i) for i in items)
+
+    # shared objects are counted once, keys and values, slots and instance dicts are followed
+    assert deep_size([items, items]) == sys.getsizeof([items, items]) + deep_size(items)
+    assert deep_size({'a': items}) == sys.getsizeof({'a': items}) + sys.getsizeof('a') + deep_size(items)
+    assert deep_size(Slotted(items)) == sys.getsizeof(Slotted(items)) + deep_size(items)
+
+    # gurobi objects are handles, the model isn't followed
+    solver = Solver()
+    x = solver.addVar(1, 0, 1)
+    assert deep_size([x]) == sys.getsizeof([x]) + sys.getsizeof(x)
+
+def test_snapshot(problem):
+    memory = MemoryMonitor(trace=True, top=5, structures=True)
+    IntervalSolver(problem('middle_window'), gap=0.01, suppress_output=True, memory=memory).solve()
+    memory.close()
+
+    assert memory.snapshots and [s.iteration for s in memory.snapshots] == list(range(len(memory.snapshots)))
+    assert all(s.rss > 0 and s.traced_peak >= s.traced > 0 and len(s.top) == 5 for s in memory.snapshots)
+    assert all(size > 0 for s in memory.snapshots for size in s.structures.values())
+    assert len(memory.report().splitlines()) == len(memory.snapshots) * (1 + 7 + 5)
+
+# over budget, the solve stops with its incumbent after the iteration
+def test_budget(problem, monkeypatch):
+    default = IntervalSolver(problem('n4c3'), gap=0.01, suppress_output=True)
+    assert default.solve()[-1][9] == 2
+
+    monkeypatch.setattr(memory_monitor, 'rss', lambda: 2 * 1024**3)
+    memory = MemoryMonitor(budget=1024)
+    solver = IntervalSolver(problem('n4c3'), gap=0.01, suppress_output=True, memory=memory)
+    info = solver.solve()
+
+    assert solver.model.model.Params.SoftMemLimit == 1.0
+    assert len(memory.snapshots) == 1 and info[-1][9] == 0 and not solver.status
+    assert solver.incumbent == info[0][1] > default.incumbent
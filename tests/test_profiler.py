@@ -0,0 +1,60 @@
+import os
+import time
+import pstats
+from IntervalSolver import IntervalSolver
+from Profiler import Profiler
+from Telemetry import Telemetry
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def run(profiler, iterations=3):
+    telemetry = Telemetry(profiler=profiler)
+
+    for i in range(iterations):
+        for phase in ('mip', 'discovery'):
+            with telemetry.phase(phase):
+                busy(0.05)
+
+        telemetry.iteration(i, None, None, 0, 0, 0)
+
+    telemetry.close()
+
+def test_cprofile_files(tmp_path):
+    run(Profiler(str(tmp_path), 'toy', iterations=[0, 2], phases=['discovery']))
+
+    # a file per selected iteration and phase
+    assert sorted(os.listdir(tmp_path)) == ['toy_it0_discovery.prof', 'toy_it2_discovery.prof']
+    assert any(f[2] == 'busy' for f in pstats.Stats(str(tmp_path / 'toy_it0_discovery.prof')).stats)
+
+def test_sample_files(tmp_path):
+    run(Profiler(str(tmp_path), 'toy', iterations=[1], mode='sample', interval=0.001))
+
+    assert sorted(os.listdir(tmp_path)) == ['toy_it1_discovery.collapsed', 'toy_it1_mip.collapsed']
+
+    # collapsed stacks, root first, with their sample count
+    with open(tmp_path / 'toy_it1_mip.collapsed') as file:
+        lines = [line.rsplit(' ', 1) for line in file.read().splitlines()]
+
+    assert lines and all(int(count) > 0 for stack, count in lines)
+    assert any(stack.split(';')[-1].startswith('busy (test_profiler.py:') for stack, count in lines)
+
+# nested phases are part of the outer phase's profile
+def test_nested_phase(tmp_path):
+    telemetry = Telemetry(profiler=Profiler(str(tmp_path), 'toy'))
+
+    with telemetry.phase('validate'):
+        with telemetry.phase('get_inprogress'):
+            busy(0.01)
+
+    telemetry.iteration(0, None, None, 0, 0, 0)
+    assert os.listdir(tmp_path) == ['toy_it0_validate.prof']
+
+def test_solve(tmp_path, problem):
+    telemetry = Telemetry(profiler=Profiler(str(tmp_path), 'middle_window', iterations=[0], phases=['mip', 'discovery']))
+    IntervalSolver(problem('middle_window'), gap=0.01, suppress_output=True, telemetry=telemetry).solve()
+    telemetry.close()
+
+    assert sorted(os.listdir(tmp_path)) == ['middle_window_it0_discovery.prof', 'middle_window_it0_mip.prof']
@@ -0,0 +1,23 @@
+import random
+import networkx as nx
+import pytest
+from tools import Reachability
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_has_path(seed):
+    rng = random.Random(seed)
+    G = nx.gnp_random_graph(rng.randint(1, 30), rng.uniform(0.02, 0.2), seed=seed, directed=True)
+    G.add_edges_from((n, n) for n in G.nodes() if rng.random() < 0.1)
+    reach = Reachability(G)
+
+    for s in G.nodes():
+        for t in G.nodes():
+            assert reach.has_path(s, t) == nx.has_path(G, s, t), (s, t)
+
+def test_cycle_and_missing_nodes():
+    G = nx.DiGraph([(0, 1), (1, 2), (2, 0), (2, 3)])
+    reach = Reachability(G)
+
+    assert reach.has_path(1, 0) and reach.has_path(0, 3)
+    assert not reach.has_path(3, 0)
+    assert not reach.has_path(0, 'missing') and not reach.has_path('missing', 0)
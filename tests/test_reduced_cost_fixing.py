@@ -0,0 +1,48 @@
+import random
+import pytest
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from Solver import Solver
+from ExampleProblems import ExampleProblems
+from ProblemData import NodeTime
+
+PROBLEMS = ['n4c3', 'path_fail', 'middle_window', 'ms_test4', 'time_travel_consolidations']
+
+def problem(name):
+    return dict(ExampleProblems.all_problems())[name]
+
+@pytest.mark.parametrize("name", PROBLEMS)
+@pytest.mark.parametrize("seed", [None, 1])
+def test_solve_matches_default(name, seed, monkeypatch):
+    p = problem(name)
+    time_points = None
+
+    if seed is not None:
+        rng, solver = random.Random(seed), IntervalSolver(p, suppress_output=True)
+        time_points = {NodeTime(n, round(rng.uniform(solver.S, solver.T), 2)) for n in solver.network.nodes() for _ in range(3)}
+
+    default = IntervalSolver(p, gap=0.01, suppress_output=True, time_points=time_points)
+    default.solve()
+
+    monkeypatch.setattr(interval_solver, 'REDUCED_COST_FIXING', True)
+    solver = IntervalSolver(p, gap=0.01, suppress_output=True, time_points=time_points)
+    solver.solve()
+
+    assert default.status and solver.status
+    assert solver.incumbent >= default.lower_bound - 1e-6 and default.incumbent >= solver.lower_bound - 1e-6
+
+# reduced costs that take the LP objective over the incumbent by less than the tolerance don't fix anything
+def test_tolerance_is_relative(monkeypatch):
+    solver = IntervalSolver(problem('middle_window'), gap=0.01, suppress_output=True)
+    solver.solve()
+    objective = solver.lower_bound
+
+    def above(fraction):
+        rc = solver.incumbent - objective + fraction * interval_solver.REDUCED_COST_TOLERANCE * abs(solver.incumbent)
+        return lambda self, vars: (objective, [rc] * len(vars))
+
+    monkeypatch.setattr(Solver, 'relaxation', above(0.5))
+    assert solver.reduced_cost_fixing() == 0
+
+    monkeypatch.setattr(Solver, 'relaxation', above(2))
+    assert solver.reduced_cost_fixing() > 0
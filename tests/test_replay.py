@@ -0,0 +1,118 @@
+import pytest
+import networkx as nx
+import Solver as solver_module
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from Solver import Solver
+from SecondShortestPath import second_shortest_path
+from ExampleProblems import ExampleProblems
+from ReplaySolver import SolveLog, record, replay
+
+PROBLEMS = ['n4c3', 'path_fail', 'middle_window', 'ms_test4', 'time_travel_consolidations']
+
+def problem(name):
+    return dict(ExampleProblems.all_problems())[name]
+
+def strip(info):
+    return [(i[0], i[1], i[4], i[5], i[6], i[7], i[8], i[9]) for i in info]
+
+def record_and_replay(name, filename):
+    with record(filename) as log:
+        recorded = IntervalSolver(problem(name), gap=0.01, suppress_output=True)
+        info = recorded.solve()
+        statistics = recorded.get_statistics()
+
+    with replay(filename):
+        replayed = IntervalSolver(problem(name), gap=0.01, suppress_output=True)
+        replayed_info = replayed.solve()
+        replayed_statistics = replayed.get_statistics()
+
+    assert log.records
+    assert strip(replayed_info) == strip(info) and replayed.timepoints == recorded.timepoints
+
+    # the statistics' solution graphs are rebuilt, compare their sizes
+    for key in ('paths', 'consolidation'):
+        statistics.pop(key, None), replayed_statistics.pop(key, None)
+
+    assert replayed_statistics == statistics
+    return statistics
+
+@pytest.mark.parametrize("name", PROBLEMS)
+def test_replay(name, tmp_path):
+    record_and_replay(name, str(tmp_path / 'solves.gz'))
+
+# pool solutions are read and validated in this process while recording and replaying
+def test_replay_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(interval_solver, 'POOL_SOLUTIONS', 5)
+    pools = 0
+
+    for name in PROBLEMS:
+        record_and_replay(name, str(tmp_path / f'{name}.gz'))
+        pools += sum(len(r.pool or ()) for r in SolveLog.load(str(tmp_path / f'{name}.gz')).records)
+
+    assert pools > 0
+
+# replays presolve() and the presolved model's constraints
+# the LP relaxation and its reduced costs are replayed with the solve they follow
+def test_replay_reduced_cost_fixing(tmp_path, monkeypatch):
+    monkeypatch.setattr(interval_solver, 'REDUCED_COST_FIXING', True)
+    relaxations = 0
+
+    for name in PROBLEMS:
+        record_and_replay(name, str(tmp_path / f'{name}.gz'))
+        relaxations += sum(r.relaxation is not None for r in SolveLog.load(str(tmp_path / f'{name}.gz')).records)
+
+    assert relaxations > 0
+
+def test_pool_read_keeps_best_solution():
+    solver = Solver()
+    x, y = solver.addVar(1, 0, 1, solver.binary()), solver.addVar(2, 0, 1, solver.binary())
+    solver.addConstr(x + y >= 1)
+    solver.set_pool(3)
+    solver.model.setParam('PoolSearchMode', 2)     # the best 3, not just those found on the way
+    solver.optimize()
+
+    assert solver.sol_count() == 3 and solver.pool_vals([x, y], 1) == [0.0, 1.0]
+    assert solver.model.Params.SolutionNumber == 0 and solver.vals([x, y]) == [1.0, 0.0]
+
+def test_replay_presolve(tmp_path):
+    statistics = record_and_replay('time_travel_consolidations2', str(tmp_path / 'solves.gz'))
+    assert statistics['presolve_vars'] > 0 and statistics['presolve_cons'] > 0
+
+def test_more_solves_than_recorded(tmp_path):
+    filename = str(tmp_path / 'solves.gz')
+
+    with record(filename):
+        IntervalSolver(problem('middle_window'), gap=0.01, suppress_output=True).solve()
+
+    SolveLog(SolveLog.load(filename).records[:-1]).save(filename)
+
+    with replay(filename), pytest.raises(RuntimeError, match='more solves than were recorded'):
+        IntervalSolver(problem('middle_window'), gap=0.01, suppress_output=True).solve()
+
+# the second shortest path IPs go through the Solver wrapper, so replaying them doesn't need gurobi
+def test_replay_second_shortest_path(tmp_path, monkeypatch):
+    G = nx.DiGraph()
+    G.add_weighted_edges_from([(0, 1, 1), (1, 3, 1), (0, 2, 1), (2, 3, 2), (0, 3, 4)])
+    filename = str(tmp_path / 'solves.gz')
+
+    with record(filename):
+        recorded = [second_shortest_path(G, 0, 3, path=[0, 1, 3]), second_shortest_path(G, 0, 3, 2)]
+
+    assert recorded == [(3.0, [0, 2, 3]), (3.0, [])]
+    monkeypatch.setattr(solver_module, 'Model', None)
+
+    with replay(filename):
+        assert [second_shortest_path(G, 0, 3, path=[0, 1, 3]), second_shortest_path(G, 0, 3, 2)] == recorded
+
+def test_replay_solution_callback(tmp_path):
+    filename = str(tmp_path / 'solves.gz')
+
+    with record(filename):
+        solver = Solver()
+        solver.addVar(1, 0, 1, solver.binary())
+        solver.optimize()
+
+    with replay(filename), pytest.raises(RuntimeError, match="callback"):
+        solver = Solver()
+        solver.optimize(solution=(solver.getVars(), print))
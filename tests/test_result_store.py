@@ -0,0 +1,43 @@
+import polars as pl
+from ResultStore import ResultStore, INFO_COLUMNS
+from Telemetry import IterationEvent, PhaseTime
+
+INFO = [(10.0, 12.0, 0.5, 0.25, 3, 100, 80, 60, 50, 0, 1/6),
+        (11.0, 11.0, 1.5, 0.75, 0, 120, 90, None, None, 1, 0.0)]
+
+def test_round_trip(tmp_path):
+    store = ResultStore(str(tmp_path), run_id='run1')
+    store.append('small', 'c33', 1, INFO)
+    store.append('large', 'c55', 2, INFO[:1])
+
+    assert store.exists('small', 'c33', 1) and not store.exists('small', 'c33', 2)
+    assert store.runs() == ['run1']
+
+    df = store.scan('small').collect()
+    assert df['instance_class'].to_list() == ['small', 'small'] and df['run_id'].to_list() == ['run1', 'run1']
+    assert df['Id'].to_list() == ['1', '1'] and df['Iteration'].to_list() == [0, 1]
+    assert [tuple(row) for row in df.select(INFO_COLUMNS).rows()] == INFO
+
+    assert store.scan().collect().height == 3
+    assert store.scan(run_id='other').collect().height == 0
+
+def test_export_last_iteration(tmp_path):
+    store = ResultStore(str(tmp_path), run_id='run1')
+    store.append('small', 'c33', 1, INFO)
+    store.export_csv(str(tmp_path / 'small.csv'), 'small', last_iteration_only=True)
+
+    df = pl.read_csv(tmp_path / 'small.csv')
+    assert df.columns == ['Instance', 'Id'] + INFO_COLUMNS
+    assert df['# Its'].to_list() == [1]
+
+def test_events(tmp_path):
+    store = ResultStore(str(tmp_path), run_id='run1')
+    events = [IterationEvent('c33', 0, 10.0, 12.0, 100, 80, 3, {'added_arcs': 7, 'snapped_timepoints': 2}, {'mip': PhaseTime(0.5, 0.4)})]
+    store.append_events('small', 'c33', 1, events)
+
+    df = store.scan_events().collect()
+    assert df['added_arcs'].to_list() == [7] and df['snapped_timepoints'].to_list() == [2] and df['deleted_arcs'].to_list() == [0]
+    assert df['mip wall'].to_list() == [0.5] and df['discovery wall'].to_list() == [None]
+
+    # the results table is separate
+    assert store.scan().collect().height == 0
@@ -0,0 +1,83 @@
+import random
+import itertools
+import pytest
+import IntervalSolver as interval_solver
+from IntervalSolver import IntervalSolver
+from ProblemData import NodeTime
+from Telemetry import Telemetry, MemorySink
+
+def tolerance(solver, n):
+    return min([interval_solver.SNAP_TOLERANCE] + [d['weight'] / 2 for a,b,d in itertools.chain(solver.network.in_edges_data(n), solver.network.out_edges_data(n)) if a != b])
+
+def node_times(solver):
+    return {n: set(t for i in solver.intervals.select(n, '*', '*') for t in i[1:]) for n in solver.network.nodes()}
+
+# a snapped candidate is replaced by a timepoint within tolerance: one the node had, or a grid point just below it
+def assert_snapped(solver, candidates, result, times):
+    for tp in candidates - result:
+        tol = tolerance(solver, tp.node)
+        assert tp in solver.snapped
+        assert any(abs(t - tp.time) <= tol for t in times[tp.node] | {r.time for r in result if r.node == tp.node})
+
+    for tp in result - candidates:
+        steps = (tp.time - solver.S) / tolerance(solver, tp.node)
+        assert abs(steps - round(steps)) * tolerance(solver, tp.node) <= 0.01
+
+def test_snap(monkeypatch, problem):
+    solver = IntervalSolver(problem('middle_window'), suppress_output=True)
+    n = next(iter(solver.network.nodes()))
+    monkeypatch.setattr(interval_solver, 'SNAP_TOLERANCE', 1.0)
+    tol = tolerance(solver, n)
+
+    def at(offset):
+        return NodeTime(n, round(solver.S + offset * tol, 2))
+
+    near_start, off_grid, near_grid, on_grid, near_end = at(0.5), at(4.3), at(4.6), at(8), NodeTime(n, solver.T - 0.2 * tol)
+    result = solver.snap_timepoints({near_start, off_grid, near_grid, on_grid, near_end})
+
+    # merged onto S and T, moved down to the grid (where the next candidate meets it), or already on the grid
+    assert result == {at(4), on_grid}
+    assert solver.snapped == {near_start, off_grid, near_grid, near_end}
+
+    # found again, so it's added exactly
+    assert solver.snap_timepoints({off_grid}) == {off_grid}
+
+def test_zero_tolerance(monkeypatch, problem):
+    solver = IntervalSolver(problem('middle_window'), suppress_output=True)
+    n = next(iter(solver.network.nodes()))
+    monkeypatch.setattr(interval_solver, 'SNAP_TOLERANCE', 0)
+
+    timepoints = {NodeTime(n, solver.S + 0.01), NodeTime(n, solver.S + 0.02)}
+    assert solver.snap_timepoints(timepoints) == timepoints and not solver.snapped
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_snapped_onto_grid_or_timepoints(example, seed, problem, random_timepoints, monkeypatch):
+    monkeypatch.setattr(interval_solver, 'SNAP_TOLERANCE', 5)
+    solver = IntervalSolver(problem(example), suppress_output=True, time_points=random_timepoints(example, seed))
+    rng, times = random.Random(seed), node_times(solver)
+    candidates = {NodeTime(n, round(rng.uniform(solver.S, solver.T), 2)) for n in solver.network.nodes() for _ in range(5)}
+
+    result = solver.snap_timepoints(candidates)
+    assert len(result) < len(candidates)
+    assert_snapped(solver, candidates, result, times)
+
+@pytest.mark.parametrize("tolerance", [1, 5, 30])
+@pytest.mark.parametrize("seed", [None, 1])
+def test_solve_matches_default(example, tolerance, seed, solve_with, random_timepoints, monkeypatch):
+    snap = IntervalSolver.snap_timepoints
+
+    def snap_timepoints(solver, candidates):
+        times = node_times(solver)
+        result = snap(solver, candidates)
+        assert_snapped(solver, candidates, result, times)
+        return result
+
+    monkeypatch.setattr(IntervalSolver, 'snap_timepoints', snap_timepoints)
+    solve_with(example, {'SNAP_TOLERANCE': tolerance}, random_timepoints(example, seed) if seed is not None else None)
+
+def test_count_reaches_sinks(monkeypatch, problem, random_timepoints):
+    monkeypatch.setattr(interval_solver, 'SNAP_TOLERANCE', 2)
+    telemetry = Telemetry(MemorySink())
+    IntervalSolver(problem('time_travel_consolidations'), gap=0.01, suppress_output=True, time_points=random_timepoints('time_travel_consolidations', 1), telemetry=telemetry).solve()
+
+    assert sum(e.to_dict()['snapped_timepoints'] for e in telemetry.sink.events) > 0
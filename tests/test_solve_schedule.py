@@ -0,0 +1,107 @@
+import pytest
+from IntervalSolver import IntervalSolver
+from SolveSchedule import SolveSchedule, EarlyStopSchedule
+
+# records the parameters a schedule sets
+class Model(object):
+    __slots__ = ['gap', 'focus', 'timelimit', 'aggressive']
+
+    def __init__(self):
+        self.gap, self.focus, self.timelimit, self.aggressive = None, 0, None, False
+
+    def set_gap(self, gap):
+        self.gap = gap
+
+    def set_focus(self, focus):
+        self.focus = focus
+
+    def set_timelimit(self, timelimit):
+        self.timelimit = timelimit
+
+    def set_aggressive_cuts(self):
+        self.aggressive = True
+
+class Solver(object):
+    __slots__ = ['model', 'GAP', 'incumbent', 'lower_bound']
+
+    def __init__(self, incumbent=100.0, lower_bound=80.0):
+        self.model = Model()
+        self.GAP = 0.01
+        self.incumbent = incumbent
+        self.lower_bound = lower_bound
+
+def test_adaptive_gap():
+    solver, schedule = Solver(), SolveSchedule()
+    schedule.start(solver, True)
+    assert solver.model.gap == 0.04
+
+    schedule.configure(solver, 0, 60, 0)
+    assert solver.model.timelimit == 60
+
+    schedule.update(solver, 0, True)
+    assert solver.model.gap == pytest.approx(0.05) and not solver.model.aggressive
+
+    # close to the gap, switches to proving optimality
+    solver.lower_bound = 97.0
+    schedule.update(solver, 1, True)
+    assert solver.model.gap == pytest.approx(0.0098) and solver.model.aggressive and not schedule.variable_gap
+
+    # a rebuilt model gets the same parameters
+    resumed = Solver()
+    schedule.resume(resumed)
+    assert resumed.model.gap == pytest.approx(0.0098) and resumed.model.aggressive
+
+def test_fixed_gap():
+    solver, schedule = Solver(), SolveSchedule()
+    schedule.start(solver, False)
+    schedule.update(solver, 0, True)
+    assert solver.model.gap == 0.01 and not solver.model.aggressive
+
+def test_early_stop():
+    solver, schedule = Solver(lower_bound=50.0), EarlyStopSchedule(gap=0.1, minimum=10, growth=2, stall=0.001)
+    schedule.start(solver, True)
+    assert solver.model.gap == 0.1 and solver.model.focus == 1
+
+    schedule.configure(solver, 0, 100, 0)
+    assert solver.model.timelimit == 10 and schedule.limited
+
+    solver.lower_bound = 60.0
+    schedule.configure(solver, 1, 100, 30)
+    assert solver.model.timelimit == 60 and schedule.limited
+
+    # the budget is less than the early limit
+    solver.lower_bound = 70.0
+    schedule.configure(solver, 2, 40, 30)
+    assert solver.model.timelimit == 40 and not schedule.limited and schedule.early
+
+    resumed = Solver()
+    schedule.resume(resumed)
+    assert resumed.model.gap == 0.1 and resumed.model.focus == 1
+
+    # the lower bound stalls, continues with the default schedule
+    schedule.configure(solver, 3, 100, 30)
+    assert not schedule.early and not schedule.limited
+    assert solver.model.timelimit == 100 and solver.model.gap == 0.04 and solver.model.focus == 0
+
+def test_early_stop_ends_without_timepoints():
+    solver, schedule = Solver(), EarlyStopSchedule()
+    schedule.start(solver, True)
+    schedule.update(solver, 0, False)
+
+    assert not schedule.early and solver.model.gap == pytest.approx(0.0098) and solver.model.aggressive
+
+def test_default_schedule_is_unchanged(example, problem):
+    default = IntervalSolver(problem(example), gap=0.01, suppress_output=True)
+    info = default.solve()
+
+    solver = IntervalSolver(problem(example), gap=0.01, suppress_output=True, schedule=SolveSchedule())
+    scheduled = solver.solve()
+
+    strip = lambda info: [(i[0], i[1], i[4], i[5], i[6], i[9]) for i in info]
+    assert strip(scheduled) == strip(info) and solver.timepoints == default.timepoints
+
+def test_early_stop_matches_default(example, solve_with):
+    default, solver = solve_with(example, schedule=EarlyStopSchedule(minimum=1))
+
+    # configured every MIP, and the last bound it saw is the solve's
+    assert solver.schedule.last_bound is not None and solver.schedule.last_bound <= solver.lower_bound + 1e-6
@@ -0,0 +1,77 @@
+import json
+import time
+from IntervalSolver import IntervalSolver
+from Telemetry import Telemetry, MemorySink, JsonLinesSink, PhaseTime, PHASES, COUNTS, NULL_PHASE
+
+def busy(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+def test_phase_times():
+    telemetry = Telemetry(MemorySink(), 'toy')
+
+    with telemetry.phase('mip'):
+        time.sleep(0.05)
+
+    with telemetry.phase('discovery'):
+        busy(0.05)
+
+    # repeated phases add up
+    with telemetry.phase('mip'):
+        time.sleep(0.05)
+
+    telemetry.count('added_arcs', 2)
+    telemetry.count('added_arcs', 3)
+    telemetry.iteration(0, 1.0, 2.0, 10, 20, 4)
+
+    [event] = telemetry.sink.events
+    assert event.phases['mip'].wall >= 0.1 and event.phases['mip'].cpu < 0.05
+    assert event.phases['discovery'].wall >= 0.05 and event.phases['discovery'].cpu >= 0.05
+    assert event.counts == {'added_arcs': 5}
+
+    # every count is in the output, zero if it wasn't counted
+    output = event.to_dict()
+    assert (output['instance'], output['iteration'], output['added_timepoints']) == ('toy', 0, 4)
+    assert {c: output[c] for c in COUNTS} == {c: 5 if c == 'added_arcs' else 0 for c in COUNTS}
+
+    # the next iteration starts over
+    telemetry.iteration(1, 1.5, 2.0, 10, 20, 0)
+    assert telemetry.sink.events[1].phases == {} and telemetry.sink.events[1].counts == {}
+
+def test_disabled():
+    telemetry = Telemetry()
+    assert telemetry.phase('mip') is NULL_PHASE
+
+    with telemetry.phase('mip'):
+        telemetry.count('added_arcs', 1)
+
+    telemetry.iteration(0, 1.0, 2.0, 10, 20, 4)
+    assert telemetry.phases == {} and telemetry.counts == {}
+
+def test_json_lines(tmp_path):
+    filename = str(tmp_path / 'events.jsonl')
+    telemetry = Telemetry(JsonLinesSink(filename), 'toy')
+    telemetry.add_time('mip', 1.0, 0.5)
+    telemetry.iteration(0, None, None, 1, 2, 3)
+    telemetry.add_time('heuristic', 0.25, 0.25)
+    telemetry.iteration(1, 1.0, 2.0, 1, 2, 0)
+    telemetry.close()
+
+    with open(filename) as file:
+        lines = [json.loads(line) for line in file]
+
+    assert [line['iteration'] for line in lines] == [0, 1]
+    assert lines[0]['phases'] == {'mip': PhaseTime(1.0, 0.5)._asdict()} and lines[0]['lower_bound'] is None
+    assert lines[1]['phases'] == {'heuristic': {'wall': 0.25, 'cpu': 0.25}} and lines[1]['incumbent'] == 2.0
+
+# an event per iteration, timing the solver's phases
+def test_solve(problem):
+    telemetry = Telemetry(MemorySink(), 'middle_window')
+    info = IntervalSolver(problem('middle_window'), gap=0.01, suppress_output=True, telemetry=telemetry).solve()
+    events = telemetry.sink.events
+
+    assert [e.iteration for e in events] == [i[9] for i in info]
+    assert [(e.lower_bound, e.incumbent) for e in events] == [(i[0], i[1]) for i in info]
+    assert all(set(e.phases) <= set(PHASES) and set(e.counts) <= set(COUNTS) for e in events)
+    assert all('mip' in e.phases for e in events) and any(e.counts.get('added_arcs', 0) > 0 for e in events)
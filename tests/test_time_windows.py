@@ -0,0 +1,32 @@
+import networkx as nx
+from IntervalSolver import IntervalSolver
+
+def path_graph(nodes):
+    G = nx.DiGraph()
+    nx.add_path(G, nodes)
+    return G
+
+# commodities 1 and 5 of n3c6 share their origin and destination, with different times
+def test_cache(problem):
+    solver = IntervalSolver(problem('n3c6'), suppress_output=True)
+    (o, d), c5 = [c[0] for c in (solver.commodities[1].a, solver.commodities[1].b)], solver.commodities[5]
+    assert (c5.a[0], c5.b[0]) == (o, d) and c5.a[1] != solver.commodities[1].a[1]
+
+    path = max(nx.all_simple_paths(solver.network.G, o, d), key=len)
+    assert len(path) > 2 and solver.network.has_edge(o, d)
+
+    windows = solver.time_windows(1, path_graph(path))
+    assert windows[o][0] == solver.commodities[1].a[1] and windows[d][1] == solver.commodities[1].b[1]
+
+    # the same path (another graph of the same arcs) is a hit
+    assert solver.time_windows(1, path_graph(path)) is windows
+
+    # but not for another commodity on the same path
+    other = solver.time_windows(5, path_graph(path))
+    assert other is not windows and other == IntervalSolver(problem('n3c6'), suppress_output=True).time_windows(5, path_graph(path))
+    assert other[o][0] == c5.a[1] and other[d][1] == c5.b[1]
+    assert solver.time_windows(1, path_graph(path)) is windows
+
+    # a changed path is recomputed
+    direct = solver.time_windows(1, path_graph([o, d]))
+    assert direct is not windows and set(direct) == {o, d}
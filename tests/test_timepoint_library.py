@@ -0,0 +1,39 @@
+from ProblemData import Commodity, NodeTime, ProblemData
+from TimepointLibrary import TimepointLibrary
+
+# a path 0 -> 1 -> 2, with the commodity's times shifted
+def problem(shift=0, transit=3):
+    return ProblemData([Commodity(NodeTime(0, shift), NodeTime(2, 20 + shift), 1)], {0: {1: 2}, 1: {2: transit}})
+
+def test_round_trip(tmp_path):
+    TimepointLibrary(str(tmp_path)).add('a.txt', problem(), {(1, 4), (1, 10), (2, 15), (1, 30)})
+
+    # read back from disk as offsets from the release time, outside the window are dropped
+    library = TimepointLibrary(str(tmp_path))
+    assert library.seed(problem()) == {NodeTime(1, 4), NodeTime(1, 10), NodeTime(2, 15)}
+    assert library.seed(problem(5)) == {NodeTime(1, 9), NodeTime(1, 15), NodeTime(2, 20)}
+
+    # another network
+    assert library.seed(problem(transit=4)) == set()
+
+def test_min_support(tmp_path):
+    library = TimepointLibrary(str(tmp_path), min_support=0.6)
+    library.add('a.txt', problem(), {(1, 4), (1, 10)})
+    library.add('b.txt', problem(2), {(1, 6), (2, 15)})
+    assert library.seed(problem()) == {NodeTime(1, 4)}
+
+    # the cache is refreshed once a run is added
+    library.add('c.txt', problem(1), {(2, 14)})
+    assert library.seed(problem()) == {NodeTime(1, 4), NodeTime(2, 13)}
+
+    assert TimepointLibrary(str(tmp_path), min_support=0.3).seed(problem()) == {NodeTime(1, 4), NodeTime(1, 10), NodeTime(2, 13)}
+    assert TimepointLibrary(str(tmp_path), min_support=1).seed(problem()) == set()
+
+# a run solved again replaces its file
+def test_rerun(tmp_path):
+    library = TimepointLibrary(str(tmp_path))
+    library.add('instances/a.txt', problem(), {(1, 4)})
+    library.add('instances/a.txt', problem(), {(1, 5)})
+
+    assert library.seed(problem()) == {NodeTime(1, 5)}
+    assert library.load(TimepointLibrary.signature(problem()))[0] == 1
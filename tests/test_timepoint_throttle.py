@@ -0,0 +1,59 @@
+import pytest
+from ProblemData import NodeTime
+from TimepointThrottle import TimepointThrottle
+
+class Node(object):
+    __slots__ = ['node', 'commodities']
+
+    def __init__(self, node, commodities):
+        self.node = node
+        self.commodities = commodities
+
+# solution graph with a time window per (node, commodities)
+class Solution(object):
+    __slots__ = ['data']
+
+    def __init__(self, data):
+        self.data = data
+
+    def nodes(self):
+        return list(self.data)
+
+    def node_data(self, n):
+        return self.data[n]
+
+def test_adapt():
+    throttle = TimepointThrottle(4, target=10, minimum=2)
+
+    throttle.adapt(1)
+    assert throttle.batch == 8
+    throttle.adapt(7)
+    assert throttle.batch == 8
+    throttle.adapt(11)
+    throttle.adapt(11)
+    throttle.adapt(11)
+    assert throttle.batch == 2
+
+def test_select_by_category_then_impact():
+    solution = Solution({Node(0, (0,)): {'tw': (0, 10)},
+                         Node(0, (1, 2)): {'tw': (5, 10)},           # consolidated, counts twice
+                         Node(1, (3,)): {'tw': (0, 10), 'valid': False}})
+    a, b, c, d, e = NodeTime(0, 2), NodeTime(0, 6), NodeTime(1, 3), NodeTime(1, 20), NodeTime(2, 1)
+    throttle = TimepointThrottle(3, target=10)
+
+    selected = throttle.select(solution, 0, 1.0, {a, b, c, d, e}, [{d}, {a, b, c}])
+    assert TimepointThrottle.impact(solution, {a, b, c, d, e}) == {a: 1, b: 5, c: 2, d: 0, e: 0}
+
+    # the first category first, then by impact, the timepoints in no category last
+    assert selected == {d, b, c} and throttle.deferred == {a, e}
+    assert throttle.decisions[-1] == (0, 5, 3, 2, 3, 1.0)
+    assert throttle.batch == 6
+
+@pytest.mark.parametrize("batch", [1, 3])
+@pytest.mark.parametrize("seed", [None, 1])
+def test_solve_matches_default(example, batch, seed, solve_with, random_timepoints):
+    default, solver = solve_with(example, {'TIMEPOINT_BATCH': batch}, random_timepoints(example, seed) if seed is not None else None)
+
+    # no more than a batch is added, the rest are deferred to later iterations
+    assert all(decision.added <= decision.batch and decision.added + decision.deferred == decision.candidates for decision in solver.throttle.decisions)
+    assert all(max(1, before.batch // 2) <= after.batch <= before.batch * 2 for before, after in zip(solver.throttle.decisions, solver.throttle.decisions[1:]))
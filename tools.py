@@ -1,4 +1,6 @@
 import itertools
+import threading
+import multiprocessing
 import networkx as nx
 
 # Improve type support for networkx
@@ -85,6 +87,30 @@ class TypedDiGraph(Generic[NodeType]):
     def has_node(self, n: NodeType) -> bool:
         return self.nx_graph.has_node(n)
 
+    def reachability(self) -> "Reachability[NodeType]":
+        return Reachability[NodeType](self.nx_graph)
+
+# Precomputed transitive closure, so repeated has_path queries are bit tests instead of a search each time
+class Reachability(Generic[NodeType]):
+    __slots__ = ['component', 'reach']
+
+    def __init__(self, G: nx.DiGraph) -> None:
+        # collapse cycles into their strongly connected component, then the condensation is a DAG
+        C = nx.condensation(G)
+        self.component: dict[NodeType, int] = C.graph['mapping']
+        self.reach: list[int] = [0] * C.number_of_nodes()
+
+        # bitset of reachable components, built from the sinks back towards the roots
+        for c in reversed(list(nx.topological_sort(C))):
+            bits = 1 << c
+            for s in C.successors(c):
+                bits |= self.reach[s]
+            self.reach[c] = bits
+
+    def has_path(self, source: NodeType, target: NodeType) -> bool:
+        s, t = self.component.get(source), self.component.get(target)
+        return s is not None and t is not None and (self.reach[s] >> t) & 1 == 1
+
 # zips a sequence on itself - "s -> (s0,s1,s2), (s1,s2,s3), (s2,s3,s4), ..."
 def triple(iterable):
     a, b, c = itertools.tee(iterable, 3)
@@ -161,6 +187,44 @@ def limit_path_range(G, source, target, lt_weight='weight', gt_weight='weight',
                     gt += t2
 
 
+# state for fork_map workers - inherited by the forked processes, so it never needs to be pickled
+_fork_state = None
+
+# a forked child inherits the locks other threads hold at the fork, so background threads (ForkSafeThread) only work while holding
+# fork_lock, and fork_map forks while holding it.  Any other live thread could hold a lock, so fork_map then runs serially
+fork_lock = threading.Lock()
+
+class ForkSafeThread(threading.Thread):
+    pass
+
+def fork_safe() -> bool:
+    return all(t is threading.current_thread() or isinstance(t, ForkSafeThread) for t in threading.enumerate())
+
+def _fork_call(args):
+    func, item = args
+    return func(_fork_state, item)
+
+# map func(state, item) over items using forked worker processes (serial if fork is not available, i.e. windows, or not safe)
+def fork_map(func, state, items, processes=None):
+    global _fork_state
+    items = list(items)
+    pool = None
+
+    if processes != 1 and len(items) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with fork_lock:
+            if fork_safe():
+                _fork_state = state
+                pool = multiprocessing.get_context('fork').Pool(min(processes or multiprocessing.cpu_count(), len(items)))  # forks the workers
+
+    if pool is None:
+        return [func(state, item) for item in items]
+
+    try:
+        with pool:
+            return pool.map(_fork_call, [(func, item) for item in items])
+    finally:
+        _fork_state = None
+
 # Anon objects
 class Abj(object):
     def __init__(self, **kwargs):